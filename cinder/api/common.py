@@ -14,12 +14,17 @@
 #    under the License.
 
 
+import base64
+import datetime
 import os
 import re
 
 import enum
 from oslo_config import cfg
 from oslo_log import log as logging
+from oslo_serialization import jsonutils
+from oslo_utils import timeutils
+import six
 from six.moves import urllib
 import webob
 
@@ -137,6 +142,63 @@ def _get_offset_param(params):
     return utils.validate_integer(offset, 'offset', 0, constants.DB_MAX_INT)
 
 
+PAGINATION_CURSOR_PREFIX = 'cursor-'
+
+
+def encode_pagination_cursor(values):
+    """Return a pagination marker holding the sort key values of an item.
+
+    Unlike an id marker, the database doesn't need to load the item to
+    resume the listing after it.
+
+    :param values: dict of the sort key values of the last item of a page
+    """
+    items = {}
+    for key, value in values.items():
+        if isinstance(value, datetime.datetime):
+            value = {'datetime': value.isoformat()}
+        items[key] = value
+    data = jsonutils.dumps(items, sort_keys=True).encode('utf-8')
+    token = base64.urlsafe_b64encode(data).decode('ascii').rstrip('=')
+    return PAGINATION_CURSOR_PREFIX + token
+
+
+def is_pagination_cursor(marker):
+    """Check whether a marker was made by encode_pagination_cursor()."""
+    return (isinstance(marker, six.string_types) and
+            marker.startswith(PAGINATION_CURSOR_PREFIX))
+
+
+def decode_pagination_cursor(marker):
+    """Return the sort key values held by a pagination cursor.
+
+    The values can only be strings, numbers, None or datetimes, as these
+    are the only ones encode_pagination_cursor() makes.
+
+    :raises InvalidInput: if the marker isn't a valid pagination cursor
+    """
+    token = marker[len(PAGINATION_CURSOR_PREFIX):]
+    token += '=' * (-len(token) % 4)
+    try:
+        data = base64.urlsafe_b64decode(token.encode('ascii'))
+        items = jsonutils.loads(data.decode('utf-8'))
+        if not isinstance(items, dict):
+            raise ValueError()
+        for key, value in items.items():
+            if isinstance(value, dict):
+                if list(value) != ['datetime']:
+                    raise ValueError()
+                items[key] = timeutils.normalize_time(
+                    timeutils.parse_isotime(value['datetime']))
+            elif not (value is None or isinstance(
+                    value, six.string_types + six.integer_types + (float,))):
+                raise ValueError()
+    except (KeyError, TypeError, ValueError):
+        msg = _('Invalid pagination marker %s.') % marker
+        raise exception.InvalidInput(reason=msg)
+    return items
+
+
 def limited(items, request, max_limit=None):
     """Return a slice of items according to requested offset and limit.
 
@@ -237,6 +299,33 @@ def get_request_url(request):
     return url
 
 
+# Kinds of data API extensions can annotate volumes with, see
+# Request.add_annotation.
+VOLUME_ANNOTATION_DB_VOLUME = 'db_volume'
+VOLUME_ANNOTATION_IMAGE_METADATA = 'image_metadata'
+
+
+def get_volume_annotation_data(req, volume_api, kind, volume_ids):
+    """Fetch one kind of annotation data for all the given volumes.
+
+    The volumes are taken from the ones cached in the request, and the
+    image metadata of all the volumes is read with a single query.
+    Returns a dict of the data by volume id.
+    """
+    if kind == VOLUME_ANNOTATION_DB_VOLUME:
+        return {volume_id: req.get_db_volume(volume_id)
+                for volume_id in volume_ids}
+    if kind == VOLUME_ANNOTATION_IMAGE_METADATA:
+        context = req.environ['cinder.context']
+        try:
+            return volume_api.get_list_volumes_image_metadata(context,
+                                                              volume_ids)
+        except Exception as e:
+            LOG.debug('Get image metadata error: %s', e)
+            return {}
+    raise ValueError(_('Unknown volume annotation: %s') % kind)
+
+
 def remove_version_from_href(href):
     """Removes the first api version from the href.
 
@@ -314,7 +403,8 @@ class ViewBuilder(object):
                             str(identifier))
 
     def _get_collection_links(self, request, items, collection_name,
-                              item_count=None, id_key="uuid"):
+                              item_count=None, id_key="uuid",
+                              next_marker=None):
         """Retrieve 'next' link, if applicable.
 
         The next link is included if we are returning as many items as we can,
@@ -336,11 +426,17 @@ class ViewBuilder(object):
                            items
         :param id_key: Attribute key used to retrieve the unique ID, used
                        to generate the next link marker for a pagination query
+        :param next_marker: marker of the next link, instead of the unique
+                            ID of the last item
         :returns: links
         """
         item_count = item_count or len(items)
         limit = _get_limit_param(request.GET.copy())
         if len(items) and limit <= item_count:
+            if next_marker is not None:
+                return [{'rel': 'next',
+                         'href': self._get_next_link(request, next_marker,
+                                                     collection_name)}]
             return self._generate_next_link(items, id_key, request,
                                             collection_name)
 
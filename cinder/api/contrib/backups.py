@@ -106,6 +106,7 @@ class BackupsController(wsgi.Controller):
                                           offset=offset,
                                           sort_keys=sort_keys,
                                           sort_dirs=sort_dirs,
+                                          use_slave=True,
                                           )
 
         req.cache_db_backups(backups.objects)
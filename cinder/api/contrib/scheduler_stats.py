@@ -14,12 +14,16 @@
 
 """The Scheduler Stats extension"""
 
+from cinder.api import common
 from cinder.api import extensions
 from cinder.api.openstack import wsgi
 from cinder.api.views import scheduler_stats as scheduler_stats_view
 from cinder.scheduler import rpcapi
 
 
+GET_POOL_FILTERS_MICRO_VERSION = '3.7'
+
+
 def authorize(context, action_name):
     action = 'scheduler_stats:%s' % action_name
     extensions.extension_authorizer('scheduler', action)(context)
@@ -39,9 +43,22 @@ class SchedulerStatsController(wsgi.Controller):
         context = req.environ['cinder.context']
         authorize(context, 'get_pools')
 
-        # TODO(zhiteng) Add filters support
         detail = req.params.get('detail', False)
-        pools = self.scheduler_api.get_pools(context, filters=None)
+
+        filters = None
+        if req.api_version_request.matches(GET_POOL_FILTERS_MICRO_VERSION):
+            filters = dict(req.params)
+            filters.pop('detail', None)
+            # Pools are listed without next links, so only paginate when
+            # the client asked for it instead of silently cutting the list
+            # at osapi_max_limit.
+            requested = [key for key in ('marker', 'limit', 'offset')
+                         if key in filters]
+            marker, limit, offset = common.get_pagination_params(filters)
+            pagination = dict(marker=marker, limit=limit, offset=offset)
+            filters.update((key, pagination[key]) for key in requested)
+
+        pools = self.scheduler_api.get_pools(context, filters=filters)
 
         return self._view_builder.pools(req, pools, detail)
 
@@ -63,7 +63,8 @@ class ServiceController(wsgi.Controller):
                 "Query by service parameter is deprecated. "
                 "Please use binary parameter instead."))
 
-        services = objects.ServiceList.get_all(context, filters)
+        services = objects.ServiceList.get_all(context, filters,
+                                               use_slave=True)
 
         svcs = []
         for svc in services:
@@ -67,6 +67,7 @@ class VolumeTypeExtraSpecsController(wsgi.Controller):
         db.volume_type_extra_specs_update_or_create(context,
                                                     type_id,
                                                     specs)
+        volume_types.clear_cache(type_id)
         notifier_info = dict(type_id=type_id, specs=specs)
         notifier = rpc.get_notifier('volumeTypeExtraSpecs')
         notifier.info(context, 'volume_type_extra_specs.create',
@@ -92,6 +93,7 @@ class VolumeTypeExtraSpecsController(wsgi.Controller):
         db.volume_type_extra_specs_update_or_create(context,
                                                     type_id,
                                                     body)
+        volume_types.clear_cache(type_id)
         notifier_info = dict(type_id=type_id, id=id)
         notifier = rpc.get_notifier('volumeTypeExtraSpecs')
         notifier.info(context,
@@ -122,6 +124,7 @@ class VolumeTypeExtraSpecsController(wsgi.Controller):
             db.volume_type_extra_specs_delete(context, type_id, id)
         except exception.VolumeTypeExtraSpecsNotFound as error:
             raise webob.exc.HTTPNotFound(explanation=error.msg)
+        volume_types.clear_cache(type_id)
 
         notifier_info = dict(type_id=type_id, id=id)
         notifier = rpc.get_notifier('volumeTypeExtraSpecs')
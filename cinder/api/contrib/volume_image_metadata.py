@@ -15,8 +15,6 @@
 """The Volume Image Metadata API extension."""
 import webob
 
-from oslo_log import log as logging
-
 from cinder.api import common
 from cinder.api import extensions
 from cinder.api.openstack import wsgi
@@ -25,8 +23,6 @@ from cinder.i18n import _
 from cinder import volume
 
 
-LOG = logging.getLogger(__name__)
-
 authorize = extensions.soft_extension_authorizer('volume',
                                                  'volume_image_metadata')
 
@@ -45,45 +41,32 @@ class VolumeImageMetadataController(wsgi.Controller):
             raise webob.exc.HTTPNotFound(explanation=msg)
         return (volume, meta)
 
-    def _add_image_metadata(self, context, resp_volume_list, image_metas=None):
-        """Appends the image metadata to each of the given volume.
+    def _add_image_metadata(self, resp_volume, data):
+        """Appends the image metadata to the given volume.
 
-        :param context: the request context
-        :param resp_volume_list: the response volume list
-        :param image_metas: The image metadata to append, if None is provided
-                            it will be retrieved from the database. An empty
-                            dict means there is no metadata and it should not
-                            be retrieved from the db.
+        The image metadata of all the volumes of the response is read with a
+        single query. It is not appended at all when none of the volumes
+        has image metadata, or when it could not be read.
         """
-        vol_id_list = []
-        for vol in resp_volume_list:
-            vol_id_list.append(vol['id'])
-        if image_metas is None:
-            try:
-                image_metas = self.volume_api.get_list_volumes_image_metadata(
-                    context, vol_id_list)
-            except Exception as e:
-                LOG.debug('Get image metadata error: %s', e)
-                return
+        image_metas = data[common.VOLUME_ANNOTATION_IMAGE_METADATA]
         if image_metas:
-            for vol in resp_volume_list:
-                image_meta = image_metas.get(vol['id'], {})
-                vol['volume_image_metadata'] = dict(image_meta)
+            image_meta = image_metas.get(resp_volume['id'], {})
+            resp_volume['volume_image_metadata'] = dict(image_meta)
 
     @wsgi.extends
     def show(self, req, resp_obj, id):
         context = req.environ['cinder.context']
         if authorize(context):
-            self._add_image_metadata(context, [resp_obj.obj['volume']])
+            req.add_annotation('volume', self._add_image_metadata,
+                               (common.VOLUME_ANNOTATION_IMAGE_METADATA,))
 
     @wsgi.extends
     def detail(self, req, resp_obj):
         context = req.environ['cinder.context']
         if authorize(context):
             # Just get the image metadata of those volumes in response.
-            volumes = list(resp_obj.obj.get('volumes', []))
-            if volumes:
-                self._add_image_metadata(context, volumes)
+            req.add_annotation('volumes', self._add_image_metadata,
+                               (common.VOLUME_ANNOTATION_IMAGE_METADATA,))
 
     @wsgi.action("os-set_image_metadata")
     def create(self, req, id, body):
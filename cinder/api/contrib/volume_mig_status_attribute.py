@@ -12,6 +12,7 @@
 #   License for the specific language governing permissions and limitations
 #   under the License.
 
+from cinder.api import common
 from cinder.api import extensions
 from cinder.api.openstack import wsgi
 
@@ -20,8 +21,8 @@ authorize = extensions.soft_extension_authorizer('volume',
 
 
 class VolumeMigStatusAttributeController(wsgi.Controller):
-    def _add_volume_mig_status_attribute(self, req, resp_volume):
-        db_volume = req.get_db_volume(resp_volume['id'])
+    def _add_volume_mig_status_attribute(self, resp_volume, data):
+        db_volume = data[common.VOLUME_ANNOTATION_DB_VOLUME][resp_volume['id']]
         key = "%s:migstat" % Volume_mig_status_attribute.alias
         resp_volume[key] = db_volume['migration_status']
         key = "%s:name_id" % Volume_mig_status_attribute.alias
@@ -31,14 +32,17 @@ class VolumeMigStatusAttributeController(wsgi.Controller):
     def show(self, req, resp_obj, id):
         context = req.environ['cinder.context']
         if authorize(context):
-            self._add_volume_mig_status_attribute(req, resp_obj.obj['volume'])
+            req.add_annotation('volume',
+                               self._add_volume_mig_status_attribute,
+                               (common.VOLUME_ANNOTATION_DB_VOLUME,))
 
     @wsgi.extends
     def detail(self, req, resp_obj):
         context = req.environ['cinder.context']
         if authorize(context):
-            for vol in list(resp_obj.obj['volumes']):
-                self._add_volume_mig_status_attribute(req, vol)
+            req.add_annotation('volumes',
+                               self._add_volume_mig_status_attribute,
+                               (common.VOLUME_ANNOTATION_DB_VOLUME,))
 
 
 class Volume_mig_status_attribute(extensions.ExtensionDescriptor):
@@ -12,6 +12,7 @@
 #   License for the specific language governing permissions and limitations
 #   under the License.
 
+from cinder.api import common
 from cinder.api import extensions
 from cinder.api.openstack import wsgi
 
@@ -21,8 +22,8 @@ authorize = extensions.soft_extension_authorizer('volume',
 
 
 class VolumeTenantAttributeController(wsgi.Controller):
-    def _add_volume_tenant_attribute(self, req, resp_volume):
-        db_volume = req.get_db_volume(resp_volume['id'])
+    def _add_volume_tenant_attribute(self, resp_volume, data):
+        db_volume = data[common.VOLUME_ANNOTATION_DB_VOLUME][resp_volume['id']]
         key = "%s:tenant_id" % Volume_tenant_attribute.alias
         resp_volume[key] = db_volume['project_id']
 
@@ -30,15 +31,15 @@ class VolumeTenantAttributeController(wsgi.Controller):
     def show(self, req, resp_obj, id):
         context = req.environ['cinder.context']
         if authorize(context):
-            volume = resp_obj.obj['volume']
-            self._add_volume_tenant_attribute(req, volume)
+            req.add_annotation('volume', self._add_volume_tenant_attribute,
+                               (common.VOLUME_ANNOTATION_DB_VOLUME,))
 
     @wsgi.extends
     def detail(self, req, resp_obj):
         context = req.environ['cinder.context']
         if authorize(context):
-            for vol in list(resp_obj.obj['volumes']):
-                self._add_volume_tenant_attribute(req, vol)
+            req.add_annotation('volumes', self._add_volume_tenant_attribute,
+                               (common.VOLUME_ANNOTATION_DB_VOLUME,))
 
 
 class Volume_tenant_attribute(extensions.ExtensionDescriptor):
@@ -54,6 +54,8 @@ REST_API_VERSION_HISTORY = """
     * 3.5 - Add pagination support to messages API.
     * 3.6 - Allows to set empty description and empty name for consistency
             group in consisgroup-update operation.
+    * 3.7 - Add filters and pagination support to scheduler-stats get_pools.
+    * 3.8 - Use opaque cursors as markers in the next links of volume lists.
 
 """
 
@@ -62,7 +64,7 @@ REST_API_VERSION_HISTORY = """
 # minimum version of the API supported.
 # Explicitly using /v1 or /v2 enpoints will still work
 _MIN_API_VERSION = "3.0"
-_MAX_API_VERSION = "3.6"
+_MAX_API_VERSION = "3.8"
 _LEGACY_API_VERSION1 = "1.0"
 _LEGACY_API_VERSION2 = "2.0"
 
@@ -66,6 +66,7 @@ class Request(webob.Request):
     def __init__(self, *args, **kwargs):
         super(Request, self).__init__(*args, **kwargs)
         self._resource_cache = {}
+        self._annotations = {}
         if not hasattr(self, 'api_version_request'):
             self.api_version_request = api_version.APIVersionRequest()
 
@@ -225,6 +226,23 @@ class Request(webob.Request):
     def get_db_backup(self, backup_id):
         return self.get_db_item('backups', backup_id)
 
+    def add_annotation(self, key, annotate, kinds=()):
+        """Queue an annotation of the items of the response.
+
+        Allow API extensions to add attributes to the items of the response
+        entry named key without walking them on their own. Once all the
+        extensions ran, the controller fetches each kind of data listed in
+        kinds for all the items at once, and annotate(item, data) is called
+        for each item in a single pass, data mapping each kind to the
+        fetched data by item id.
+        """
+        self._annotations.setdefault(key, []).append((annotate, kinds))
+
+    def pop_annotations(self):
+        """Return and forget the queued annotations by response key."""
+        annotations, self._annotations = self._annotations, {}
+        return annotations
+
     def best_match_content_type(self):
         """Determine the requested response content-type."""
         if 'cinder.best_content_type' not in self.environ:
@@ -772,6 +790,27 @@ class Resource(wsgi.Application):
         # Run post-processing in the reverse order
         return None, reversed(post)
 
+    def annotate_response(self, request, resp_obj):
+        """Run the annotations queued by the extensions in one pass."""
+        for key, annotations in request.pop_annotations().items():
+            items = (resp_obj.obj or {}).get(key)
+            if not items:
+                continue
+            if isinstance(items, dict):
+                items = [items]
+
+            item_ids = [item['id'] for item in items]
+            data = {}
+            for __, kinds in annotations:
+                for kind in kinds:
+                    if kind not in data:
+                        data[kind] = self.controller.get_annotation_data(
+                            request, kind, item_ids)
+
+            for item in items:
+                for annotate, __ in annotations:
+                    annotate(item, data)
+
     def post_process_extensions(self, extensions, resp_obj, request,
                                 action_args):
         for ext in extensions:
@@ -926,6 +965,12 @@ class Resource(wsgi.Application):
                 # Process post-processing extensions
                 response = self.post_process_extensions(post, resp_obj,
                                                         request, action_args)
+                if not response:
+                    try:
+                        with ResourceExceptionHandler():
+                            self.annotate_response(request, resp_obj)
+                    except Fault as ex:
+                        response = ex
 
             if resp_obj and not response:
                 response = resp_obj.serialize(request, accept,
@@ -133,6 +133,11 @@ class VolumeController(wsgi.Controller):
         self.ext_mgr = ext_mgr
         super(VolumeController, self).__init__()
 
+    def get_annotation_data(self, req, kind, volume_ids):
+        """Fetch the data the extensions annotate the volumes with."""
+        return common.get_volume_annotation_data(req, self.volume_api, kind,
+                                                 volume_ids)
+
     def show(self, req, id):
         """Return data about the given volume."""
         context = req.environ['cinder.context']
@@ -191,7 +196,8 @@ class VolumeController(wsgi.Controller):
                                           sort_keys=['created_at'],
                                           sort_dirs=['desc'],
                                           filters=search_opts,
-                                          viewable_admin_meta=True)
+                                          viewable_admin_meta=True,
+                                          use_slave=True)
 
         for volume in volumes:
             utils.add_visible_admin_metadata(volume)
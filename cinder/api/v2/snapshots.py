@@ -103,7 +103,8 @@ class SnapshotsController(wsgi.Controller):
                                                       limit=limit,
                                                       sort_keys=sort_keys,
                                                       sort_dirs=sort_dirs,
-                                                      offset=offset)
+                                                      offset=offset,
+                                                      use_slave=True)
 
         req.cache_db_snapshots(snapshots.objects)
 
@@ -27,16 +27,19 @@ class ViewBuilder(common.ViewBuilder):
         """Initialize view builder."""
         super(ViewBuilder, self).__init__()
 
-    def summary_list(self, request, volumes, volume_count=None):
+    def summary_list(self, request, volumes, volume_count=None,
+                     next_marker=None):
         """Show a list of volumes without many details."""
         return self._list_view(self.summary, request, volumes,
-                               volume_count)
+                               volume_count, next_marker=next_marker)
 
-    def detail_list(self, request, volumes, volume_count=None):
+    def detail_list(self, request, volumes, volume_count=None,
+                    next_marker=None):
         """Detailed view of a list of volumes."""
         return self._list_view(self.detail, request, volumes,
                                volume_count,
-                               self._collection_name + '/detail')
+                               self._collection_name + '/detail',
+                               next_marker=next_marker)
 
     def summary(self, request, volume):
         """Generic, non-detailed view of a volume."""
@@ -116,7 +119,7 @@ class ViewBuilder(common.ViewBuilder):
             return volume['volume_type_id']
 
     def _list_view(self, func, request, volumes, volume_count,
-                   coll_name=_collection_name):
+                   coll_name=_collection_name, next_marker=None):
         """Provide a view for a list of volumes.
 
         :param func: Function used to format the volume data
@@ -125,13 +128,16 @@ class ViewBuilder(common.ViewBuilder):
         :param volume_count: Length of the original list of volumes
         :param coll_name: Name of collection, used to generate the next link
                           for a pagination query
+        :param next_marker: Marker of the next link, defaults to the id of
+                            the last volume
         :returns: Volume data in dictionary format
         """
         volumes_list = [func(request, volume)['volume'] for volume in volumes]
         volumes_links = self._get_collection_links(request,
                                                    volumes,
                                                    coll_name,
-                                                   volume_count)
+                                                   volume_count,
+                                                   next_marker=next_marker)
         volumes_dict = dict(volumes=volumes_list)
 
         if volumes_links:
@@ -25,6 +25,7 @@ from webob import exc
 from cinder.api import common
 from cinder.api.openstack import wsgi
 from cinder.api.v2.views import volumes as volume_views
+from cinder.common import constants
 from cinder import consistencygroup as consistencygroupAPI
 from cinder import exception
 from cinder.i18n import _, _LI
@@ -50,6 +51,11 @@ class VolumeController(wsgi.Controller):
         self.ext_mgr = ext_mgr
         super(VolumeController, self).__init__()
 
+    def get_annotation_data(self, req, kind, volume_ids):
+        """Fetch the data the extensions annotate the volumes with."""
+        return common.get_volume_annotation_data(req, self.volume_api, kind,
+                                                 volume_ids)
+
     def show(self, req, id):
         """Return data about the given volume."""
         context = req.environ['cinder.context']
@@ -113,15 +119,24 @@ class VolumeController(wsgi.Controller):
             del filters['name']
 
         self.volume_api.check_volume_filters(filters)
+        # The summary view only shows the volume columns so their related
+        # models are not loaded at all.
+        if is_detail:
+            load_profile = constants.VOLUME_LOAD_DETAIL
+        else:
+            load_profile = constants.VOLUME_LOAD_SUMMARY
         volumes = self.volume_api.get_all(context, marker, limit,
                                           sort_keys=sort_keys,
                                           sort_dirs=sort_dirs,
                                           filters=filters,
                                           viewable_admin_meta=True,
-                                          offset=offset)
+                                          offset=offset,
+                                          load_profile=load_profile,
+                                          use_slave=True)
 
-        for volume in volumes:
-            utils.add_visible_admin_metadata(volume)
+        if is_detail:
+            for volume in volumes:
+                utils.add_visible_admin_metadata(volume)
 
         req.cache_db_volumes(volumes.objects)
 
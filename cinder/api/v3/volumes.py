@@ -16,9 +16,13 @@
 from cinder.api import common
 from cinder.api.openstack import wsgi
 from cinder.api.v2 import volumes as volumes_v2
+from cinder.common import constants
 from cinder import utils
 
 
+VOLUME_LIST_CURSOR_MICRO_VERSION = '3.8'
+
+
 class VolumeController(volumes_v2.VolumeController):
     """The Volumes API controller for the OpenStack API V3."""
 
@@ -49,24 +53,54 @@ class VolumeController(volumes_v2.VolumeController):
         strict = req.api_version_request.matches("3.2", None)
         self.volume_api.check_volume_filters(filters, strict)
 
+        # The summary view only shows the volume columns so their related
+        # models are not loaded at all.
+        if is_detail:
+            load_profile = constants.VOLUME_LOAD_DETAIL
+        else:
+            load_profile = constants.VOLUME_LOAD_SUMMARY
         volumes = self.volume_api.get_all(context, marker, limit,
                                           sort_keys=sort_keys,
                                           sort_dirs=sort_dirs,
                                           filters=filters,
                                           viewable_admin_meta=True,
-                                          offset=offset)
+                                          offset=offset,
+                                          load_profile=load_profile,
+                                          use_slave=True)
 
-        for volume in volumes:
-            utils.add_visible_admin_metadata(volume)
+        if is_detail:
+            for volume in volumes:
+                utils.add_visible_admin_metadata(volume)
 
         req.cache_db_volumes(volumes.objects)
 
+        next_marker = None
+        if (req_version.matches(VOLUME_LIST_CURSOR_MICRO_VERSION) and
+                volumes.objects):
+            next_marker = self._get_cursor(volumes.objects[-1], sort_keys)
+
         if is_detail:
-            volumes = self._view_builder.detail_list(req, volumes)
+            volumes = self._view_builder.detail_list(
+                req, volumes, next_marker=next_marker)
         else:
-            volumes = self._view_builder.summary_list(req, volumes)
+            volumes = self._view_builder.summary_list(
+                req, volumes, next_marker=next_marker)
         return volumes
 
+    @staticmethod
+    def _get_cursor(volume, sort_keys):
+        """Return the marker of the page following a volume."""
+        # The database also sorts by created_at and id to get a stable
+        # order, see process_sort_params.
+        keys = list(sort_keys or [])
+        keys.extend(key for key in ('created_at', 'id') if key not in keys)
+        try:
+            values = {key: volume[key] for key in keys}
+        except (AttributeError, KeyError):
+            # Not a volume field, use its id as marker.
+            return None
+        return common.encode_pagination_cursor(values)
+
 
 def create_resource(ext_mgr):
     return wsgi.Resource(VolumeController(ext_mgr))
@@ -117,7 +117,7 @@ class API(base.Base):
         self.backup_rpcapi.delete_backup(context, backup)
 
     def get_all(self, context, search_opts=None, marker=None, limit=None,
-                offset=None, sort_keys=None, sort_dirs=None):
+                offset=None, sort_keys=None, sort_dirs=None, use_slave=False):
         check_policy(context, 'get_all')
 
         search_opts = search_opts or {}
@@ -130,11 +130,13 @@ class API(base.Base):
         if context.is_admin and strutils.bool_from_string(all_tenants):
             backups = objects.BackupList.get_all(context, search_opts,
                                                  marker, limit, offset,
-                                                 sort_keys, sort_dirs)
+                                                 sort_keys, sort_dirs,
+                                                 use_slave=use_slave)
         else:
             backups = objects.BackupList.get_all_by_project(
                 context, context.project_id, search_opts,
-                marker, limit, offset, sort_keys, sort_dirs
+                marker, limit, offset, sort_keys, sort_dirs,
+                use_slave=use_slave
             )
 
         return backups
@@ -230,9 +230,12 @@ class BackupManager(manager.SchedulerDependentManager):
         # TODO(smulcahy) implement full resume of backup and restore
         # operations on restart (rather than simply resetting)
         backups = objects.BackupList.get_all_by_host(ctxt, self.host)
+        # The volume status resets are written together at the end
+        volume_updates = []
         for backup in backups:
             try:
-                self._cleanup_one_backup(ctxt, backup)
+                self._cleanup_one_backup(ctxt, backup,
+                                         volume_updates=volume_updates)
             except Exception:
                 LOG.exception(_LE("Problem cleaning up backup %(bkup)s."),
                               {'bkup': backup['id']})
@@ -244,29 +247,47 @@ class BackupManager(manager.SchedulerDependentManager):
                                   "snapshots for backup %(bkup)s."),
                               {'bkup': backup['id']})
 
-    def _cleanup_one_volume(self, ctxt, volume):
+        if volume_updates:
+            try:
+                self.db.volume_update_all(ctxt, updates=volume_updates)
+            except Exception:
+                LOG.exception(_LE("Problem resetting the status of the "
+                                  "volumes of incomplete backups."))
+
+    def _cleanup_one_volume(self, ctxt, volume, volume_updates=None):
+        """Reset the status of a volume left by a backup or a restore.
+
+        The new status is appended to `volume_updates` as a (volume_id,
+        values) pair when it is given, and written right away otherwise.
+        """
         if volume['status'] == 'backing-up':
             self._detach_all_attachments(ctxt, volume)
             LOG.info(_LI('Resetting volume %(vol_id)s to previous '
                          'status %(status)s (was backing-up).'),
                      {'vol_id': volume['id'],
                       'status': volume['previous_status']})
-            self.db.volume_update(ctxt, volume['id'],
-                                  {'status': volume['previous_status']})
+            values = {'status': volume['previous_status']}
         elif volume['status'] == 'restoring-backup':
             self._detach_all_attachments(ctxt, volume)
             LOG.info(_LI('setting volume %s to error_restoring '
                          '(was restoring-backup).'), volume['id'])
-            self.db.volume_update(ctxt, volume['id'],
-                                  {'status': 'error_restoring'})
+            values = {'status': 'error_restoring'}
+        else:
+            return
+
+        if volume_updates is None:
+            self.db.volume_update(ctxt, volume['id'], values)
+        else:
+            volume_updates.append((volume['id'], values))
 
-    def _cleanup_one_backup(self, ctxt, backup):
+    def _cleanup_one_backup(self, ctxt, backup, volume_updates=None):
         if backup['status'] == fields.BackupStatus.CREATING:
             LOG.info(_LI('Resetting backup %s to error (was creating).'),
                      backup['id'])
 
             volume = objects.Volume.get_by_id(ctxt, backup.volume_id)
-            self._cleanup_one_volume(ctxt, volume)
+            self._cleanup_one_volume(ctxt, volume,
+                                     volume_updates=volume_updates)
 
             err = 'incomplete backup reset on manager restart'
             self._update_backup_error(backup, ctxt, err)
@@ -275,7 +296,8 @@ class BackupManager(manager.SchedulerDependentManager):
                          'available (was restoring).'),
                      backup['id'])
             volume = objects.Volume.get_by_id(ctxt, backup.restore_volume_id)
-            self._cleanup_one_volume(ctxt, volume)
+            self._cleanup_one_volume(ctxt, volume,
+                                     volume_updates=volume_updates)
 
             backup.status = fields.BackupStatus.AVAILABLE
             backup.save()
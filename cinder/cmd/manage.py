@@ -223,21 +223,59 @@ class DbCommands(object):
 
     @args('age_in_days', type=int,
           help='Purge deleted rows older than age in days')
-    def purge(self, age_in_days):
+    @args('--batch_size', type=int, default=1000,
+          help='Number of rows deleted per transaction '
+               '(default: %(default)s)')
+    @args('--sleep', type=float, default=0,
+          help='Seconds to wait between batches (default: %(default)s)')
+    @args('--max_runtime', type=int, default=None,
+          help='Stop purging after this many seconds, running the '
+               'command again resumes the purge')
+    def purge(self, age_in_days, batch_size=1000, sleep=0, max_runtime=None):
         """Purge deleted rows older than a given age from cinder tables."""
         age_in_days = int(age_in_days)
         if age_in_days <= 0:
             print(_("Must supply a positive, non-zero value for age"))
             sys.exit(1)
+        if batch_size <= 0:
+            print(_("Must supply a positive, non-zero value for batch size"))
+            sys.exit(1)
         ctxt = context.get_admin_context()
 
         try:
-            db.purge_deleted_rows(ctxt, age_in_days)
+            purged, done = db.purge_deleted_rows(ctxt, age_in_days,
+                                                 batch_size=batch_size,
+                                                 sleep=sleep,
+                                                 max_runtime=max_runtime)
         except db_exc.DBReferenceError:
             print(_("Purge command failed, check cinder-manage "
                     "logs for more details."))
             sys.exit(1)
 
+        for table, rows in purged.items():
+            print(_("%(table)-30s\t%(rows)d") % {'table': table, 'rows': rows})
+        if not done:
+            print(_("Purge stopped after %d seconds, run the command again "
+                    "to purge the remaining rows.") % max_runtime)
+
+    @args('--project_id', default=None,
+          help='Only rebuild the counters of this project')
+    def reconcile_usage_counters(self, project_id=None):
+        """Rebuild the volume and snapshot usage counters of the projects."""
+        ctxt = context.get_admin_context()
+        fixed = db.usage_counters_reconcile(ctxt, project_id=project_id)
+        for project_id, volume_type_id, old, new in fixed:
+            for counter in sorted(new):
+                if old[counter] != new[counter]:
+                    print(_("%(project)-32s\t%(type)-36s\t%(counter)-18s\t"
+                            "%(old)d -> %(new)d") %
+                          {'project': project_id,
+                           'type': volume_type_id or '-',
+                           'counter': counter,
+                           'old': old[counter], 'new': new[counter]})
+        print(_("Fixed the usage counters of %d project and volume type "
+                "pairs.") % len(fixed))
+
 
 class VersionCommands(object):
     """Class for exposing the codebase version."""
@@ -142,6 +142,25 @@ global_opts = [
                      'storage_availability_zone, instead of failing.'),
     cfg.StrOpt('default_volume_type',
                help='Default volume type to use'),
+    cfg.IntOpt('volume_type_cache_ttl',
+               default=30,
+               min=0,
+               help='Number of seconds a process remembers a volume type, '
+                    'its extra specs and its QoS specs. Changes made '
+                    'through another process are only seen once the '
+                    'cached entry expires, unless '
+                    'volume_type_cache_notifications is enabled. Set to 0 '
+                    'to always read them from the database.'),
+    cfg.BoolOpt('volume_type_cache_notifications',
+                default=False,
+                help='Whether the services listen to the volume type, '
+                     'extra specs and QoS specs notifications sent by the '
+                     'API to forget their cached copies of the changed '
+                     'volume types. Each service process gets its own '
+                     'notification pool, named volume-type-cache.<binary>.'
+                     '<host>.<worker number>. Worker numbers are claimed '
+                     'with lock files in [oslo_concurrency]/lock_path, '
+                     'which must be set.'),
     cfg.StrOpt('volume_usage_audit_period',
                default='month',
                help='Time period for which to generate volume usages. '
@@ -160,6 +179,13 @@ global_opts = [
                default=60,
                help='Maximum time since last check-in for a service to be '
                     'considered up'),
+    cfg.IntOpt('full_capabilities_report_interval',
+               default=10,
+               min=0,
+               help='Number of periodic capability reports sent to the '
+                    'schedulers between two full reports. The other '
+                    'reports only contain what changed since the previous '
+                    'one. Set to 0 to always send full reports.'),
     cfg.StrOpt('volume_api_class',
                default='cinder.volume.api.API',
                help='The full class name of the volume API class to use'),
@@ -178,6 +204,13 @@ global_opts = [
     cfg.BoolOpt('no_snapshot_gb_quota',
                 default=False,
                 help='Whether snapshots count against gigabyte quota'),
+    cfg.BoolOpt('quota_usage_counters',
+                default=True,
+                help='Whether quota usage refreshes read the volume and '
+                     'snapshot usage counters kept per project and volume '
+                     'type, instead of counting the volumes and snapshots '
+                     'of the project. Run "cinder-manage db '
+                     'reconcile_usage_counters" to rebuild the counters.'),
     cfg.StrOpt('transfer_api_class',
                default='cinder.transfer.api.API',
                help='The full class name of the volume transfer API class'),
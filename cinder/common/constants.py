@@ -16,3 +16,10 @@
 
 # The maximum value a signed INT type may have
 DB_MAX_INT = 0x7FFFFFFF
+
+# How the related models of a list of volumes are loaded: the summary
+# profile loads the volume columns only and the detail profile fetches each
+# relationship with a separate batched query.
+VOLUME_LOAD_SUMMARY = 'summary'
+VOLUME_LOAD_DETAIL = 'detail'
+VOLUME_LOAD_PROFILES = (VOLUME_LOAD_SUMMARY, VOLUME_LOAD_DETAIL)
@@ -31,7 +31,8 @@ LOG = logging.getLogger(__name__)
 
 # copied from glance/db/sqlalchemy/api.py
 def paginate_query(query, model, limit, sort_keys, marker=None,
-                   sort_dir=None, sort_dirs=None, offset=None):
+                   sort_dir=None, sort_dirs=None, offset=None,
+                   marker_values=None):
     """Returns a query with sorting / pagination criteria added.
 
     Pagination works by requiring a unique sort_key, specified by sort_keys.
@@ -57,6 +58,9 @@ def paginate_query(query, model, limit, sort_keys, marker=None,
                     results after this value.
     :param sort_dir: direction in which results should be sorted (asc, desc)
     :param sort_dirs: per-column array of sort_dirs, corresponding to sort_keys
+    :param offset: number of items to skip
+    :param marker_values: values of the sort keys of the last item of the
+                          previous page, can be given instead of marker
 
     :rtype: sqlalchemy.orm.query.Query
     :return: The query with sorting/pagination added.
@@ -99,6 +103,7 @@ def paginate_query(query, model, limit, sort_keys, marker=None,
             v = getattr(marker, sort_key)
             marker_values.append(v)
 
+    if marker_values is not None:
         # Build up an array of sort criteria as in the docstring
         criteria_list = []
         for i in range(0, len(sort_keys)):
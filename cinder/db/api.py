@@ -112,14 +112,15 @@ def service_get(context, service_id=None, **filters):
     return IMPL.service_get(context, service_id, **filters)
 
 
-def service_get_all(context, **filters):
+def service_get_all(context, use_slave=False, **filters):
     """Get all services that match the criteria.
 
     A possible filter is is_up=True and it will filter nodes that are down.
 
+    :param use_slave: Whether to read from the slave database.
     :param filters: Filters for the query in the form of key/value arguments.
     """
-    return IMPL.service_get_all(context, **filters)
+    return IMPL.service_get_all(context, use_slave=use_slave, **filters)
 
 
 def service_create(context, values):
@@ -167,6 +168,18 @@ def volume_data_get_for_project(context, project_id):
     return IMPL.volume_data_get_for_project(context, project_id)
 
 
+def usage_counters_reconcile(context, project_id=None):
+    """Rebuild the volume and snapshot usage counters of the projects.
+
+    The counters are recomputed from the volumes and snapshots tables, for
+    all the projects or only for `project_id`.
+
+    :returns: a list of (project_id, volume_type_id, old counters, new
+              counters) for the counters that were wrong
+    """
+    return IMPL.usage_counters_reconcile(context, project_id=project_id)
+
+
 def volume_destroy(context, volume_id):
     """Destroy the volume or raise if it does not exist."""
     return IMPL.volume_destroy(context, volume_id)
@@ -183,11 +196,13 @@ def volume_get(context, volume_id):
 
 
 def volume_get_all(context, marker, limit, sort_keys=None, sort_dirs=None,
-                   filters=None, offset=None):
+                   filters=None, offset=None, load_profile=None,
+                   use_slave=False):
     """Get all volumes."""
     return IMPL.volume_get_all(context, marker, limit, sort_keys=sort_keys,
                                sort_dirs=sort_dirs, filters=filters,
-                               offset=offset)
+                               offset=offset, load_profile=load_profile,
+                               use_slave=use_slave)
 
 
 def volume_get_all_by_host(context, host, filters=None):
@@ -202,13 +217,16 @@ def volume_get_all_by_group(context, group_id, filters=None):
 
 def volume_get_all_by_project(context, project_id, marker, limit,
                               sort_keys=None, sort_dirs=None, filters=None,
-                              offset=None):
+                              offset=None, load_profile=None,
+                              use_slave=False):
     """Get all volumes belonging to a project."""
     return IMPL.volume_get_all_by_project(context, project_id, marker, limit,
                                           sort_keys=sort_keys,
                                           sort_dirs=sort_dirs,
                                           filters=filters,
-                                          offset=offset)
+                                          offset=offset,
+                                          load_profile=load_profile,
+                                          use_slave=use_slave)
 
 
 def volume_update(context, volume_id, values):
@@ -220,6 +238,20 @@ def volume_update(context, volume_id, values):
     return IMPL.volume_update(context, volume_id, values)
 
 
+def volume_update_all(context, updates=None, filters=None, values=None):
+    """Update many volumes with a few set-based statements.
+
+    Takes either a list of (volume_id, values) pairs in `updates`, or the
+    `filters` selecting the volumes and the `values` to set on all of them.
+    Only volume columns can be updated, not metadata nor the project, type
+    and size the usage counters depend on.
+
+    :returns: the number of updated volumes
+    """
+    return IMPL.volume_update_all(context, updates=updates, filters=filters,
+                                  values=values)
+
+
 def volume_attachment_update(context, attachment_id, values):
     return IMPL.volume_attachment_update(context, attachment_id, values)
 
@@ -287,19 +319,21 @@ def snapshot_get(context, snapshot_id):
 
 
 def snapshot_get_all(context, filters=None, marker=None, limit=None,
-                     sort_keys=None, sort_dirs=None, offset=None):
+                     sort_keys=None, sort_dirs=None, offset=None,
+                     use_slave=False):
     """Get all snapshots."""
     return IMPL.snapshot_get_all(context, filters, marker, limit, sort_keys,
-                                 sort_dirs, offset)
+                                 sort_dirs, offset, use_slave=use_slave)
 
 
 def snapshot_get_all_by_project(context, project_id, filters=None, marker=None,
                                 limit=None, sort_keys=None, sort_dirs=None,
-                                offset=None):
+                                offset=None, use_slave=False):
     """Get all snapshots belonging to a project."""
     return IMPL.snapshot_get_all_by_project(context, project_id, filters,
                                             marker, limit, sort_keys,
-                                            sort_dirs, offset)
+                                            sort_dirs, offset,
+                                            use_slave=use_slave)
 
 
 def snapshot_get_by_host(context, host, filters=None):
@@ -330,6 +364,20 @@ def snapshot_update(context, snapshot_id, values):
     return IMPL.snapshot_update(context, snapshot_id, values)
 
 
+def snapshot_update_all(context, updates=None, filters=None, values=None):
+    """Update many snapshots with a few set-based statements.
+
+    Takes either a list of (snapshot_id, values) pairs in `updates`, or the
+    `filters` selecting the snapshots and the `values` to set on all of
+    them. Only snapshot columns can be updated, not metadata nor the
+    project, volume and size the usage counters depend on.
+
+    :returns: the number of updated snapshots
+    """
+    return IMPL.snapshot_update_all(context, updates=updates,
+                                    filters=filters, values=values)
+
+
 def snapshot_data_get_for_project(context, project_id, volume_type_id=None):
     """Get count and gigabytes used for snapshots for specified project."""
     return IMPL.snapshot_data_get_for_project(context,
@@ -889,11 +937,12 @@ def backup_get(context, backup_id, read_deleted=None, project_only=True):
 
 
 def backup_get_all(context, filters=None, marker=None, limit=None,
-                   offset=None, sort_keys=None, sort_dirs=None):
+                   offset=None, sort_keys=None, sort_dirs=None,
+                   use_slave=False):
     """Get all backups."""
     return IMPL.backup_get_all(context, filters=filters, marker=marker,
                                limit=limit, offset=offset, sort_keys=sort_keys,
-                               sort_dirs=sort_dirs)
+                               sort_dirs=sort_dirs, use_slave=use_slave)
 
 
 def backup_get_all_by_host(context, host):
@@ -908,13 +957,14 @@ def backup_create(context, values):
 
 def backup_get_all_by_project(context, project_id, filters=None, marker=None,
                               limit=None, offset=None, sort_keys=None,
-                              sort_dirs=None):
+                              sort_dirs=None, use_slave=False):
     """Get all backups belonging to a project."""
     return IMPL.backup_get_all_by_project(context, project_id,
                                           filters=filters, marker=marker,
                                           limit=limit, offset=offset,
                                           sort_keys=sort_keys,
-                                          sort_dirs=sort_dirs)
+                                          sort_dirs=sort_dirs,
+                                          use_slave=use_slave)
 
 
 def backup_get_all_by_volume(context, volume_id, filters=None):
@@ -1095,13 +1145,20 @@ def cgsnapshot_creating_from_src():
 ###################
 
 
-def purge_deleted_rows(context, age_in_days):
+def purge_deleted_rows(context, age_in_days, batch_size=1000, sleep=0,
+                       max_runtime=None):
     """Purge deleted rows older than given age from cinder tables
 
-    Raises InvalidParameterValue if age_in_days is incorrect.
-    :returns: number of deleted rows
+    Rows are deleted batch_size at a time, waiting sleep seconds between
+    batches, and purging stops once it ran for max_runtime seconds.
+
+    Raises InvalidParameterValue if age_in_days or batch_size is incorrect.
+    :returns: tuple of a dict of the number of deleted rows by table name
+              and whether all the rows were deleted before max_runtime
     """
-    return IMPL.purge_deleted_rows(context, age_in_days=age_in_days)
+    return IMPL.purge_deleted_rows(context, age_in_days=age_in_days,
+                                   batch_size=batch_size, sleep=sleep,
+                                   max_runtime=max_runtime)
 
 
 def get_booleans_for_table(table_name):
@@ -43,18 +43,19 @@ import sqlalchemy
 from sqlalchemy import MetaData
 from sqlalchemy import or_, and_, case
 from sqlalchemy.orm import aliased
-from sqlalchemy.orm import joinedload, joinedload_all
+from sqlalchemy.orm import joinedload, joinedload_all, subqueryload
 from sqlalchemy.orm import RelationshipProperty
-from sqlalchemy.schema import Table
 from sqlalchemy import sql
 from sqlalchemy.sql.expression import bindparam
 from sqlalchemy.sql.expression import desc
+from sqlalchemy.sql.expression import false
 from sqlalchemy.sql.expression import literal_column
 from sqlalchemy.sql.expression import true
 from sqlalchemy.sql import func
 from sqlalchemy.sql import sqltypes
 
 from cinder.api import common
+from cinder.common import constants
 from cinder.common import sqlalchemyutils
 from cinder import db
 from cinder.db.sqlalchemy import models
@@ -70,6 +71,8 @@ options.set_defaults(CONF, connection='sqlite:///$state_path/cinder.sqlite')
 
 _LOCK = threading.Lock()
 _FACADE = None
+# Tracks whether the current thread runs a read only DB API call.
+_READER = threading.local()
 
 
 def _create_facade_lazily():
@@ -96,14 +99,42 @@ def _create_facade_lazily():
         return _FACADE
 
 
-def get_engine():
+def get_engine(use_slave=False):
     facade = _create_facade_lazily()
-    return facade.get_engine()
+    return facade.get_engine(use_slave=use_slave)
 
 
-def get_session(**kwargs):
+def get_session(use_slave=False, **kwargs):
+    """Return a session, on the slave database inside read only calls.
+
+    Without a [database]/slave_connection the sessions of read only calls
+    use the main database too.
+    """
     facade = _create_facade_lazily()
-    return facade.get_session(**kwargs)
+    use_slave = use_slave or getattr(_READER, 'active', False)
+    return facade.get_session(use_slave=use_slave, **kwargs)
+
+
+def _read_only(f):
+    """Decorator to let a DB API call that doesn't write use the slave DB.
+
+    The decorated call takes a use_slave keyword argument, and only runs on
+    the slave database when its caller passes use_slave=True. Only callers
+    serving listings that can tolerate the replication lag of the slave
+    database should ask for it, reads made to decide on a write must stay
+    on the main database.
+    """
+    @functools.wraps(f)
+    def wrapped(*args, **kwargs):
+        use_slave = kwargs.pop('use_slave', False)
+        if not use_slave or getattr(_READER, 'active', False):
+            return f(*args, **kwargs)
+        _READER.active = True
+        try:
+            return f(*args, **kwargs)
+        finally:
+            _READER.active = False
+    return wrapped
 
 
 def dispose_engine():
@@ -292,7 +323,7 @@ def model_query(context, *args, **kwargs):
 
 def _sync_volumes(context, project_id, session, volume_type_id=None,
                   volume_type_name=None):
-    (volumes, _gigs) = _volume_data_get_for_project(
+    (volumes, _gigs) = _volume_usage_get_for_project(
         context, project_id, volume_type_id=volume_type_id, session=session)
     key = 'volumes'
     if volume_type_name:
@@ -302,7 +333,7 @@ def _sync_volumes(context, project_id, session, volume_type_id=None,
 
 def _sync_snapshots(context, project_id, session, volume_type_id=None,
                     volume_type_name=None):
-    (snapshots, _gigs) = _snapshot_data_get_for_project(
+    (snapshots, _gigs) = _snapshot_usage_get_for_project(
         context, project_id, volume_type_id=volume_type_id, session=session)
     key = 'snapshots'
     if volume_type_name:
@@ -320,14 +351,14 @@ def _sync_backups(context, project_id, session, volume_type_id=None,
 
 def _sync_gigabytes(context, project_id, session, volume_type_id=None,
                     volume_type_name=None):
-    (_junk, vol_gigs) = _volume_data_get_for_project(
+    (_junk, vol_gigs) = _volume_usage_get_for_project(
         context, project_id, volume_type_id=volume_type_id, session=session)
     key = 'gigabytes'
     if volume_type_name:
         key += '_' + volume_type_name
     if CONF.no_snapshot_gb_quota:
         return {key: vol_gigs}
-    (_junk, snap_gigs) = _snapshot_data_get_for_project(
+    (_junk, snap_gigs) = _snapshot_usage_get_for_project(
         context, project_id, volume_type_id=volume_type_id, session=session)
     return {key: vol_gigs + snap_gigs}
 
@@ -431,6 +462,7 @@ def service_get(context, service_id=None, **filters):
 
 
 @require_admin_context
+@_read_only
 def service_get_all(context, **filters):
     """Get all services that match the criteria.
 
@@ -782,19 +814,15 @@ def _quota_usage_create(context, project_id, resource, in_use, reserved,
 ###################
 
 
-def _reservation_create(context, uuid, usage, project_id, resource, delta,
-                        expire, session=None, allocated_id=None):
-    usage_id = usage['id'] if usage else None
-    reservation_ref = models.Reservation()
-    reservation_ref.uuid = uuid
-    reservation_ref.usage_id = usage_id
-    reservation_ref.project_id = project_id
-    reservation_ref.resource = resource
-    reservation_ref.delta = delta
-    reservation_ref.expire = expire
-    reservation_ref.allocated_id = allocated_id
-    reservation_ref.save(session=session)
-    return reservation_ref
+def _reservations_create(context, reservations, session=None):
+    """Insert the given reservations with a single statement.
+
+    :param reservations: list of dicts of reservation fields
+    :returns: the uuids of the reservations
+    """
+    session = session or get_session()
+    session.bulk_insert_mappings(models.Reservation, reservations)
+    return [reservation['uuid'] for reservation in reservations]
 
 
 ###################
@@ -805,13 +833,17 @@ def _reservation_create(context, uuid, usage, project_id, resource, delta,
 # code always acquires the lock on quota_usages before acquiring the lock
 # on reservations.
 
-def _get_quota_usages(context, session, project_id):
+def _get_quota_usages(context, session, project_id, resources=None):
     # Broken out for testability
-    rows = model_query(context, models.QuotaUsage,
-                       read_deleted="no",
-                       session=session).\
-        filter_by(project_id=project_id).\
-        order_by(models.QuotaUsage.id.asc()).\
+    query = model_query(context, models.QuotaUsage,
+                        read_deleted="no",
+                        session=session).\
+        filter_by(project_id=project_id)
+    if resources is not None:
+        # Only lock the usages that are going to be changed so requests
+        # touching other resources of the project don't wait on them.
+        query = query.filter(models.QuotaUsage.resource.in_(resources))
+    rows = query.order_by(models.QuotaUsage.id.asc()).\
         with_lockmode('update').\
         all()
     return {row.resource: row for row in rows}
@@ -851,7 +883,8 @@ def quota_reserve(context, resources, quotas, deltas, expire,
             project_id = context.project_id
 
         # Get the current usages
-        usages = _get_quota_usages(context, session, project_id)
+        usages = _get_quota_usages(context, session, project_id,
+                                   resources=list(deltas))
         allocated = quota_allocated_get_all_by_project(context, project_id)
         allocated.pop('project_id')
 
@@ -879,8 +912,8 @@ def quota_reserve(context, resources, quotas, deltas, expire,
                 if usages[resource].until_refresh <= 0:
                     refresh = True
             elif max_age and usages[resource].updated_at is not None and (
-                (usages[resource].updated_at -
-                    timeutils.utcnow()).seconds >= max_age):
+                (timeutils.utcnow() -
+                    usages[resource].updated_at).total_seconds() >= max_age):
                 refresh = True
 
             # OK, refresh the usage
@@ -897,6 +930,9 @@ def quota_reserve(context, resources, quotas, deltas, expire,
                                session=session)
                 for res, in_use in updates.items():
                     # Make sure we have a destination for the usage!
+                    if res not in usages:
+                        usages.update(_get_quota_usages(
+                            context, session, project_id, resources=[res]))
                     if res not in usages:
                         usages[res] = _quota_usage_create(
                             elevated,
@@ -951,7 +987,7 @@ def quota_reserve(context, resources, quotas, deltas, expire,
 
         # Create the reservations
         if not overs:
-            reservations = []
+            new_reservations = []
             for resource, delta in deltas.items():
                 usage = usages[resource]
                 allocated_id = None
@@ -969,11 +1005,14 @@ def quota_reserve(context, resources, quotas, deltas, expire,
                                            quota.allocated + delta)
                     allocated_id = quota.id
                     usage = None
-                reservation = _reservation_create(
-                    elevated, str(uuid.uuid4()), usage, project_id, resource,
-                    delta, expire, session=session, allocated_id=allocated_id)
-
-                reservations.append(reservation.uuid)
+                usage_id = usage.id if usage else None
+                new_reservations.append({'uuid': str(uuid.uuid4()),
+                                         'usage_id': usage_id,
+                                         'project_id': project_id,
+                                         'resource': resource,
+                                         'delta': delta,
+                                         'expire': expire,
+                                         'allocated_id': allocated_id})
 
                 # Also update the reserved quantity
                 # NOTE(Vek): Again, we are only concerned here about
@@ -990,6 +1029,9 @@ def quota_reserve(context, resources, quotas, deltas, expire,
                 if delta > 0 and not is_allocated_reserve:
                     usages[resource].reserved += delta
 
+            reservations = _reservations_create(elevated, new_reservations,
+                                                session=session)
+
     if unders:
         LOG.warning(_LW("Change will make usage less than 0 for the following "
                         "resources: %s"), unders)
@@ -1199,9 +1241,15 @@ def volume_create(context, values):
         values['id'] = str(uuid.uuid4())
     volume_ref.update(values)
 
+    _usage_counters_ensure(context, volume_ref.project_id,
+                           volume_ref.volume_type_id)
     session = get_session()
     with session.begin():
         session.add(volume_ref)
+        if not volume_ref.deleted:
+            _usage_counters_add(context, session, volume_ref.project_id,
+                                volume_ref.volume_type_id, volumes=1,
+                                gigabytes=int(volume_ref.size or 0))
 
     return _volume_get(context, values['id'], session=session)
 
@@ -1281,19 +1329,225 @@ def volume_data_get_for_project(context, project_id, volume_type_id=None):
     return _volume_data_get_for_project(context, project_id, volume_type_id)
 
 
+USAGE_COUNTERS = ('volumes', 'gigabytes', 'snapshots', 'snapshot_gigabytes')
+
+
+def _usage_counters_query(context, project_id, volume_type_id, session=None):
+    return model_query(context, models.UsageCounter, session=session,
+                       read_deleted='no').\
+        filter_by(project_id=project_id, volume_type_id=volume_type_id or '')
+
+
+def _usage_counters_ensure(context, project_id, volume_type_id):
+    """Create the zeroed counters of a project and type if they are missing.
+
+    This runs in its own transaction before the counters are updated, so
+    concurrent requests creating the first volume of a project and type
+    don't fail each other's transaction on the unique constraint.
+    """
+    if not project_id:
+        return
+    session = get_session()
+    if _usage_counters_query(context, project_id, volume_type_id,
+                             session=session).count():
+        return
+    try:
+        with session.begin():
+            counter = models.UsageCounter(
+                project_id=project_id, volume_type_id=volume_type_id or '',
+                **dict.fromkeys(USAGE_COUNTERS, 0))
+            session.add(counter)
+    except db_exc.DBDuplicateEntry:
+        pass
+
+
+def _usage_counters_add(context, session, project_id, volume_type_id,
+                        **deltas):
+    """Add deltas to the usage counters of a project and volume type."""
+    deltas = {name: delta for name, delta in deltas.items() if delta}
+    if not project_id or not deltas:
+        return
+    values = {name: getattr(models.UsageCounter, name) + delta
+              for name, delta in deltas.items()}
+    updated = _usage_counters_query(context, project_id, volume_type_id,
+                                    session=session).\
+        update(values, synchronize_session=False)
+    if not updated:
+        # NOTE: Only reached when _usage_counters_ensure wasn't called first
+        counter = models.UsageCounter(project_id=project_id,
+                                      volume_type_id=volume_type_id or '',
+                                      **dict.fromkeys(USAGE_COUNTERS, 0))
+        counter.update(deltas)
+        session.add(counter)
+
+
+def _usage_counters_get(context, project_id, volume_type_id=None,
+                        session=None):
+    """Return the usage counters of a project, or of one of its types."""
+    query = model_query(context,
+                        *[func.sum(getattr(models.UsageCounter, name))
+                          for name in USAGE_COUNTERS],
+                        read_deleted='no', session=session).\
+        filter_by(project_id=project_id)
+
+    if volume_type_id:
+        query = query.filter_by(volume_type_id=volume_type_id)
+
+    result = query.first()
+    return {name: int(value or 0)
+            for name, value in zip(USAGE_COUNTERS, result)}
+
+
+def _volume_usage_get_for_project(context, project_id, volume_type_id=None,
+                                  session=None):
+    """Return the volume count and gigabytes used by a project."""
+    if not CONF.quota_usage_counters:
+        return _volume_data_get_for_project(
+            context, project_id, volume_type_id=volume_type_id,
+            session=session)
+    counters = _usage_counters_get(context, project_id,
+                                   volume_type_id=volume_type_id,
+                                   session=session)
+    return counters['volumes'], counters['gigabytes']
+
+
+def _snapshot_usage_get_for_project(context, project_id, volume_type_id=None,
+                                    session=None):
+    """Return the snapshot count and gigabytes used by a project."""
+    if not CONF.quota_usage_counters:
+        return _snapshot_data_get_for_project(
+            context, project_id, volume_type_id=volume_type_id,
+            session=session)
+    counters = _usage_counters_get(context, project_id,
+                                   volume_type_id=volume_type_id,
+                                   session=session)
+    return counters['snapshots'], counters['snapshot_gigabytes']
+
+
+def _volume_usage_move(context, session, volume_ref, project_id,
+                       volume_type_id, size):
+    """Move the usage of a volume after its project, type or size changed.
+
+    :param volume_ref: the volume with its new values
+    :param project_id: the previous project of the volume
+    :param volume_type_id: the previous type of the volume
+    :param size: the previous size of the volume
+    """
+    if volume_ref.deleted or (volume_ref.project_id,
+                              volume_ref.volume_type_id,
+                              volume_ref.size) == (project_id,
+                                                   volume_type_id, size):
+        return
+    _usage_counters_add(context, session, project_id, volume_type_id,
+                        volumes=-1, gigabytes=-int(size or 0))
+    _usage_counters_add(context, session, volume_ref.project_id,
+                        volume_ref.volume_type_id, volumes=1,
+                        gigabytes=int(volume_ref.size or 0))
+
+    if (volume_type_id or '') == (volume_ref.volume_type_id or ''):
+        return
+    # The snapshots are counted with the type of their volume
+    snapshots = model_query(context, models.Snapshot.project_id,
+                            func.count(models.Snapshot.id),
+                            func.sum(models.Snapshot.volume_size),
+                            read_deleted='no', session=session).\
+        filter_by(volume_id=volume_ref.id).\
+        group_by(models.Snapshot.project_id).\
+        all()
+    for snap_project_id, count, gigabytes in snapshots:
+        _usage_counters_add(context, session, snap_project_id,
+                            volume_type_id, snapshots=-count,
+                            snapshot_gigabytes=-int(gigabytes or 0))
+        _usage_counters_add(context, session, snap_project_id,
+                            volume_ref.volume_type_id, snapshots=count,
+                            snapshot_gigabytes=int(gigabytes or 0))
+
+
+@require_admin_context
+@_retry_on_deadlock
+def usage_counters_reconcile(context, project_id=None):
+    """Rebuild the usage counters from the volumes and snapshots."""
+    expected = collections.defaultdict(
+        lambda: dict.fromkeys(USAGE_COUNTERS, 0))
+
+    session = get_session()
+    with session.begin():
+        counters = model_query(context, models.UsageCounter,
+                               read_deleted='no', session=session)
+        volumes = model_query(context, models.Volume.project_id,
+                              models.Volume.volume_type_id,
+                              func.count(models.Volume.id),
+                              func.sum(models.Volume.size),
+                              read_deleted='no', session=session).\
+            filter(models.Volume.project_id.isnot(None))
+        snapshots = model_query(context, models.Snapshot.project_id,
+                                models.Volume.volume_type_id,
+                                func.count(models.Snapshot.id),
+                                func.sum(models.Snapshot.volume_size),
+                                read_deleted='no', session=session).\
+            outerjoin(models.Volume,
+                      models.Snapshot.volume_id == models.Volume.id).\
+            filter(models.Snapshot.project_id.isnot(None))
+        if project_id:
+            counters = counters.filter_by(project_id=project_id)
+            volumes = volumes.filter(models.Volume.project_id == project_id)
+            snapshots = snapshots.filter(
+                models.Snapshot.project_id == project_id)
+
+        # Lock the counters so they don't change while they are rebuilt
+        counters = counters.with_for_update().all()
+        for row_project_id, volume_type_id, count, gigabytes in volumes.\
+                group_by(models.Volume.project_id,
+                         models.Volume.volume_type_id):
+            values = expected[(row_project_id, volume_type_id or '')]
+            values['volumes'] += count
+            values['gigabytes'] += int(gigabytes or 0)
+        for row_project_id, volume_type_id, count, gigabytes in snapshots.\
+                group_by(models.Snapshot.project_id,
+                         models.Volume.volume_type_id):
+            values = expected[(row_project_id, volume_type_id or '')]
+            values['snapshots'] += count
+            values['snapshot_gigabytes'] += int(gigabytes or 0)
+
+        fixed = []
+        for counter in counters:
+            key = (counter.project_id, counter.volume_type_id)
+            values = expected.pop(key, dict.fromkeys(USAGE_COUNTERS, 0))
+            current = {name: counter[name] for name in USAGE_COUNTERS}
+            if current != values:
+                fixed.append(key + (current, values))
+                counter.update(values)
+        for key, values in expected.items():
+            fixed.append(key + (dict.fromkeys(USAGE_COUNTERS, 0), values))
+            counter = models.UsageCounter(project_id=key[0],
+                                          volume_type_id=key[1])
+            counter.update(values)
+            session.add(counter)
+    return fixed
+
+
 @require_admin_context
 @_retry_on_deadlock
 def volume_destroy(context, volume_id):
     session = get_session()
     now = timeutils.utcnow()
     with session.begin():
-        model_query(context, models.Volume, session=session).\
+        usage = model_query(context, models.Volume.project_id,
+                            models.Volume.volume_type_id, models.Volume.size,
+                            session=session).\
+            filter_by(id=volume_id).\
+            first()
+        deleted = model_query(context, models.Volume, session=session).\
             filter_by(id=volume_id).\
             update({'status': 'deleted',
                     'deleted': True,
                     'deleted_at': now,
                     'updated_at': literal_column('updated_at'),
                     'migration_status': None})
+        if usage and deleted:
+            _usage_counters_add(context, session, usage.project_id,
+                                usage.volume_type_id, volumes=-1,
+                                gigabytes=-int(usage.size or 0))
         model_query(context, models.VolumeMetadata, session=session).\
             filter_by(volume_id=volume_id).\
             update({'deleted': True,
@@ -1364,7 +1618,7 @@ def volume_detached(context, volume_id, attachment_id):
 
 @require_context
 def _volume_get_query(context, session=None, project_only=False,
-                      joined_load=True):
+                      joined_load=True, load_profile=None):
     """Get the query to retrieve the volume.
 
     :param context: the context used to run the method _volume_get_query
@@ -1376,22 +1630,38 @@ def _volume_get_query(context, session=None, project_only=False,
                         the database. Currently, the False value for this
                         parameter is specially for the case of updating
                         database during volume migration
+    :param load_profile: how the related models are loaded, one of
+                         constants.VOLUME_LOAD_PROFILES. None joins all of
+                         them to the volume, which suits a single volume
     :returns: updated query or None
     """
-    if not joined_load:
-        return model_query(context, models.Volume, session=session,
-                           project_only=project_only)
+    query = model_query(context, models.Volume, session=session,
+                        project_only=project_only)
+    if not joined_load or load_profile == constants.VOLUME_LOAD_SUMMARY:
+        return query
+    if load_profile == constants.VOLUME_LOAD_DETAIL:
+        # Collections are fetched with one extra query per relationship
+        # instead of being joined, so each volume row is returned only once
+        # no matter how many metadata items or attachments it has.
+        query = query.options(subqueryload('volume_metadata'),
+                              subqueryload('volume_attachment'),
+                              joinedload('volume_type'))
+        if is_admin_context(context):
+            query = query.options(subqueryload('volume_admin_metadata'))
+        return query
+    if load_profile is not None:
+        raise exception.InvalidInput(
+            reason=_('Unknown volume load profile %s.') % load_profile)
+
     if is_admin_context(context):
-        return model_query(context, models.Volume, session=session,
-                           project_only=project_only).\
+        return query.\
             options(joinedload('volume_metadata')).\
             options(joinedload('volume_admin_metadata')).\
             options(joinedload('volume_type')).\
             options(joinedload('volume_attachment')).\
             options(joinedload('consistencygroup'))
     else:
-        return model_query(context, models.Volume, session=session,
-                           project_only=project_only).\
+        return query.\
             options(joinedload('volume_metadata')).\
             options(joinedload('volume_type')).\
             options(joinedload('volume_attachment')).\
@@ -1468,8 +1738,9 @@ def volume_get(context, volume_id):
 
 
 @require_admin_context
+@_read_only
 def volume_get_all(context, marker, limit, sort_keys=None, sort_dirs=None,
-                   filters=None, offset=None):
+                   filters=None, offset=None, load_profile=None):
     """Retrieves all volumes.
 
     If no sort parameters are specified then the returned volumes are sorted
@@ -1488,13 +1759,18 @@ def volume_get_all(context, marker, limit, sort_keys=None, sort_dirs=None,
                     or sets cause an 'IN' operation, while exact matching
                     is used for other values, see _process_volume_filters
                     function for more information
+    :param offset: number of items to skip
+    :param load_profile: how the related models are loaded, one of
+                         constants.VOLUME_LOAD_PROFILES or None to join
+                         all of them
     :returns: list of matching volumes
     """
     session = get_session()
     with session.begin():
         # Generate the query
-        query = _generate_paginate_query(context, session, marker, limit,
-                                         sort_keys, sort_dirs, filters, offset)
+        query = _generate_paginate_query(
+            context, session, marker, limit, sort_keys, sort_dirs, filters,
+            offset, query_kwargs={'load_profile': load_profile})
         # No volumes would match, return empty list
         if query is None:
             return []
@@ -1558,9 +1834,10 @@ def volume_get_all_by_group(context, group_id, filters=None):
 
 
 @require_context
+@_read_only
 def volume_get_all_by_project(context, project_id, marker, limit,
                               sort_keys=None, sort_dirs=None, filters=None,
-                              offset=None):
+                              offset=None, load_profile=None):
     """Retrieves all volumes in a project.
 
     If no sort parameters are specified then the returned volumes are sorted
@@ -1580,6 +1857,10 @@ def volume_get_all_by_project(context, project_id, marker, limit,
                     or sets cause an 'IN' operation, while exact matching
                     is used for other values, see _process_volume_filters
                     function for more information
+    :param offset: number of items to skip
+    :param load_profile: how the related models are loaded, one of
+                         constants.VOLUME_LOAD_PROFILES or None to join
+                         all of them
     :returns: list of matching volumes
     """
     session = get_session()
@@ -1589,8 +1870,9 @@ def volume_get_all_by_project(context, project_id, marker, limit,
         filters = filters.copy() if filters else {}
         filters['project_id'] = project_id
         # Generate the query
-        query = _generate_paginate_query(context, session, marker, limit,
-                                         sort_keys, sort_dirs, filters, offset)
+        query = _generate_paginate_query(
+            context, session, marker, limit, sort_keys, sort_dirs, filters,
+            offset, query_kwargs={'load_profile': load_profile})
         # No volumes would match, return empty list
         if query is None:
             return []
@@ -1599,7 +1881,7 @@ def volume_get_all_by_project(context, project_id, marker, limit,
 
 def _generate_paginate_query(context, session, marker, limit, sort_keys,
                              sort_dirs, filters, offset=None,
-                             paginate_type=models.Volume):
+                             paginate_type=models.Volume, query_kwargs=None):
     """Generate the query to include the filters and the paginate options.
 
     Returns a query with sorting / pagination criteria added or None
@@ -1620,6 +1902,7 @@ def _generate_paginate_query(context, session, marker, limit, sort_keys,
                     function for more information
     :param offset: number of items to skip
     :param paginate_type: type of pagination to generate
+    :param query_kwargs: extra keyword arguments for the get_query helper
     :returns: updated query or None
     """
     get_query, process_filters, get = PAGINATION_HELPERS[paginate_type]
@@ -1627,7 +1910,7 @@ def _generate_paginate_query(context, session, marker, limit, sort_keys,
     sort_keys, sort_dirs = process_sort_params(sort_keys,
                                                sort_dirs,
                                                default_dir='desc')
-    query = get_query(context, session=session)
+    query = get_query(context, session=session, **(query_kwargs or {}))
 
     if filters:
         query = process_filters(query, filters)
@@ -1635,14 +1918,26 @@ def _generate_paginate_query(context, session, marker, limit, sort_keys,
             return None
 
     marker_object = None
-    if marker is not None:
+    marker_values = None
+    if common.is_pagination_cursor(marker):
+        # Keyset pagination, the marker holds the sort key values of the
+        # last item of the previous page so it doesn't need to be loaded.
+        cursor = common.decode_pagination_cursor(marker)
+        try:
+            marker_values = [cursor[key] for key in sort_keys]
+        except KeyError:
+            msg = _('Pagination marker %s does not match the sort '
+                    'keys.') % marker
+            raise exception.InvalidInput(reason=msg)
+    elif marker is not None:
         marker_object = get(context, marker, session)
 
     return sqlalchemyutils.paginate_query(query, paginate_type, limit,
                                           sort_keys,
                                           marker=marker_object,
                                           sort_dirs=sort_dirs,
-                                          offset=offset)
+                                          offset=offset,
+                                          marker_values=marker_values)
 
 
 def _process_volume_filters(query, filters):
@@ -1803,9 +2098,111 @@ def process_sort_params(sort_keys, sort_dirs, default_keys=None,
     return result_keys, result_dirs
 
 
+# Maximum number of ids in the IN clause of a single bulk UPDATE
+_UPDATE_ALL_CHUNK_SIZE = 500
+
+
+# Columns the usage counters depend on, which can't be updated in bulk
+_UPDATE_ALL_PROTECTED = {
+    models.Volume: ('deleted', 'project_id', 'size', 'volume_type_id'),
+    models.Snapshot: ('deleted', 'project_id', 'volume_id', 'volume_size'),
+}
+
+
+def _check_update_all_values(model, values):
+    """Ensure bulk update values only set plain columns of the model."""
+    columns = model.__table__.columns
+    protected = ('id',) + _UPDATE_ALL_PROTECTED.get(model, ())
+    invalid = [key for key in values
+               if key in protected or key not in columns]
+    if invalid:
+        msg = (_('Cannot update %(fields)s of %(model)s in bulk.') %
+               {'fields': ', '.join(sorted(invalid)),
+                'model': model.__name__})
+        raise exception.InvalidInput(reason=msg)
+
+
+def _update_all(context, model, process_filters, updates=None,
+                filters=None, values=None):
+    """Update many rows of a model with a few set-based statements.
+
+    Either `updates`, an iterable of (id, values) pairs, or `filters` and the
+    `values` to set on the matching rows must be given.
+
+    Rows that share the same values are updated with one UPDATE ... WHERE id
+    IN (...) statement, and the rows left with values of their own are
+    updated with one executemany statement per set of updated columns, all
+    in a single transaction. Deleted rows are never updated.
+
+    :returns: the number of updated rows
+    """
+    if (updates is None) == (filters is None):
+        msg = _('Either updates or filters must be given to update in bulk.')
+        raise exception.InvalidInput(reason=msg)
+
+    session = get_session()
+    if filters is not None:
+        if not values:
+            return 0
+        _check_update_all_values(model, values)
+        with session.begin():
+            query = model_query(context, model, session=session,
+                                read_deleted='no')
+            query = process_filters(query, filters)
+            if query is None:
+                return 0
+            return query.update(values, synchronize_session=False)
+
+    # Group the ids that are set to the same values
+    groups = collections.OrderedDict()
+    for item_id, item_values in updates:
+        if not item_values:
+            continue
+        _check_update_all_values(model, item_values)
+        key = tuple(sorted(item_values.items()))
+        groups.setdefault(key, []).append(item_id)
+
+    table = model.__table__
+    shared = []
+    single = collections.OrderedDict()
+    for key, ids in groups.items():
+        if len(ids) > 1:
+            shared.append((dict(key), ids))
+        else:
+            params = {'_' + k: v for k, v in key}
+            params['_id'] = ids[0]
+            single.setdefault(tuple(k for k, __ in key), []).append(params)
+
+    count = 0
+    with session.begin():
+        for item_values, ids in shared:
+            for start in range(0, len(ids), _UPDATE_ALL_CHUNK_SIZE):
+                chunk = ids[start:start + _UPDATE_ALL_CHUNK_SIZE]
+                count += model_query(
+                    context, model, session=session, read_deleted='no').\
+                    filter(model.id.in_(chunk)).\
+                    update(item_values, synchronize_session=False)
+
+        # NOTE: Bind parameters can't share the name of the columns they
+        # set, hence the underscore prefix.
+        for keys, params in single.items():
+            stmt = table.update().\
+                where(table.c.id == bindparam('_id')).\
+                where(table.c.deleted == false()).\
+                values({k: bindparam('_' + k) for k in keys})
+            count += session.execute(stmt, params).rowcount
+    return count
+
+
 @handle_db_data_error
 @require_context
 def volume_update(context, volume_id, values):
+    if 'project_id' in values or 'volume_type_id' in values:
+        volume_ref = _volume_get(context, volume_id)
+        _usage_counters_ensure(
+            context, values.get('project_id', volume_ref.project_id),
+            values.get('volume_type_id', volume_ref.volume_type_id))
+
     session = get_session()
     with session.begin():
         metadata = values.get('metadata')
@@ -1825,11 +2222,22 @@ def volume_update(context, volume_id, values):
                                           session=session)
 
         volume_ref = _volume_get(context, volume_id, session=session)
+        usage = (volume_ref.project_id, volume_ref.volume_type_id,
+                 volume_ref.size)
         volume_ref.update(values)
+        _volume_usage_move(context, session, volume_ref, *usage)
 
         return volume_ref
 
 
+@handle_db_data_error
+@require_admin_context
+@_retry_on_deadlock
+def volume_update_all(context, updates=None, filters=None, values=None):
+    return _update_all(context, models.Volume, _process_volume_filters,
+                       updates=updates, filters=filters, values=values)
+
+
 @require_context
 def volume_attachment_update(context, attachment_id, values):
     session = get_session()
@@ -2196,11 +2604,24 @@ def snapshot_create(context, values):
     if not values.get('id'):
         values['id'] = str(uuid.uuid4())
 
+    # The snapshots are counted with the type of their volume
+    volume_type_id = model_query(context, models.Volume.volume_type_id,
+                                 read_deleted='yes').\
+        filter_by(id=values.get('volume_id')).\
+        scalar()
+    _usage_counters_ensure(context, values.get('project_id'),
+                           volume_type_id)
+
     session = get_session()
     with session.begin():
         snapshot_ref = models.Snapshot()
         snapshot_ref.update(values)
         session.add(snapshot_ref)
+        if not snapshot_ref.deleted:
+            _usage_counters_add(
+                context, session, snapshot_ref.project_id, volume_type_id,
+                snapshots=1,
+                snapshot_gigabytes=int(snapshot_ref.volume_size or 0))
 
         return _snapshot_get(context, values['id'], session=session)
 
@@ -2210,12 +2631,24 @@ def snapshot_create(context, values):
 def snapshot_destroy(context, snapshot_id):
     session = get_session()
     with session.begin():
-        model_query(context, models.Snapshot, session=session).\
+        usage = model_query(context, models.Snapshot.project_id,
+                            models.Snapshot.volume_size,
+                            models.Volume.volume_type_id,
+                            session=session).\
+            outerjoin(models.Volume,
+                      models.Snapshot.volume_id == models.Volume.id).\
+            filter(models.Snapshot.id == snapshot_id).\
+            first()
+        deleted = model_query(context, models.Snapshot, session=session).\
             filter_by(id=snapshot_id).\
             update({'status': 'deleted',
                     'deleted': True,
                     'deleted_at': timeutils.utcnow(),
                     'updated_at': literal_column('updated_at')})
+        if usage and deleted:
+            _usage_counters_add(context, session, usage.project_id,
+                                usage.volume_type_id, snapshots=-1,
+                                snapshot_gigabytes=-(usage.volume_size or 0))
         model_query(context, models.SnapshotMetadata, session=session).\
             filter_by(snapshot_id=snapshot_id).\
             update({'deleted': True,
@@ -2244,6 +2677,7 @@ def snapshot_get(context, snapshot_id):
 
 
 @require_admin_context
+@_read_only
 def snapshot_get_all(context, filters=None, marker=None, limit=None,
                      sort_keys=None, sort_dirs=None, offset=None):
     """Retrieves all snapshots.
@@ -2342,6 +2776,7 @@ def snapshot_get_all_for_cgsnapshot(context, cgsnapshot_id):
 
 
 @require_context
+@_read_only
 def snapshot_get_all_by_project(context, project_id, filters=None, marker=None,
                                 limit=None, sort_keys=None, sort_dirs=None,
                                 offset=None):
@@ -2434,9 +2869,29 @@ def snapshot_update(context, snapshot_id, values):
     session = get_session()
     with session.begin():
         snapshot_ref = _snapshot_get(context, snapshot_id, session=session)
+        usage = (snapshot_ref.project_id, snapshot_ref.volume_size)
         snapshot_ref.update(values)
+        if (not snapshot_ref.deleted and
+                (snapshot_ref.project_id, snapshot_ref.volume_size) != usage):
+            volume_type_id = (snapshot_ref.volume.volume_type_id
+                              if snapshot_ref.volume else None)
+            _usage_counters_add(context, session, usage[0], volume_type_id,
+                                snapshots=-1,
+                                snapshot_gigabytes=-int(usage[1] or 0))
+            _usage_counters_add(
+                context, session, snapshot_ref.project_id, volume_type_id,
+                snapshots=1,
+                snapshot_gigabytes=int(snapshot_ref.volume_size or 0))
         return snapshot_ref
 
+
+@handle_db_data_error
+@require_admin_context
+@_retry_on_deadlock
+def snapshot_update_all(context, updates=None, filters=None, values=None):
+    return _update_all(context, models.Snapshot, _process_snaps_filters,
+                       updates=updates, filters=filters, values=values)
+
 ####################
 
 
@@ -3792,6 +4247,7 @@ def _process_backups_filters(query, filters):
 
 
 @require_admin_context
+@_read_only
 def backup_get_all(context, filters=None, marker=None, limit=None,
                    offset=None, sort_keys=None, sort_dirs=None):
     return _backup_get_all(context, filters, marker, limit, offset, sort_keys,
@@ -3804,6 +4260,7 @@ def backup_get_all_by_host(context, host):
 
 
 @require_context
+@_read_only
 def backup_get_all_by_project(context, project_id, filters=None, marker=None,
                               limit=None, offset=None, sort_keys=None,
                               sort_dirs=None):
@@ -3999,11 +4456,14 @@ def transfer_accept(context, transfer_id, user_id, project_id):
             LOG.error(msg)
             raise exception.InvalidVolume(reason=msg)
 
+        usage = (volume_ref.project_id, volume_ref.volume_type_id,
+                 volume_ref.size)
         volume_ref['status'] = 'available'
         volume_ref['user_id'] = user_id
         volume_ref['project_id'] = project_id
         volume_ref['updated_at'] = literal_column('updated_at')
         volume_ref.update(volume_ref)
+        _volume_usage_move(context, session, volume_ref, *usage)
 
         session.query(models.Transfer).\
             filter_by(id=transfer_ref['id']).\
@@ -4425,9 +4885,56 @@ def cgsnapshot_creating_from_src():
 ###############################
 
 
+def _purge_table(session, table, deleted_age, batch_size, sleep, deadline):
+    """Purge the deleted rows of a table, batch_size rows per transaction.
+
+    Rows are deleted in primary key order. Rows of a table referencing
+    other rows of the same table are purged first.
+
+    :returns: tuple of the number of purged rows and whether all the rows
+              were purged before the deadline
+    """
+    pk = list(table.primary_key.columns)[0]
+    passes = [table.c.deleted_at < deleted_age]
+    for fk in table.foreign_keys:
+        if fk.column.table.name == table.name:
+            passes.insert(0, and_(passes[-1], fk.parent.isnot(None)))
+
+    rows_purged = 0
+    for condition in passes:
+        while True:
+            if deadline is not None and timeutils.utcnow() >= deadline:
+                return rows_purged, False
+            with session.begin():
+                ids = [row[0] for row in session.execute(
+                    sql.select([pk]).where(condition).order_by(pk).
+                    limit(batch_size))]
+                if ids:
+                    result = session.execute(
+                        table.delete().where(pk.in_(ids)))
+                    rows_purged += result.rowcount
+            if len(ids) < batch_size:
+                break
+            LOG.debug('Purged %(rows)d rows from table=%(table)s so far.',
+                      {'rows': rows_purged, 'table': table.name})
+            if sleep:
+                time.sleep(sleep)
+    return rows_purged, True
+
+
 @require_admin_context
-def purge_deleted_rows(context, age_in_days):
-    """Purge deleted rows older than age from cinder tables."""
+def purge_deleted_rows(context, age_in_days, batch_size=1000, sleep=0,
+                       max_runtime=None):
+    """Purge deleted rows older than age from cinder tables.
+
+    Rows are deleted in batches of batch_size rows, each in its own
+    transaction, and tables referencing other tables are purged first. An
+    interrupted purge, because of an error or because it ran longer than
+    max_runtime seconds, can be resumed by running it again.
+
+    :returns: tuple of a dict of the number of purged rows by table name
+              and whether all the rows were purged before max_runtime
+    """
     try:
         age_in_days = int(age_in_days)
     except ValueError:
@@ -4438,6 +4945,10 @@ def purge_deleted_rows(context, age_in_days):
         msg = _('Must supply a positive value for age')
         LOG.error(msg)
         raise exception.InvalidParameterValue(msg)
+    if batch_size <= 0:
+        msg = _('Must supply a positive value for the batch size')
+        LOG.error(msg)
+        raise exception.InvalidParameterValue(msg)
 
     engine = get_engine()
     session = get_session()
@@ -4450,32 +4961,40 @@ def purge_deleted_rows(context, age_in_days):
                 and hasattr(model_class, "deleted"):
             tables.append(model_class.__tablename__)
 
-    # Reorder the list so the volumes and volume_types tables are last
-    # to avoid FK constraints
-    for table in ("volume_types", "snapshots", "volumes"):
-        tables.remove(table)
-        tables.append(table)
+    # Reflect the foreign keys of the database to purge the tables
+    # referencing others before the ones they reference.
+    metadata.reflect(only=tables)
+
+    deadline = None
+    if max_runtime:
+        deadline = timeutils.utcnow() + dt.timedelta(seconds=max_runtime)
+    deleted_age = timeutils.utcnow() - dt.timedelta(days=age_in_days)
+    purged = collections.OrderedDict()
+    done = True
 
-    for table in tables:
-        t = Table(table, metadata, autoload=True)
+    for t in reversed(metadata.sorted_tables):
         LOG.info(_LI('Purging deleted rows older than age=%(age)d days '
                      'from table=%(table)s'), {'age': age_in_days,
-                                               'table': table})
-        deleted_age = timeutils.utcnow() - dt.timedelta(days=age_in_days)
+                                               'table': t.name})
         try:
-            with session.begin():
-                result = session.execute(
-                    t.delete()
-                    .where(t.c.deleted_at < deleted_age))
+            rows_purged, done = _purge_table(session, t, deleted_age,
+                                             batch_size, sleep, deadline)
         except db_exc.DBReferenceError as ex:
             LOG.error(_LE('DBError detected when purging from '
                           '%(tablename)s: %(error)s.'),
-                      {'tablename': table, 'error': six.text_type(ex)})
+                      {'tablename': t.name, 'error': six.text_type(ex)})
             raise
 
-        rows_purged = result.rowcount
+        purged[t.name] = rows_purged
         LOG.info(_LI("Deleted %(row)d rows from table=%(table)s"),
-                 {'row': rows_purged, 'table': table})
+                 {'row': rows_purged, 'table': t.name})
+        if not done:
+            LOG.warning(_LW('Purge stopped after %(runtime)d seconds, run '
+                            'it again to purge the remaining rows.'),
+                        {'runtime': max_runtime})
+            break
+
+    return purged, done
 
 
 ###############################
@@ -0,0 +1,28 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from sqlalchemy import Index, MetaData, Table
+
+
+def upgrade(migrate_engine):
+    meta = MetaData()
+    meta.bind = migrate_engine
+
+    volumes = Table('volumes', meta, autoload=True)
+
+    # Volume lists of a project, sorted by the default sort keys
+    Index('volumes_project_deleted_created_at_id_idx',
+          volumes.c.project_id, volumes.c.deleted, volumes.c.created_at,
+          volumes.c.id).create(migrate_engine)
+    # Volumes of a host
+    Index('volumes_host_deleted_idx',
+          volumes.c.host, volumes.c.deleted).create(migrate_engine)
@@ -0,0 +1,86 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import collections
+
+from oslo_utils import timeutils
+from sqlalchemy import Boolean, Column, DateTime, Integer
+from sqlalchemy import MetaData, String, Table, UniqueConstraint
+from sqlalchemy import false, func, select
+
+
+COUNTERS = ('volumes', 'gigabytes', 'snapshots', 'snapshot_gigabytes')
+
+
+def upgrade(migrate_engine):
+    meta = MetaData()
+    meta.bind = migrate_engine
+
+    # New table
+    usage_counters = Table(
+        'usage_counters',
+        meta,
+        Column('id', Integer, primary_key=True, nullable=False),
+        Column('created_at', DateTime(timezone=False)),
+        Column('updated_at', DateTime(timezone=False)),
+        Column('deleted_at', DateTime(timezone=False)),
+        Column('deleted', Boolean),
+        Column('project_id', String(255), nullable=False),
+        Column('volume_type_id', String(36), nullable=False),
+        Column('volumes', Integer, nullable=False),
+        Column('gigabytes', Integer, nullable=False),
+        Column('snapshots', Integer, nullable=False),
+        Column('snapshot_gigabytes', Integer, nullable=False),
+        UniqueConstraint(
+            'project_id', 'volume_type_id',
+            name='uniq_usage_counters0project_id0volume_type_id'),
+        mysql_engine='InnoDB',
+        mysql_charset='utf8'
+    )
+
+    usage_counters.create()
+
+    # Count the existing volumes and snapshots
+    volumes = Table('volumes', meta, autoload=True)
+    snapshots = Table('snapshots', meta, autoload=True)
+    counters = collections.defaultdict(lambda: dict.fromkeys(COUNTERS, 0))
+
+    query = select([volumes.c.project_id, volumes.c.volume_type_id,
+                    func.count(volumes.c.id), func.sum(volumes.c.size)]).\
+        where(volumes.c.deleted == false()).\
+        where(volumes.c.project_id.isnot(None)).\
+        group_by(volumes.c.project_id, volumes.c.volume_type_id)
+    for project_id, volume_type_id, count, gigabytes in query.execute():
+        counter = counters[(project_id, volume_type_id or '')]
+        counter['volumes'] += count
+        counter['gigabytes'] += gigabytes or 0
+
+    query = select([snapshots.c.project_id, volumes.c.volume_type_id,
+                    func.count(snapshots.c.id),
+                    func.sum(snapshots.c.volume_size)]).\
+        select_from(snapshots.outerjoin(
+            volumes, snapshots.c.volume_id == volumes.c.id)).\
+        where(snapshots.c.deleted == false()).\
+        where(snapshots.c.project_id.isnot(None)).\
+        group_by(snapshots.c.project_id, volumes.c.volume_type_id)
+    for project_id, volume_type_id, count, gigabytes in query.execute():
+        counter = counters[(project_id, volume_type_id or '')]
+        counter['snapshots'] += count
+        counter['snapshot_gigabytes'] += gigabytes or 0
+
+    now = timeutils.utcnow()
+    rows = [dict(values, project_id=project_id,
+                 volume_type_id=volume_type_id, created_at=now,
+                 deleted=False)
+            for (project_id, volume_type_id), values in counters.items()]
+    if rows:
+        migrate_engine.execute(usage_counters.insert(), rows)
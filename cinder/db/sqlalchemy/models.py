@@ -25,7 +25,7 @@ from oslo_db.sqlalchemy import models
 from oslo_utils import timeutils
 from sqlalchemy import Column, Integer, String, Text, schema
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy import ForeignKey, DateTime, Boolean
+from sqlalchemy import ForeignKey, DateTime, Boolean, Index
 from sqlalchemy.orm import relationship, backref, validates
 
 
@@ -127,6 +127,12 @@ class Cgsnapshot(BASE, CinderBase):
 class Volume(BASE, CinderBase):
     """Represents a block storage device that can be attached to a vm."""
     __tablename__ = 'volumes'
+    __table_args__ = (
+        Index('volumes_project_deleted_created_at_id_idx',
+              'project_id', 'deleted', 'created_at', 'id'),
+        Index('volumes_host_deleted_idx', 'host', 'deleted'),
+        CinderBase.__table_args__,
+    )
     id = Column(String(36), primary_key=True)
     _name_id = Column(String(36))  # Don't access/modify this directly!
 
@@ -453,6 +459,32 @@ class Reservation(BASE, CinderBase):
         primaryjoin='and_(Reservation.allocated_id == Quota.id)')
 
 
+class UsageCounter(BASE, CinderBase):
+    """Represents the volume and snapshot usage of a project for a type.
+
+    The counters are kept up to date along with the volumes and snapshots
+    rows so quota usage refreshes don't need to scan those tables. Volumes
+    without a type are counted with an empty volume_type_id.
+    """
+
+    __tablename__ = 'usage_counters'
+    __table_args__ = (
+        schema.UniqueConstraint(
+            'project_id', 'volume_type_id',
+            name='uniq_usage_counters0project_id0volume_type_id'),
+        CinderBase.__table_args__,
+    )
+    id = Column(Integer, primary_key=True)
+
+    project_id = Column(String(255), nullable=False)
+    volume_type_id = Column(String(36), nullable=False)
+
+    volumes = Column(Integer, nullable=False, default=0)
+    gigabytes = Column(Integer, nullable=False, default=0)
+    snapshots = Column(Integer, nullable=False, default=0)
+    snapshot_gigabytes = Column(Integer, nullable=False, default=0)
+
+
 class Snapshot(BASE, CinderBase):
     """Represents a snapshot of volume."""
     __tablename__ = 'snapshots'
@@ -51,6 +51,7 @@ This module provides Manager, a base class for managers.
 
 """
 
+import copy
 
 from oslo_config import cfg
 from oslo_log import log as logging
@@ -130,6 +131,39 @@ class Manager(base.Base, PeriodicTasks):
         rpc.LAST_RPC_VERSIONS = {}
 
 
+def _capabilities_delta(old, new):
+    """Return what changed between two capability reports of a service.
+
+    Pools reported as a list are compared by pool name. See
+    HostManager._apply_capabilities_delta() for the format.
+    """
+    def diff(old, new, skip=()):
+        updated = {key: value for key, value in new.items()
+                   if key not in skip and (key not in old or
+                                           old[key] != value)}
+        removed = [key for key in old
+                   if key not in skip and key not in new]
+        return updated, removed
+
+    old_pools = old.get('pools')
+    new_pools = new.get('pools')
+    by_pool = isinstance(old_pools, list) and isinstance(new_pools, list)
+    updated, removed = diff(old, new, skip=('pools',) if by_pool else ())
+    delta = {'updated': updated, 'removed': removed}
+    if by_pool:
+        old_pools = {pool['pool_name']: pool for pool in old_pools}
+        pools = {}
+        for pool in new_pools:
+            pool_updated, pool_removed = diff(
+                old_pools.pop(pool['pool_name'], {}), pool)
+            if pool_updated or pool_removed:
+                pools[pool['pool_name']] = {'updated': pool_updated,
+                                            'removed': pool_removed}
+        delta['pools'] = pools
+        delta['removed_pools'] = list(old_pools)
+    return delta
+
+
 class SchedulerDependentManager(Manager):
     """Periodically send capability updates to the Scheduler services.
 
@@ -142,6 +176,11 @@ class SchedulerDependentManager(Manager):
 
     def __init__(self, host=None, db_driver=None, service_name='undefined'):
         self.last_capabilities = None
+        # Last capabilities sent to the schedulers, and how many reports
+        # were sent as deltas since the last full one.
+        self._published_capabilities = None
+        self._capabilities_sequence = 0
+        self._capabilities_deltas_sent = 0
         self.service_name = service_name
         self.scheduler_rpcapi = scheduler_rpcapi.SchedulerAPI()
         self._tp = greenpool.GreenPool()
@@ -152,15 +191,36 @@ class SchedulerDependentManager(Manager):
         self.last_capabilities = capabilities
 
     @periodic_task.periodic_task
-    def _publish_service_capabilities(self, context):
-        """Pass data back to the scheduler at a periodic interval."""
+    def _publish_service_capabilities(self, context, full=False):
+        """Pass data back to the scheduler at a periodic interval.
+
+        Unless full is True, only what changed since the previous report is
+        sent, with a full report every full_capabilities_report_interval
+        reports so new or restarted schedulers catch up.
+        """
         if self.last_capabilities:
             LOG.debug('Notifying Schedulers of capabilities ...')
+            delta = None
+            if (not full and self._published_capabilities is not None and
+                    self._capabilities_deltas_sent <
+                    CONF.full_capabilities_report_interval):
+                delta = _capabilities_delta(self._published_capabilities,
+                                            self.last_capabilities)
+                self._capabilities_deltas_sent += 1
+            else:
+                self._capabilities_deltas_sent = 0
+            self._capabilities_sequence += 1
+            # Drivers may update their stats in place, keep a copy to
+            # compare the next report with.
+            self._published_capabilities = copy.deepcopy(
+                self.last_capabilities)
             self.scheduler_rpcapi.update_service_capabilities(
                 context,
                 self.service_name,
                 self.host,
-                self.last_capabilities)
+                self.last_capabilities,
+                sequence=self._capabilities_sequence,
+                delta=delta)
 
     def _add_to_threadpool(self, func, *args, **kwargs):
         self._tp.spawn_n(func, *args, **kwargs)
@@ -161,9 +161,9 @@ class BackupList(base.ObjectListBase, base.CinderObject):
 
     @classmethod
     def get_all(cls, context, filters=None, marker=None, limit=None,
-                offset=None, sort_keys=None, sort_dirs=None):
+                offset=None, sort_keys=None, sort_dirs=None, use_slave=False):
         backups = db.backup_get_all(context, filters, marker, limit, offset,
-                                    sort_keys, sort_dirs)
+                                    sort_keys, sort_dirs, use_slave=use_slave)
         return base.obj_make_list(context, cls(context), objects.Backup,
                                   backups)
 
@@ -176,10 +176,11 @@ class BackupList(base.ObjectListBase, base.CinderObject):
     @classmethod
     def get_all_by_project(cls, context, project_id, filters=None,
                            marker=None, limit=None, offset=None,
-                           sort_keys=None, sort_dirs=None):
+                           sort_keys=None, sort_dirs=None, use_slave=False):
         backups = db.backup_get_all_by_project(context, project_id, filters,
                                                marker, limit, offset,
-                                               sort_keys, sort_dirs)
+                                               sort_keys, sort_dirs,
+                                               use_slave=use_slave)
         return base.obj_make_list(context, cls(context), objects.Backup,
                                   backups)
 
@@ -139,8 +139,9 @@ class ServiceList(base.ObjectListBase, base.CinderObject):
     }
 
     @classmethod
-    def get_all(cls, context, filters=None):
-        services = db.service_get_all(context, **(filters or {}))
+    def get_all(cls, context, filters=None, use_slave=False):
+        services = db.service_get_all(context, use_slave=use_slave,
+                                      **(filters or {}))
         return base.obj_make_list(context, cls(context), objects.Service,
                                   services)
 
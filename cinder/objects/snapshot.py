@@ -226,9 +226,10 @@ class SnapshotList(base.ObjectListBase, base.CinderObject):
 
     @classmethod
     def get_all(cls, context, search_opts, marker=None, limit=None,
-                sort_keys=None, sort_dirs=None, offset=None):
+                sort_keys=None, sort_dirs=None, offset=None, use_slave=False):
         snapshots = db.snapshot_get_all(context, search_opts, marker, limit,
-                                        sort_keys, sort_dirs, offset)
+                                        sort_keys, sort_dirs, offset,
+                                        use_slave=use_slave)
         expected_attrs = Snapshot._get_expected_attrs(context)
         return base.obj_make_list(context, cls(context), objects.Snapshot,
                                   snapshots, expected_attrs=expected_attrs)
@@ -243,10 +244,10 @@ class SnapshotList(base.ObjectListBase, base.CinderObject):
     @classmethod
     def get_all_by_project(cls, context, project_id, search_opts, marker=None,
                            limit=None, sort_keys=None, sort_dirs=None,
-                           offset=None):
+                           offset=None, use_slave=False):
         snapshots = db.snapshot_get_all_by_project(
             context, project_id, search_opts, marker, limit, sort_keys,
-            sort_dirs, offset)
+            sort_dirs, offset, use_slave=use_slave)
         expected_attrs = Snapshot._get_expected_attrs(context)
         return base.obj_make_list(context, cls(context), objects.Snapshot,
                                   snapshots, expected_attrs=expected_attrs)
@@ -271,3 +272,28 @@ class SnapshotList(base.ObjectListBase, base.CinderObject):
         expected_attrs = Snapshot._get_expected_attrs(context)
         return base.obj_make_list(context, cls(context), objects.Snapshot,
                                   snapshots, expected_attrs=expected_attrs)
+
+    @classmethod
+    def save_all(cls, context, snapshots):
+        """Save the changes of many snapshots with bulk updates.
+
+        Changes that only touch snapshot columns are written with
+        db.snapshot_update_all, snapshots with changed metadata or
+        relationships are saved one by one.
+        """
+        updates = []
+        for snapshot in snapshots:
+            changes = snapshot.cinder_obj_get_changes()
+            if not changes:
+                continue
+            if set(changes).intersection(Snapshot.OPTIONAL_FIELDS):
+                snapshot.save()
+                continue
+            updates.append((snapshot, changes))
+
+        if updates:
+            db.snapshot_update_all(
+                context, updates=[(snapshot.id, changes)
+                                  for snapshot, changes in updates])
+            for snapshot, changes in updates:
+                snapshot.obj_reset_changes()
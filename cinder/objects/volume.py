@@ -16,6 +16,7 @@ from oslo_config import cfg
 from oslo_utils import versionutils
 from oslo_versionedobjects import fields
 
+from cinder.common import constants
 from cinder import db
 from cinder import exception
 from cinder.i18n import _
@@ -446,13 +447,26 @@ class VolumeList(base.ObjectListBase, base.CinderObject):
 
         return expected_attrs
 
+    @classmethod
+    def _get_profile_expected_attrs(cls, context, load_profile):
+        if load_profile == constants.VOLUME_LOAD_SUMMARY:
+            return []
+        expected_attrs = cls._get_expected_attrs(context)
+        if load_profile == constants.VOLUME_LOAD_DETAIL:
+            expected_attrs.append('volume_attachment')
+        return expected_attrs
+
     @classmethod
     def get_all(cls, context, marker, limit, sort_keys=None, sort_dirs=None,
-                filters=None, offset=None):
+                filters=None, offset=None, load_profile=None,
+                use_slave=False):
         volumes = db.volume_get_all(context, marker, limit,
                                     sort_keys=sort_keys, sort_dirs=sort_dirs,
-                                    filters=filters, offset=offset)
-        expected_attrs = cls._get_expected_attrs(context)
+                                    filters=filters, offset=offset,
+                                    load_profile=load_profile,
+                                    use_slave=use_slave)
+        expected_attrs = cls._get_profile_expected_attrs(context,
+                                                         load_profile)
         return base.obj_make_list(context, cls(context), objects.Volume,
                                   volumes, expected_attrs=expected_attrs)
 
@@ -473,11 +487,39 @@ class VolumeList(base.ObjectListBase, base.CinderObject):
     @classmethod
     def get_all_by_project(cls, context, project_id, marker, limit,
                            sort_keys=None, sort_dirs=None, filters=None,
-                           offset=None):
+                           offset=None, load_profile=None, use_slave=False):
         volumes = db.volume_get_all_by_project(context, project_id, marker,
                                                limit, sort_keys=sort_keys,
                                                sort_dirs=sort_dirs,
-                                               filters=filters, offset=offset)
-        expected_attrs = cls._get_expected_attrs(context)
+                                               filters=filters, offset=offset,
+                                               load_profile=load_profile,
+                                               use_slave=use_slave)
+        expected_attrs = cls._get_profile_expected_attrs(context,
+                                                         load_profile)
         return base.obj_make_list(context, cls(context), objects.Volume,
                                   volumes, expected_attrs=expected_attrs)
+
+    @classmethod
+    def save_all(cls, context, volumes):
+        """Save the changes of many volumes with bulk updates.
+
+        Changes that only touch volume columns are written with
+        db.volume_update_all, volumes with changed metadata or relationships
+        are saved one by one.
+        """
+        updates = []
+        for volume in volumes:
+            changes = volume.cinder_obj_get_changes()
+            if not changes:
+                continue
+            if set(changes).intersection(Volume.OPTIONAL_FIELDS):
+                volume.save()
+                continue
+            updates.append((volume, changes))
+
+        if updates:
+            db.volume_update_all(
+                context,
+                updates=[(volume.id, changes) for volume, changes in updates])
+            for volume, changes in updates:
+                volume.obj_reset_changes()
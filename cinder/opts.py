@@ -47,6 +47,8 @@ from cinder.keymgr import key_mgr as cinder_keymgr_keymgr
 from cinder.message import api as cinder_message_api
 from cinder import quota as cinder_quota
 from cinder.scheduler import driver as cinder_scheduler_driver
+from cinder.scheduler.filters import instance_locality_filter as \
+    cinder_scheduler_filters_instancelocalityfilter
 from cinder.scheduler import host_manager as cinder_scheduler_hostmanager
 from cinder.scheduler import manager as cinder_scheduler_manager
 from cinder.scheduler import scheduler_options as \
@@ -206,7 +208,8 @@ def list_opts():
             )),
         ('DEFAULT',
             itertools.chain(
-                cinder_backup_driver.service_opts,
+                cinder_scheduler_filters_instancelocalityfilter.
+                instance_locality_opts,
                 cinder_api_common.api_common_opts,
                 cinder_backup_drivers_ceph.service_opts,
                 cinder_volume_drivers_smbfs.volume_opts,
@@ -285,6 +288,7 @@ def list_opts():
                 storwize_svc_fc_opts,
                 cinder_volume_drivers_falconstor_fsscommon.FSS_OPTS,
                 cinder_volume_drivers_zfssa_zfssaiscsi.ZFSSA_OPTS,
+                cinder_backup_driver.service_opts,
                 cinder_volume_driver.volume_opts,
                 cinder_volume_driver.iser_opts,
                 cinder_api_views_versions.versions_opts,
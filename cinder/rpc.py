@@ -170,6 +170,17 @@ def get_server(target, endpoints, serializer=None):
                                     serializer=serializer)
 
 
+def get_notification_listener(targets, endpoints, pool=None):
+    assert NOTIFICATION_TRANSPORT is not None
+    serializer = RequestContextSerializer(JsonPayloadSerializer())
+    return messaging.get_notification_listener(NOTIFICATION_TRANSPORT,
+                                               targets,
+                                               endpoints,
+                                               executor='eventlet',
+                                               serializer=serializer,
+                                               pool=pool)
+
+
 def get_notifier(service=None, host=None, publisher_id=None):
     assert NOTIFIER is not None
     if not publisher_id:
@@ -49,6 +49,11 @@ class BaseFilter(object):
     # for each request rather than for each instance
     run_filter_once_per_request = False
 
+    # Set to true in a subclass if the filter calls out to other services
+    # or the database. Such filters run after the others, once the list of
+    # objects was reduced.
+    io_bound = False
+
     def run_filter_for_index(self, index):
         """Return True if the filter needs to be run for n-th instances.
 
@@ -98,6 +103,10 @@ class BaseFilterHandler(base_handler.BaseHandler):
                       function of get_filtered_objects when handling
                       each resource.
         """
+        # Run the cheap filters first so IO bound filters see as few
+        # objects as possible.
+        filter_classes = sorted(filter_classes,
+                                key=lambda cls: cls.io_bound)
         list_objs = list(objs)
         LOG.debug("Starting with %d host(s)", len(list_objs))
         # The 'part_filter_results' list just tracks the number of hosts
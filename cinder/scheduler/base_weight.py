@@ -18,6 +18,7 @@ Pluggable Weighing support
 """
 
 import abc
+import heapq
 
 import six
 
@@ -122,8 +123,12 @@ class BaseWeightHandler(base_handler.BaseHandler):
     object_class = WeighedObject
 
     def get_weighed_objects(self, weigher_classes, obj_list,
-                            weighing_properties):
-        """Return a sorted (descending), normalized list of WeighedObjects."""
+                            weighing_properties, limit=None):
+        """Return a sorted (descending), normalized list of WeighedObjects.
+
+        If limit is given, only the limit objects with the highest weights
+        are returned, which spares sorting the whole list.
+        """
 
         if not obj_list:
             return []
@@ -131,6 +136,10 @@ class BaseWeightHandler(base_handler.BaseHandler):
         weighed_objs = [self.object_class(obj, 0.0) for obj in obj_list]
         for weigher_cls in weigher_classes:
             weigher = weigher_cls()
+            multiplier = weigher.weight_multiplier()
+            if not multiplier:
+                # The weigher doesn't contribute to the weights.
+                continue
             weights = weigher.weigh_objects(weighed_objs, weighing_properties)
 
             # Normalize the weights
@@ -140,6 +149,10 @@ class BaseWeightHandler(base_handler.BaseHandler):
 
             for i, weight in enumerate(weights):
                 obj = weighed_objs[i]
-                obj.weight += weigher.weight_multiplier() * weight
+                obj.weight += multiplier * weight
 
+        if limit is not None and limit < len(weighed_objs):
+            # Same result as sorting and slicing, ties keep their order.
+            return heapq.nlargest(limit, weighed_objs,
+                                  key=lambda x: x.weight)
         return sorted(weighed_objs, key=lambda x: x.weight, reverse=True)
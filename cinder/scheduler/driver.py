@@ -35,6 +35,14 @@ scheduler_driver_opts = [
     cfg.IntOpt('scheduler_max_attempts',
                default=3,
                help='Maximum number of attempts to schedule a volume'),
+    cfg.IntOpt('scheduler_candidate_cache_ttl',
+               default=0,
+               help='Number of seconds the filter scheduler reuses the '
+                    'filtered hosts of a volume create request for later '
+                    'requests with the same size, volume type, '
+                    'availability zone and scheduler hints. Filters that '
+                    'depend on consumed capacity and all weighers still '
+                    'run for each request. 0 disables the cache.'),
 ]
 
 CONF = cfg.CONF
@@ -87,11 +95,14 @@ class Scheduler(object):
 
         return self.host_manager.has_all_capabilities()
 
-    def update_service_capabilities(self, service_name, host, capabilities):
+    def update_service_capabilities(self, service_name, host, capabilities,
+                                    sequence=None, delta=None):
         """Process a capability update from a service node."""
         self.host_manager.update_service_capabilities(service_name,
                                                       host,
-                                                      capabilities)
+                                                      capabilities,
+                                                      sequence=sequence,
+                                                      delta=delta)
 
     def host_passes_filters(self, context, volume_id, host, filter_properties):
         """Check if the specified host passes the filters."""
@@ -110,6 +121,25 @@ class Scheduler(object):
         """Must override schedule method for scheduler to work."""
         raise NotImplementedError(_("Must implement schedule_create_volume"))
 
+    def schedule_create_volumes(self, context, request_spec_list,
+                                filter_properties_list):
+        """Schedule the creation of several volumes.
+
+        :returns: a list holding, for each volume, None if it was
+                  scheduled or the exception that prevented it.
+        """
+        errors = []
+        for request_spec, filter_properties in zip(request_spec_list,
+                                                   filter_properties_list):
+            try:
+                self.schedule_create_volume(context, request_spec,
+                                            filter_properties)
+            except Exception as e:
+                errors.append(e)
+            else:
+                errors.append(None)
+        return errors
+
     def schedule_create_consistencygroup(self, context, group,
                                          request_spec_list,
                                          filter_properties_list):
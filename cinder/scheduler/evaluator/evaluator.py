@@ -13,8 +13,10 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
 import operator
 import re
+import threading
 
 import pyparsing
 import six
@@ -38,13 +40,13 @@ class EvalConstant(object):
     def __init__(self, toks):
         self.value = toks[0]
 
-    def eval(self):
+    def eval(self, variables):
         result = self.value
         if (isinstance(result, six.string_types) and
                 re.match("^[a-zA-Z_]+\.[a-zA-Z_]+$", result)):
             (which_dict, entry) = result.split('.')
             try:
-                result = _vars[which_dict][entry]
+                result = variables[which_dict][entry]
             except KeyError as e:
                 raise exception.EvaluatorParseException(
                     _("KeyError: %s") % six.text_type(e))
@@ -73,21 +75,21 @@ class EvalSignOp(object):
     def __init__(self, toks):
         self.sign, self.value = toks[0]
 
-    def eval(self):
-        return self.operations[self.sign] * self.value.eval()
+    def eval(self, variables):
+        return self.operations[self.sign] * self.value.eval(variables)
 
 
 class EvalAddOp(object):
     def __init__(self, toks):
         self.value = toks[0]
 
-    def eval(self):
-        sum = self.value[0].eval()
+    def eval(self, variables):
+        sum = self.value[0].eval(variables)
         for op, val in _operatorOperands(self.value[1:]):
             if op == '+':
-                sum += val.eval()
+                sum += val.eval(variables)
             elif op == '-':
-                sum -= val.eval()
+                sum -= val.eval(variables)
         return sum
 
 
@@ -95,14 +97,14 @@ class EvalMultOp(object):
     def __init__(self, toks):
         self.value = toks[0]
 
-    def eval(self):
-        prod = self.value[0].eval()
+    def eval(self, variables):
+        prod = self.value[0].eval(variables)
         for op, val in _operatorOperands(self.value[1:]):
             try:
                 if op == '*':
-                    prod *= val.eval()
+                    prod *= val.eval(variables)
                 elif op == '/':
-                    prod /= float(val.eval())
+                    prod /= float(val.eval(variables))
             except ZeroDivisionError as e:
                 raise exception.EvaluatorParseException(
                     _("ZeroDivisionError: %s") % six.text_type(e))
@@ -113,10 +115,10 @@ class EvalPowerOp(object):
     def __init__(self, toks):
         self.value = toks[0]
 
-    def eval(self):
-        prod = self.value[0].eval()
+    def eval(self, variables):
+        prod = self.value[0].eval(variables)
         for op, val in _operatorOperands(self.value[1:]):
-            prod = pow(prod, val.eval())
+            prod = pow(prod, val.eval(variables))
         return prod
 
 
@@ -124,8 +126,8 @@ class EvalNegateOp(object):
     def __init__(self, toks):
         self.negation, self.value = toks[0]
 
-    def eval(self):
-        return not self.value.eval()
+    def eval(self, variables):
+        return not self.value.eval(variables)
 
 
 class EvalComparisonOp(object):
@@ -142,11 +144,11 @@ class EvalComparisonOp(object):
     def __init__(self, toks):
         self.value = toks[0]
 
-    def eval(self):
-        val1 = self.value[0].eval()
+    def eval(self, variables):
+        val1 = self.value[0].eval(variables)
         for op, val in _operatorOperands(self.value[1:]):
             fn = self.operations[op]
-            val2 = val.eval()
+            val2 = val.eval(variables)
             if not fn(val1, val2):
                 break
             val1 = val2
@@ -159,12 +161,12 @@ class EvalTernaryOp(object):
     def __init__(self, toks):
         self.value = toks[0]
 
-    def eval(self):
-        condition = self.value[0].eval()
+    def eval(self, variables):
+        condition = self.value[0].eval(variables)
         if condition:
-            return self.value[2].eval()
+            return self.value[2].eval(variables)
         else:
-            return self.value[4].eval()
+            return self.value[4].eval(variables)
 
 
 class EvalFunction(object):
@@ -177,8 +179,8 @@ class EvalFunction(object):
     def __init__(self, toks):
         self.func, self.value = toks[0]
 
-    def eval(self):
-        args = self.value.eval()
+    def eval(self, variables):
+        args = self.value.eval(variables)
         if type(args) is list:
             return self.functions[self.func](*args)
         else:
@@ -189,9 +191,9 @@ class EvalCommaSeperator(object):
     def __init__(self, toks):
         self.value = toks[0]
 
-    def eval(self):
-        val1 = self.value[0].eval()
-        val2 = self.value[2].eval()
+    def eval(self, variables):
+        val1 = self.value[0].eval(variables)
+        val2 = self.value[2].eval(variables)
         if type(val2) is list:
             val_list = []
             val_list.append(val1)
@@ -206,9 +208,9 @@ class EvalBoolAndOp(object):
     def __init__(self, toks):
         self.value = toks[0]
 
-    def eval(self):
-        left = self.value[0].eval()
-        right = self.value[2].eval()
+    def eval(self, variables):
+        left = self.value[0].eval(variables)
+        right = self.value[2].eval(variables)
         return left and right
 
 
@@ -216,13 +218,21 @@ class EvalBoolOrOp(object):
     def __init__(self, toks):
         self.value = toks[0]
 
-    def eval(self):
-        left = self.value[0].eval()
-        right = self.value[2].eval()
+    def eval(self, variables):
+        left = self.value[0].eval(variables)
+        right = self.value[2].eval(variables)
         return left or right
 
+
 _parser = None
-_vars = {}
+_parser_lock = threading.Lock()
+
+# Upper bound on the number of distinct compiled expressions kept around.
+# Backends report a handful of filter/goodness functions each, so this is
+# generous while still bounding memory if functions change frequently.
+_MAX_CACHED_EXPRESSIONS = 512
+_cache = collections.OrderedDict()
+_cache_lock = threading.Lock()
 
 
 def _def_parser():
@@ -272,6 +282,62 @@ def _def_parser():
     return expr
 
 
+class CompiledExpression(object):
+    """A parsed expression that can be evaluated many times.
+
+    The parse tree holds no variable state, so a single instance can be
+    shared and evaluated concurrently with different variables.
+    """
+
+    def __init__(self, expression, tree):
+        self.expression = expression
+        self._tree = tree
+
+    def evaluate(self, **kwargs):
+        return self._tree.eval(kwargs)
+
+
+def _parse(expression):
+    global _parser
+    with _parser_lock:
+        if _parser is None:
+            _parser = _def_parser()
+
+        try:
+            return _parser.parseString(expression, parseAll=True)[0]
+        except pyparsing.ParseException as e:
+            raise exception.EvaluatorParseException(
+                _("ParseException: %s") % six.text_type(e))
+
+
+def compile_expression(expression):
+    """Returns a CompiledExpression for the given expression string.
+
+    Compiled expressions are kept in a bounded LRU cache keyed by the
+    expression text, so each distinct expression is only parsed once.
+    """
+    with _cache_lock:
+        compiled = _cache.pop(expression, None)
+        if compiled is not None:
+            _cache[expression] = compiled
+            return compiled
+
+    compiled = CompiledExpression(expression, _parse(expression))
+
+    with _cache_lock:
+        _cache[expression] = compiled
+        while len(_cache) > _MAX_CACHED_EXPRESSIONS:
+            _cache.popitem(last=False)
+
+    return compiled
+
+
+def clear_cache():
+    """Drops all cached compiled expressions."""
+    with _cache_lock:
+        _cache.clear()
+
+
 def evaluate(expression, **kwargs):
     """Evaluates an expression.
 
@@ -281,17 +347,4 @@ def evaluate(expression, **kwargs):
     Supports both integer and floating point values, and automatic
     promotion where necessary.
     """
-    global _parser
-    if _parser is None:
-        _parser = _def_parser()
-
-    global _vars
-    _vars = kwargs
-
-    try:
-        result = _parser.parseString(expression, parseAll=True)[0]
-    except pyparsing.ParseException as e:
-        raise exception.EvaluatorParseException(
-            _("ParseException: %s") % six.text_type(e))
-
-    return result.eval()
+    return compile_expression(expression).evaluate(**kwargs)
@@ -20,8 +20,12 @@ You can customize this scheduler by specifying your own volume Filters and
 Weighing Functions.
 """
 
+import datetime
+
 from oslo_config import cfg
 from oslo_log import log as logging
+from oslo_serialization import jsonutils
+from oslo_utils import timeutils
 
 from cinder import exception
 from cinder.i18n import _, _LE, _LW
@@ -40,6 +44,8 @@ class FilterScheduler(driver.Scheduler):
         self.cost_function_cache = None
         self.options = scheduler_options.SchedulerOptions()
         self.max_attempts = self._max_attempts()
+        # {<request shape>: (<expiry time>, <filtered hosts>)}
+        self._candidate_cache = {}
 
     def schedule(self, context, topic, method, *args, **kwargs):
         """Schedule contract that returns best-suited host for this request."""
@@ -81,8 +87,36 @@ class FilterScheduler(driver.Scheduler):
                                                    updated_group, host)
 
     def schedule_create_volume(self, context, request_spec, filter_properties):
+        self._schedule_create_volume(context, request_spec, filter_properties)
+
+    def schedule_create_volumes(self, context, request_spec_list,
+                                filter_properties_list):
+        """Schedule several volumes, filtering once per distinct request.
+
+        Volumes are placed one after the other, so capacity consumed by a
+        placement is seen by the next ones.
+        """
+        # Filtered hosts shared by the requests of this batch, keyed by
+        # request shape.
+        candidates = {}
+        errors = []
+        for request_spec, filter_properties in zip(request_spec_list,
+                                                   filter_properties_list):
+            try:
+                self._schedule_create_volume(context, request_spec,
+                                             filter_properties,
+                                             candidates=candidates)
+            except Exception as e:
+                errors.append(e)
+            else:
+                errors.append(None)
+        return errors
+
+    def _schedule_create_volume(self, context, request_spec,
+                                filter_properties, candidates=None):
         weighed_host = self._schedule(context, request_spec,
-                                      filter_properties)
+                                      filter_properties,
+                                      candidates=candidates)
 
         if not weighed_host:
             raise exception.NoValidHost(reason=_("No weighed hosts available"))
@@ -167,8 +201,7 @@ class FilterScheduler(driver.Scheduler):
         return top_host.obj
 
     def get_pools(self, context, filters):
-        # TODO(zhiteng) Add filters support
-        return self.host_manager.get_pools(context)
+        return self.host_manager.get_pools(context, filters)
 
     def _post_select_populate_filter_properties(self, filter_properties,
                                                 host_state):
@@ -250,10 +283,19 @@ class FilterScheduler(driver.Scheduler):
                  'volume_id': volume_id})
 
     def _get_weighted_candidates(self, context, request_spec,
-                                 filter_properties=None):
+                                 filter_properties=None, candidates=None,
+                                 limit=None):
         """Return a list of hosts that meet required specs.
 
         Returned list is ordered by their fitness.
+
+        :param limit: optional maximum number of hosts to return, only the
+                      best ones are kept.
+
+        :param candidates: optional dict of filtered hosts to reuse, keyed
+                           by request shape. If not given, the
+                           scheduler-wide candidate cache is used when it
+                           is enabled.
         """
         elevated = context.elevated()
 
@@ -305,9 +347,27 @@ class FilterScheduler(driver.Scheduler):
         # traverse this list once.
         hosts = self.host_manager.get_all_host_states(elevated)
 
-        # Filter local hosts based on requirements ...
-        hosts = self.host_manager.get_filtered_hosts(hosts,
-                                                     filter_properties)
+        shape = self._get_request_shape(context, request_spec,
+                                        filter_properties)
+        if candidates is not None:
+            cached_hosts = candidates.get(shape) if shape else None
+        else:
+            cached_hosts = self._get_cached_candidates(shape)
+        if cached_hosts is not None:
+            # Only re-check what previous placements may have changed.
+            LOG.debug("Reusing filtered hosts of an identical request")
+            hosts = self.host_manager.get_filtered_hosts(cached_hosts,
+                                                         filter_properties,
+                                                         capacity_only=True)
+        else:
+            # Filter local hosts based on requirements ...
+            hosts = self.host_manager.get_filtered_hosts(hosts,
+                                                         filter_properties)
+            if candidates is not None:
+                if shape:
+                    candidates[shape] = list(hosts)
+            else:
+                self._cache_candidates(shape, hosts)
         if not hosts:
             return []
 
@@ -315,9 +375,67 @@ class FilterScheduler(driver.Scheduler):
         # weighted_host = WeightedHost() ... the best
         # host for the job.
         weighed_hosts = self.host_manager.get_weighed_hosts(hosts,
-                                                            filter_properties)
+                                                            filter_properties,
+                                                            limit=limit)
         return weighed_hosts
 
+    def _get_request_shape(self, context, request_spec, filter_properties):
+        """Return a key identifying requests that filter identically.
+
+        Filters may depend on the project of the request, e.g. through the
+        instances and volumes given in the scheduler hints, so requests of
+        different projects never share their filtered hosts.
+
+        Returns None if the request can't share its filtered hosts with
+        other requests.
+        """
+        retry = filter_properties.get('retry') or {}
+        if retry.get('hosts') or filter_properties.get('vol_exists_on'):
+            return None
+
+        volume_properties = request_spec['volume_properties']
+        volume_type = request_spec.get('volume_type') or {}
+        try:
+            return (self.host_manager.generation,
+                    context.project_id,
+                    volume_properties.get('size'),
+                    volume_properties.get('availability_zone'),
+                    volume_properties.get('multiattach', False),
+                    volume_type.get('id'),
+                    frozenset((volume_type.get('extra_specs') or {}).items()),
+                    jsonutils.dumps(filter_properties.get('qos_specs'),
+                                    sort_keys=True),
+                    jsonutils.dumps(filter_properties.get('scheduler_hints'),
+                                    sort_keys=True))
+        except (TypeError, ValueError):
+            return None
+
+    def _get_cached_candidates(self, shape):
+        if shape is None or CONF.scheduler_candidate_cache_ttl <= 0:
+            return None
+        cached = self._candidate_cache.get(shape)
+        if cached is None:
+            return None
+        expires_at, hosts = cached
+        if timeutils.utcnow() >= expires_at:
+            del self._candidate_cache[shape]
+            return None
+        return hosts
+
+    def _cache_candidates(self, shape, hosts):
+        if shape is None or CONF.scheduler_candidate_cache_ttl <= 0:
+            return
+        now = timeutils.utcnow()
+        # Drop expired entries and entries from older host state
+        # generations, which can never be hit again.
+        generation = shape[0]
+        for key, (expires_at, _hosts) in list(self._candidate_cache.items()):
+            if key[0] != generation or now >= expires_at:
+                del self._candidate_cache[key]
+        expires_at = now + datetime.timedelta(
+            seconds=CONF.scheduler_candidate_cache_ttl)
+        self._candidate_cache[shape] = (expires_at, list(hosts))
+
     def _get_weighted_candidates_group(self, context, request_spec_list,
                                        filter_properties_list=None):
         """Finds hosts that supports the consistencygroup.
@@ -328,6 +446,11 @@ class FilterScheduler(driver.Scheduler):
         elevated = context.elevated()
 
         weighed_hosts = []
+        pools = None
+        # {<pool host>: <backend host>} of the candidate pools
+        pool_backends = {}
+        # Backends supporting all the volume types checked so far
+        backends = set()
         index = 0
         for request_spec in request_spec_list:
             volume_properties = request_spec['volume_properties']
@@ -365,57 +488,55 @@ class FilterScheduler(driver.Scheduler):
             self.populate_filter_properties(request_spec,
                                             filter_properties)
 
-            # Find our local list of acceptable hosts by filtering and
-            # weighing our options. we virtually consume resources on
-            # it so subsequent selections can adjust accordingly.
-
-            # Note: remember, we are using an iterator here. So only
-            # traverse this list once.
-            all_hosts = self.host_manager.get_all_host_states(elevated)
-            if not all_hosts:
-                return []
+            if pools is None:
+                pools = list(self.host_manager.get_all_host_states(elevated))
+                if not pools:
+                    return []
+                # Should schedule creation of CG on backend level, not
+                # pool level.
+                pool_backends = {pool.host: utils.extract_host(pool.host)
+                                 for pool in pools}
+            else:
+                # Only the backends supporting all the previous volume
+                # types are still candidates.
+                pools = [pool for pool in pools
+                         if pool_backends[pool.host] in backends]
 
             # Filter local hosts based on requirements ...
-            hosts = self.host_manager.get_filtered_hosts(all_hosts,
+            hosts = self.host_manager.get_filtered_hosts(pools,
                                                          filter_properties)
-
             if not hosts:
                 return []
 
             LOG.debug("Filtered %s", hosts)
+            backends = {pool_backends[host.host] for host in hosts}
 
-            # weighted_host = WeightedHost() ... the best
-            # host for the job.
-            temp_weighed_hosts = self.host_manager.get_weighed_hosts(
-                hosts,
-                filter_properties)
-            if not temp_weighed_hosts:
-                return []
             if index == 0:
-                weighed_hosts = temp_weighed_hosts
-            else:
-                new_weighed_hosts = []
-                for host1 in weighed_hosts:
-                    for host2 in temp_weighed_hosts:
-                        # Should schedule creation of CG on backend level,
-                        # not pool level.
-                        if (utils.extract_host(host1.obj.host) ==
-                                utils.extract_host(host2.obj.host)):
-                            new_weighed_hosts.append(host1)
-                weighed_hosts = new_weighed_hosts
+                # The pools of the first volume type are the ones the
+                # group gets placed on, only they need to be weighed.
+                weighed_hosts = self.host_manager.get_weighed_hosts(
+                    hosts,
+                    filter_properties)
                 if not weighed_hosts:
                     return []
 
             index += 1
 
-        return weighed_hosts
+        return [host for host in weighed_hosts
+                if pool_backends[host.obj.host] in backends]
 
-    def _schedule(self, context, request_spec, filter_properties=None):
+    def _schedule(self, context, request_spec, filter_properties=None,
+                  candidates=None):
+        CG_backend = request_spec.get('CG_backend')
+        # Only the best hosts are used, keep as many as there are scheduling
+        # attempts. All of them are needed when some get discarded below.
+        limit = None if CG_backend else self.max_attempts
         weighed_hosts = self._get_weighted_candidates(context, request_spec,
-                                                      filter_properties)
+                                                      filter_properties,
+                                                      candidates=candidates,
+                                                      limit=limit)
         # When we get the weighed_hosts, we clear those hosts whose backend
         # is not same as consistencygroup's backend.
-        CG_backend = request_spec.get('CG_backend')
         if weighed_hosts and CG_backend:
             # Get host name including host@backend#pool info from
             # weighed_hosts.
@@ -445,7 +566,7 @@ class FilterScheduler(driver.Scheduler):
         host_state = top_host.obj
         LOG.debug("Choosing %s", host_state.host)
         volume_properties = request_spec['volume_properties']
-        host_state.consume_from_volume(volume_properties)
+        self.host_manager.consume_from_volume(host_state, volume_properties)
         return top_host
 
     def _choose_top_host_group(self, weighed_hosts, request_spec_list):
@@ -22,6 +22,11 @@ from cinder.scheduler import base_filter
 
 class BaseHostFilter(base_filter.BaseFilter):
     """Base class for host filters."""
+
+    # Set to true in a subclass if the result may change after capacity
+    # was consumed from a host by a previous placement.
+    capacity_dependent = False
+
     def _filter_one(self, obj, filter_properties):
         """Return True if the object passes the filter, otherwise False."""
         return self.host_passes(obj, filter_properties)
@@ -24,15 +24,11 @@ class AffinityFilter(filters.BaseHostFilter):
     def __init__(self):
         self.volume_api = volume.API()
 
-
-class DifferentBackendFilter(AffinityFilter):
-    """Schedule volume on a different back-end from a set of volumes."""
-
-    def host_passes(self, host_state, filter_properties):
-        context = filter_properties['context']
+    def _get_affinity_uuids(self, filter_properties, hint):
+        """Return the volume ids of a scheduler hint, or None if invalid."""
         scheduler_hints = filter_properties.get('scheduler_hints') or {}
 
-        affinity_uuids = scheduler_hints.get('different_host', [])
+        affinity_uuids = scheduler_hints.get(hint, [])
 
         # scheduler hint verification: affinity_uuids can be a list of uuids
         # or single uuid.  The checks here is to make sure every single string
@@ -44,19 +40,44 @@ class DifferentBackendFilter(AffinityFilter):
                 if uuidutils.is_uuid_like(uuid):
                     continue
                 else:
-                    return False
+                    return None
         elif uuidutils.is_uuid_like(affinity_uuids):
             affinity_uuids = [affinity_uuids]
         else:
             # Not a list, not a string looks like uuid, don't pass it
             # to DB for query to avoid potential risk.
+            return None
+        return affinity_uuids
+
+    def _get_affinity_hosts(self, filter_properties, hint, affinity_uuids):
+        """Return the hosts of the volumes given in a scheduler hint.
+
+        The hosts are looked up once per scheduling request and kept in
+        filter_properties, so every host is checked against the same
+        result.
+        """
+        affinity_hosts = filter_properties.setdefault('affinity_hosts', {})
+        if hint not in affinity_hosts:
+            context = filter_properties['context']
+            volumes = self.volume_api.get_all(
+                context, filters={'id': affinity_uuids, 'deleted': False})
+            affinity_hosts[hint] = sorted(set(vol.host for vol in volumes
+                                              if vol.host))
+        return affinity_hosts[hint]
+
+
+class DifferentBackendFilter(AffinityFilter):
+    """Schedule volume on a different back-end from a set of volumes."""
+
+    def host_passes(self, host_state, filter_properties):
+        affinity_uuids = self._get_affinity_uuids(filter_properties,
+                                                  'different_host')
+        if affinity_uuids is None:
             return False
 
         if affinity_uuids:
-            return not self.volume_api.get_all(
-                context, filters={'host': host_state.host,
-                                  'id': affinity_uuids,
-                                  'deleted': False})
+            return host_state.host not in self._get_affinity_hosts(
+                filter_properties, 'different_host', affinity_uuids)
 
         # With no different_host key
         return True
@@ -66,34 +87,14 @@ class SameBackendFilter(AffinityFilter):
     """Schedule volume on the same back-end as another volume."""
 
     def host_passes(self, host_state, filter_properties):
-        context = filter_properties['context']
-        scheduler_hints = filter_properties.get('scheduler_hints') or {}
-
-        affinity_uuids = scheduler_hints.get('same_host', [])
-
-        # scheduler hint verification: affinity_uuids can be a list of uuids
-        # or single uuid.  The checks here is to make sure every single string
-        # in the list looks like a uuid, otherwise, this filter will fail to
-        # pass.  Note that the filter does *NOT* ignore string doesn't look
-        # like a uuid, it is better to fail the request than serving it wrong.
-        if isinstance(affinity_uuids, list):
-            for uuid in affinity_uuids:
-                if uuidutils.is_uuid_like(uuid):
-                    continue
-                else:
-                    return False
-        elif uuidutils.is_uuid_like(affinity_uuids):
-            affinity_uuids = [affinity_uuids]
-        else:
-            # Not a list, not a string looks like uuid, don't pass it
-            # to DB for query to avoid potential risk.
+        affinity_uuids = self._get_affinity_uuids(filter_properties,
+                                                  'same_host')
+        if affinity_uuids is None:
             return False
 
         if affinity_uuids:
-            return self.volume_api.get_all(
-                context, filters={'host': host_state.host,
-                                  'id': affinity_uuids,
-                                  'deleted': False})
+            return host_state.host in self._get_affinity_hosts(
+                filter_properties, 'same_host', affinity_uuids)
 
         # With no same_host key
         return True
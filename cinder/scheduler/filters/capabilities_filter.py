@@ -13,6 +13,8 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
+
 from oslo_log import log as logging
 
 from cinder.scheduler import filters
@@ -21,38 +23,78 @@ from cinder.scheduler.filters import extra_specs_ops
 LOG = logging.getLogger(__name__)
 
 
+# Compiled extra specs of recently seen volume types, keyed by volume type
+# id and the extra specs themselves.
+_MAX_CACHED_SPECS = 256
+_compiled_specs = collections.OrderedDict()
+
+
+def _compile_extra_specs(extra_specs):
+    """Turn extra specs into (key, capability path, req, matcher) tuples.
+
+    Scoped keys other than 'capabilities:' are dropped, since they are
+    not matched against host capabilities.
+    """
+    compiled = []
+    for key, req in extra_specs.items():
+        # Either not scoped format, or in capabilities scope
+        scope = key.split(':')
+
+        # Ignore scoped (such as vendor-specific) capabilities
+        if len(scope) > 1 and scope[0] != "capabilities":
+            continue
+        # Strip off prefix if spec started with 'capabilities:'
+        elif scope[0] == "capabilities":
+            del scope[0]
+
+        compiled.append((key, tuple(scope), req,
+                         extra_specs_ops.compile_req(req)))
+    return compiled
+
+
+def get_compiled_extra_specs(resource_type):
+    """Return the compiled extra specs of a resource type, cached."""
+    extra_specs = resource_type.get('extra_specs') or {}
+    if not extra_specs:
+        return []
+
+    try:
+        cache_key = (resource_type.get('id'),
+                     frozenset(extra_specs.items()))
+    except TypeError:
+        # Unhashable spec values can't be cached.
+        return _compile_extra_specs(extra_specs)
+
+    compiled = _compiled_specs.pop(cache_key, None)
+    if compiled is None:
+        compiled = _compile_extra_specs(extra_specs)
+    _compiled_specs[cache_key] = compiled
+    while len(_compiled_specs) > _MAX_CACHED_SPECS:
+        _compiled_specs.popitem(last=False)
+    return compiled
+
+
 class CapabilitiesFilter(filters.BaseHostFilter):
     """HostFilter to work with resource (instance & volume) type records."""
 
-    def _satisfies_extra_specs(self, capabilities, resource_type):
+    def _satisfies_extra_specs(self, capabilities, resource_type,
+                               compiled_specs=None):
         """Check if capabilities satisfy resource type requirements.
 
         Check that the capabilities provided by the services satisfy
         the extra specs associated with the resource type.
         """
-        extra_specs = resource_type.get('extra_specs', [])
-        if not extra_specs:
-            return True
-
-        for key, req in extra_specs.items():
-
-            # Either not scoped format, or in capabilities scope
-            scope = key.split(':')
-
-            # Ignore scoped (such as vendor-specific) capabilities
-            if len(scope) > 1 and scope[0] != "capabilities":
-                continue
-            # Strip off prefix if spec started with 'capabilities:'
-            elif scope[0] == "capabilities":
-                del scope[0]
+        if compiled_specs is None:
+            compiled_specs = get_compiled_extra_specs(resource_type)
 
+        for key, scope, req, matcher in compiled_specs:
             cap = capabilities
-            for index in range(len(scope)):
+            for name in scope:
                 try:
-                    cap = cap[scope[index]]
+                    cap = cap[name]
                 except (TypeError, KeyError):
                     LOG.debug("Host doesn't provide capability '%(cap)s' " %
-                              {'cap': scope[index]})
+                              {'cap': name})
                     return False
 
             # Make all capability values a list so we can handle lists
@@ -60,7 +102,7 @@ class CapabilitiesFilter(filters.BaseHostFilter):
 
             # Loop through capability values looking for any match
             for cap_value in cap_list:
-                if extra_specs_ops.match(cap_value, req):
+                if matcher(cap_value):
                     break
             else:
                 # Nothing matched, so bail out
@@ -71,14 +113,25 @@ class CapabilitiesFilter(filters.BaseHostFilter):
                 return False
         return True
 
+    def filter_all(self, filter_obj_list, filter_properties):
+        """Compile the extra specs once and check every host against them."""
+        resource_type = filter_properties.get('resource_type')
+        compiled_specs = get_compiled_extra_specs(resource_type)
+        for host_state in filter_obj_list:
+            if self._host_passes(host_state, resource_type, compiled_specs):
+                yield host_state
+
     def host_passes(self, host_state, filter_properties):
         """Return a list of hosts that can create resource_type."""
         # Note(zhiteng) Currently only Cinder and Nova are using
         # this filter, so the resource type is either instance or
         # volume.
         resource_type = filter_properties.get('resource_type')
+        return self._host_passes(host_state, resource_type)
+
+    def _host_passes(self, host_state, resource_type, compiled_specs=None):
         if not self._satisfies_extra_specs(host_state.capabilities,
-                                           resource_type):
+                                           resource_type, compiled_specs):
             LOG.debug("%(host_state)s fails resource_type extra_specs "
                       "requirements", {'host_state': host_state})
             return False
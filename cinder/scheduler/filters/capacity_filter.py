@@ -31,6 +31,8 @@ LOG = logging.getLogger(__name__)
 class CapacityFilter(filters.BaseHostFilter):
     """CapacityFilter filters based on volume host's capacity utilization."""
 
+    capacity_dependent = True
+
     def host_passes(self, host_state, filter_properties):
         """Return True if host has sufficient capacity."""
 
@@ -31,6 +31,9 @@ class DriverFilter(filters.BaseHostFilter):
     and metrics.
     """
 
+    # Filter functions may refer to the capacity stats of the host.
+    capacity_dependent = True
+
     def host_passes(self, host_state, filter_properties):
         """Determines whether a host has a passing filter_function or not."""
         stats = self._generate_stats(host_state, filter_properties)
@@ -74,8 +77,7 @@ class DriverFilter(filters.BaseHostFilter):
         qos_specs = stats['qos_specs']
         volume_stats = stats['volume_stats']
 
-        result = evaluator.evaluate(
-            func,
+        result = evaluator.compile_expression(func).evaluate(
             extra=extra_specs,
             stats=host_stats,
             capabilities=host_caps,
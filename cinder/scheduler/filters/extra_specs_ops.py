@@ -16,6 +16,7 @@
 import operator
 
 from oslo_utils import strutils
+import six
 
 # 1. The following operations are supported:
 #   =, s==, s!=, s>=, s>, s<=, s<, <in>, <is>, <or>, ==, !=, >=, <=
@@ -75,3 +76,78 @@ def match(value, req):
         pass
 
     return False
+
+
+_float_ops = {'=': operator.ge,
+              '==': operator.eq,
+              '!=': operator.ne,
+              '>=': operator.ge,
+              '<=': operator.le}
+
+
+def _float_matcher(op, req_value):
+    compare = _float_ops[op]
+    try:
+        req_float = float(req_value)
+    except ValueError:
+        req_float = None
+
+    def matcher(value):
+        if value is None:
+            return False
+        try:
+            value = float(value)
+        except ValueError:
+            return False
+        # An unparsable requirement can never be met.
+        return req_float is not None and compare(value, req_float)
+    return matcher
+
+
+def compile_req(req):
+    """Return a callable equivalent to ``lambda value: match(value, req)``.
+
+    The requirement string is split and its operator resolved once, so
+    the returned callable can be applied to many capability values
+    cheaply.
+    """
+    if req is None:
+        return lambda value: value is None
+
+    if not isinstance(req, six.string_types):
+        return lambda value: match(value, req)
+
+    words = req.split()
+    op = words.pop(0) if words else None
+    method = _op_methods.get(op)
+
+    if op != '<or>' and not method:
+        return lambda value: value == req
+
+    if op == '<or>':
+        if not words:
+            # Malformed, let match() deal with it.
+            return lambda value: match(value, req)
+        choices = tuple(words[::2])
+        return lambda value: value is not None and value in choices
+
+    if not words:
+        return lambda value: False
+
+    req_value = words[0]
+    if op in _float_ops:
+        return _float_matcher(op, req_value)
+
+    if op == '<is>':
+        req_bool = strutils.bool_from_string(req_value)
+        return lambda value: (value is not None and
+                              strutils.bool_from_string(value) is req_bool)
+
+    def matcher(value):
+        if value is None:
+            return False
+        try:
+            return bool(method(value, req_value))
+        except ValueError:
+            return False
+    return matcher
@@ -13,7 +13,13 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import collections
+import datetime
+import threading
+
+from oslo_config import cfg
 from oslo_log import log as logging
+from oslo_utils import timeutils
 from oslo_utils import uuidutils
 
 from cinder.compute import nova
@@ -23,12 +29,82 @@ from cinder.scheduler import filters
 from cinder.volume import utils as volume_utils
 
 
+instance_locality_opts = [
+    cfg.IntOpt('instance_locality_cache_ttl',
+               default=0,
+               min=0,
+               help='Number of seconds the scheduler remembers the host of '
+                    'an instance given in the local_to_instance hint. An '
+                    'instance migrated in the meantime is still looked for '
+                    'on its previous host. A value of 0 asks Nova for every '
+                    'request.'),
+    cfg.IntOpt('instance_locality_negative_cache_ttl',
+               default=0,
+               min=0,
+               help='Number of seconds the scheduler remembers that an '
+                    'instance given in the local_to_instance hint does not '
+                    'exist in Nova. A value of 0 asks Nova for every '
+                    'request.'),
+]
+
+CONF = cfg.CONF
+CONF.register_opts(instance_locality_opts)
+
 LOG = logging.getLogger(__name__)
 
 HINT_KEYWORD = 'local_to_instance'
 INSTANCE_HOST_PROP = 'OS-EXT-SRV-ATTR:host'
 REQUESTS_TIMEOUT = 5
 
+# Hosts of instances, shared by all the requests of the scheduler. Nova may
+# be asked with the token of the user, so entries are keyed by
+# (project_id, instance_uuid) and a project never sees the answers Nova gave
+# to another one. Unknown instances are cached with a host of
+# _UNKNOWN_INSTANCE.
+_UNKNOWN_INSTANCE = object()
+_MAX_CACHED_INSTANCES = 1024
+_instance_hosts = collections.OrderedDict()
+_instance_hosts_lock = threading.Lock()
+
+
+def _get_cached_instance_host(project_id, instance_uuid):
+    """Return (found, host) for an instance from the shared cache."""
+    key = (project_id, instance_uuid)
+    with _instance_hosts_lock:
+        cached = _instance_hosts.get(key)
+        if cached is None:
+            return False, None
+        expires_at, host = cached
+        if timeutils.utcnow() >= expires_at:
+            del _instance_hosts[key]
+            return False, None
+        # Most recently used entries are kept last.
+        del _instance_hosts[key]
+        _instance_hosts[key] = cached
+        return True, host
+
+
+def _cache_instance_host(project_id, instance_uuid, host):
+    if host is _UNKNOWN_INSTANCE:
+        ttl = CONF.instance_locality_negative_cache_ttl
+    else:
+        ttl = CONF.instance_locality_cache_ttl
+    if ttl <= 0:
+        return
+    expires_at = timeutils.utcnow() + datetime.timedelta(seconds=ttl)
+    key = (project_id, instance_uuid)
+    with _instance_hosts_lock:
+        _instance_hosts.pop(key, None)
+        _instance_hosts[key] = (expires_at, host)
+        while len(_instance_hosts) > _MAX_CACHED_INSTANCES:
+            _instance_hosts.popitem(last=False)
+
+
+def clear_cache():
+    """Forget the hosts of all instances."""
+    with _instance_hosts_lock:
+        _instance_hosts.clear()
+
 
 class InstanceLocalityFilter(filters.BaseHostFilter):
     """Schedule volume on the same host as a given instance.
@@ -49,10 +125,14 @@ class InstanceLocalityFilter(filters.BaseHostFilter):
 
     """
 
+    io_bound = True
+
     def __init__(self):
         # Cache Nova API answers directly into the Filter object.
         # Since a BaseHostFilter instance lives only during the volume's
         # scheduling, the cache is re-created for every new volume creation.
+        # Answers are also shared with later requests for
+        # instance_locality_cache_ttl seconds.
         self._cache = {}
         super(InstanceLocalityFilter, self).__init__()
 
@@ -91,9 +171,23 @@ class InstanceLocalityFilter(filters.BaseHostFilter):
         # enhancement would be to subscribe to Nova migration events (e.g. via
         # Ceilometer).
 
+        instance_host = self._get_instance_host(context, instance_uuid)
+
+        # Match if given instance is hosted on host
+        return instance_host == host
+
+    def _get_instance_host(self, context, instance_uuid):
         # First, lookup for already-known information in local cache
         if instance_uuid in self._cache:
-            return self._cache[instance_uuid] == host
+            return self._cache[instance_uuid]
+
+        found, instance_host = _get_cached_instance_host(context.project_id,
+                                                         instance_uuid)
+        if found:
+            if instance_host is _UNKNOWN_INSTANCE:
+                raise exception.ServerNotFound(uuid=instance_uuid)
+            self._cache[instance_uuid] = instance_host
+            return instance_host
 
         if not self._nova_has_extended_server_attributes(context):
             LOG.warning(_LW('Hint "%s" dropped because '
@@ -102,9 +196,14 @@ class InstanceLocalityFilter(filters.BaseHostFilter):
             raise exception.CinderException(_('Hint "%s" not supported.') %
                                             HINT_KEYWORD)
 
-        server = nova.API().get_server(context, instance_uuid,
-                                       privileged_user=True,
-                                       timeout=REQUESTS_TIMEOUT)
+        try:
+            server = nova.API().get_server(context, instance_uuid,
+                                           privileged_user=True,
+                                           timeout=REQUESTS_TIMEOUT)
+        except exception.ServerNotFound:
+            _cache_instance_host(context.project_id, instance_uuid,
+                                 _UNKNOWN_INSTANCE)
+            raise
 
         if not hasattr(server, INSTANCE_HOST_PROP):
             LOG.warning(_LW('Hint "%s" dropped because Nova did not return '
@@ -115,6 +214,6 @@ class InstanceLocalityFilter(filters.BaseHostFilter):
                                             HINT_KEYWORD)
 
         self._cache[instance_uuid] = getattr(server, INSTANCE_HOST_PROP)
-
-        # Match if given instance is hosted on host
-        return self._cache[instance_uuid] == host
+        _cache_instance_host(context.project_id, instance_uuid,
+                             self._cache[instance_uuid])
+        return self._cache[instance_uuid]
@@ -23,6 +23,9 @@ from cinder.scheduler import filters
 
 class JsonFilter(filters.BaseHostFilter):
     """Host Filter to allow simple JSON-based grammar for selecting hosts."""
+
+    capacity_dependent = True
+
     def _op_compare(self, args, op):
         """Compare first item of args with the rest using specified operator.
 
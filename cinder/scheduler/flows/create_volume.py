@@ -131,19 +131,23 @@ class ScheduleCreateVolumeTask(flow_utils.CinderTask):
             # reraise (since what's the point?)
             with excutils.save_and_reraise_exception(
                     reraise=not isinstance(e, exception.NoValidHost)):
-                if isinstance(e, exception.NoValidHost):
-                    self.message_api.create(
-                        context,
-                        defined_messages.UNABLE_TO_ALLOCATE,
-                        context.project_id,
-                        resource_type=resource_types.VOLUME,
-                        resource_uuid=request_spec['volume_id'])
-                try:
-                    self._handle_failure(context, request_spec, e)
-                finally:
-                    common.error_out_volume(context, self.db_api,
-                                            request_spec['volume_id'],
-                                            reason=e)
+                self.handle_schedule_error(context, request_spec, e)
+
+    def handle_schedule_error(self, context, request_spec, e):
+        """Notify about a scheduling failure and error out the volume."""
+        if isinstance(e, exception.NoValidHost):
+            self.message_api.create(
+                context,
+                defined_messages.UNABLE_TO_ALLOCATE,
+                context.project_id,
+                resource_type=resource_types.VOLUME,
+                resource_uuid=request_spec['volume_id'])
+        try:
+            self._handle_failure(context, request_spec, e)
+        finally:
+            common.error_out_volume(context, self.db_api,
+                                    request_spec['volume_id'],
+                                    reason=e)
 
 
 def get_flow(context, db_api, driver_api, request_spec=None,
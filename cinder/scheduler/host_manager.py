@@ -17,18 +17,23 @@
 Manage hosts in the current zone.
 """
 
+import bisect
 import collections
+import uuid
 
 from oslo_config import cfg
 from oslo_log import log as logging
 from oslo_utils import timeutils
+import six
+from six import moves
 
 from cinder import context as cinder_context
 from cinder import exception
 from cinder import objects
 from cinder import utils
-from cinder.i18n import _LI, _LW
+from cinder.i18n import _, _LE, _LI, _LW
 from cinder.scheduler import filters
+from cinder.scheduler import shared_state
 from cinder.scheduler import weights
 from cinder.volume import utils as vol_utils
 
@@ -46,7 +51,35 @@ host_manager_opts = [
                 default=[
                     'CapacityWeigher'
                 ],
-                help='Which weigher class names to use for weighing hosts.')
+                help='Which weigher class names to use for weighing hosts.'),
+    cfg.IntOpt('scheduler_service_list_ttl',
+               default=0,
+               help='Number of seconds the scheduler reuses the list of '
+                    'active volume services before querying the database '
+                    'again. Capability updates received from volume '
+                    'services are applied regardless of this value. A '
+                    'value of 0 refreshes the list for every request.'),
+    cfg.StrOpt('scheduler_shared_state_backend',
+               choices=['sqlite', 'tooz'],
+               help='Backend used by several schedulers to share the '
+                    'capacity they consume, until it is reflected in the '
+                    'capabilities reported by volume services. "sqlite" '
+                    'stores it in the scheduler_shared_state_path database '
+                    'and only works for schedulers on the same node, '
+                    '"tooz" uses the distributed coordination backend '
+                    'set in the [coordination] section. Disabled if not '
+                    'set.'),
+    cfg.StrOpt('scheduler_shared_state_path',
+               default='$state_path/scheduler_shared_state.sqlite',
+               help='Path of the database used by the sqlite scheduler '
+                    'shared state backend.'),
+    cfg.IntOpt('scheduler_shared_state_ttl',
+               default=180,
+               min=1,
+               help='Number of seconds capacity consumed by a scheduler is '
+                    'shared with other schedulers. It should be longer '
+                    'than the interval between capability reports of '
+                    'volume services.'),
 ]
 
 CONF = cfg.CONF
@@ -56,12 +89,56 @@ CONF.import_opt('max_over_subscription_ratio', 'cinder.volume.driver')
 
 LOG = logging.getLogger(__name__)
 
+# Service columns that change with every heartbeat of a service, without
+# making any difference to the scheduling.
+_SERVICE_HEARTBEAT_FIELDS = frozenset(('created_at', 'updated_at',
+                                       'deleted_at', 'report_count'))
+
+
+def _service_changed(service, previous):
+    """Whether a service changed in a way that matters to the scheduler."""
+    keys = (set(service) | set(previous)) - _SERVICE_HEARTBEAT_FIELDS
+    return any(service.get(key) != previous.get(key) for key in keys)
+
+
+def _intern_key(key):
+    """Intern a capability key.
+
+    Only str can be interned, and keys received over RPC are unicode on
+    Python 2, so ASCII keys are encoded first. They still compare and hash
+    equal to the unicode keys.
+    """
+    if six.PY2 and isinstance(key, six.text_type):
+        try:
+            key = key.encode('ascii')
+        except UnicodeEncodeError:
+            return key
+    if isinstance(key, str):
+        return moves.intern(key)
+    return key
+
+
+class ReadOnlyDict(object):
+    """A read-only dict.
+
+    Capability reports are never modified once received, so the wrapped
+    dict is shared when built from another ReadOnlyDict, and only copied
+    (with interned keys, as every back-end reports the same ones) when
+    built from a plain dict.
+
+    collections.Mapping has no __slots__ on Python 2, so this class only
+    registers as a Mapping instead of deriving from it, to keep instances
+    without a __dict__.
+    """
+
+    __slots__ = ('data',)
 
-class ReadOnlyDict(collections.Mapping):
-    """A read-only dict."""
     def __init__(self, source=None):
-        if source is not None:
-            self.data = dict(source)
+        if isinstance(source, ReadOnlyDict):
+            self.data = source.data
+        elif source:
+            self.data = {_intern_key(key): value
+                         for key, value in source.items()}
         else:
             self.data = {}
 
@@ -74,13 +151,61 @@ class ReadOnlyDict(collections.Mapping):
     def __len__(self):
         return len(self.data)
 
+    def __contains__(self, key):
+        return key in self.data
+
+    def __eq__(self, other):
+        if isinstance(other, ReadOnlyDict):
+            other = other.data
+        return self.data == other
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def get(self, key, default=None):
+        return self.data.get(key, default)
+
+    def keys(self):
+        return self.data.keys()
+
+    def items(self):
+        return self.data.items()
+
+    def values(self):
+        return self.data.values()
+
+    if six.PY2:
+        def iterkeys(self):
+            return self.data.iterkeys()
+
+        def iteritems(self):
+            return self.data.iteritems()
+
+        def itervalues(self):
+            return self.data.itervalues()
+
     def __repr__(self):
         return '%s(%r)' % (self.__class__.__name__, self.data)
 
 
+collections.Mapping.register(ReadOnlyDict)
+
+
 class HostState(object):
     """Mutable and immutable information tracked for a volume backend."""
 
+    # The scheduler keeps one of these per pool, tens of thousands of them
+    # on large deployments.
+    __slots__ = ('capabilities', 'service', 'host', 'volume_backend_name',
+                 'vendor_name', 'driver_version', 'storage_protocol',
+                 'QoS_support', 'total_capacity_gb', 'allocated_capacity_gb',
+                 'free_capacity_gb', 'reserved_percentage',
+                 'provisioned_capacity_gb', 'max_over_subscription_ratio',
+                 'thin_provisioning_support', 'thick_provisioning_support',
+                 'multiattach', 'pools', 'applied_reservations', 'updated')
+
     def __init__(self, host, capabilities=None, service=None):
         self.capabilities = None
         self.service = None
@@ -114,6 +239,9 @@ class HostState(object):
 
         # PoolState for all pools
         self.pools = {}
+        # Ids of the shared capacity reservations consumed since the last
+        # capability report.
+        self.applied_reservations = set()
 
         self.updated = None
 
@@ -127,6 +255,12 @@ class HostState(object):
             service = {}
         self.service = ReadOnlyDict(service)
 
+    def update_service(self, service):
+        """Update the service info of this host and all of its pools."""
+        self.service = ReadOnlyDict(service)
+        for pool in (self.pools or {}).values():
+            pool.service = self.service
+
     def update_from_volume_capability(self, capability, service=None):
         """Update information about a host from its volume_node info.
 
@@ -207,7 +341,9 @@ class HostState(object):
                     # Add new pool
                     cur_pool = PoolState(self.host, pool_cap, pool_name)
                     self.pools[pool_name] = cur_pool
-                cur_pool.update_from_volume_capability(pool_cap, service)
+                # Pools share the service dict of their host.
+                cur_pool.update_from_volume_capability(pool_cap,
+                                                       self.service)
 
                 active_pools.add(pool_name)
         elif pools is None:
@@ -234,7 +370,8 @@ class HostState(object):
                     self._append_backend_info(capability)
                     self.pools[pool_name] = single_pool
 
-            single_pool.update_from_volume_capability(capability, service)
+            single_pool.update_from_volume_capability(capability,
+                                                      self.service)
             active_pools.add(pool_name)
 
         # remove non-active pools from self.pools
@@ -293,6 +430,8 @@ class HostState(object):
 
 
 class PoolState(HostState):
+    __slots__ = ('pool_name',)
+
     def __init__(self, host, capabilities, pool_name):
         new_host = vol_utils.append_host(host, pool_name)
         super(PoolState, self).__init__(new_host, capabilities)
@@ -307,6 +446,7 @@ class PoolState(HostState):
             if self.updated and self.updated > capability['timestamp']:
                 return
             self.update_backend(capability)
+            self.applied_reservations = set()
 
             self.total_capacity_gb = capability.get('total_capacity_gb', 0)
             self.free_capacity_gb = capability.get('free_capacity_gb', 0)
@@ -352,6 +492,28 @@ class HostManager(object):
         self.weight_classes = self.weight_handler.get_all_classes()
 
         self._no_capabilities_hosts = set()  # Hosts having no capabilities
+        # Sequence number of the last capability report of each host
+        self._capabilities_sequences = {}
+        # Cached {<host>: <service dict>} of the volume services that are up
+        self._volume_services = {}
+        self._volume_services_refreshed = None
+        # Capabilities dict last applied to each entry of host_state_map.
+        # update_service_capabilities() always stores a new dict, so an
+        # identity check tells whether a host has reported since.
+        self._applied_capabilities = {}
+        # Bumped whenever an entry of host_state_map is added, removed or
+        # updated from a capability report or a service change.
+        self.generation = 0
+        self._all_pools = {}
+        self._all_pools_generation = None
+        # Pool listing of get_pools(), sorted by name
+        self._pools_listing = []
+        self._pools_listing_generation = None
+        self._shared_state = shared_state.get_backend(
+            CONF.scheduler_shared_state_backend,
+            CONF.scheduler_shared_state_path,
+            CONF.scheduler_shared_state_ttl)
+        self._scheduler_id = str(uuid.uuid4())
         self._update_host_state_map(cinder_context.get_admin_context())
 
     def _choose_host_filters(self, filter_cls_names):
@@ -410,33 +572,55 @@ class HostManager(object):
         return good_weighers
 
     def get_filtered_hosts(self, hosts, filter_properties,
-                           filter_class_names=None):
-        """Filter hosts and return only ones passing all filters."""
+                           filter_class_names=None, capacity_only=False):
+        """Filter hosts and return only ones passing all filters.
+
+        If capacity_only is True, only the filters whose result depends on
+        consumed capacity are run.
+        """
         filter_classes = self._choose_host_filters(filter_class_names)
-        return self.filter_handler.get_filtered_objects(filter_classes,
-                                                        hosts,
-                                                        filter_properties)
+        if capacity_only:
+            filter_classes = [cls for cls in filter_classes
+                              if cls.capacity_dependent]
+        return self.filter_handler.get_filtered_objects(
+            filter_classes, hosts, filter_properties)
 
     def get_weighed_hosts(self, hosts, weight_properties,
-                          weigher_class_names=None):
-        """Weigh the hosts."""
+                          weigher_class_names=None, limit=None):
+        """Weigh the hosts.
+
+        If limit is given, only the limit best hosts are returned.
+        """
         weigher_classes = self._choose_host_weighers(weigher_class_names)
         return self.weight_handler.get_weighed_objects(weigher_classes,
                                                        hosts,
-                                                       weight_properties)
+                                                       weight_properties,
+                                                       limit=limit)
 
-    def update_service_capabilities(self, service_name, host, capabilities):
-        """Update the per-service capabilities based on this notification."""
+    def update_service_capabilities(self, service_name, host, capabilities,
+                                    sequence=None, delta=None):
+        """Update the per-service capabilities based on this notification.
+
+        If delta is given, it is applied to the previous report of the
+        service instead of replacing it, see _apply_capabilities_delta().
+        """
         if service_name != 'volume':
             LOG.debug('Ignoring %(service_name)s service update '
                       'from %(host)s',
                       {'service_name': service_name, 'host': host})
             return
 
-        # Copy the capabilities, so we don't modify the original dict
-        capab_copy = dict(capabilities)
+        if delta is not None:
+            capab_copy = self._apply_capabilities_delta(host, delta, sequence)
+            if capab_copy is None:
+                return
+            capabilities = delta
+        else:
+            # Copy the capabilities, so we don't modify the original dict
+            capab_copy = dict(capabilities)
         capab_copy["timestamp"] = timeutils.utcnow()  # Reported time
         self.service_states[host] = capab_copy
+        self._capabilities_sequences[host] = sequence
 
         LOG.debug("Received %(service_name)s service update from "
                   "%(host)s: %(cap)s",
@@ -445,40 +629,123 @@ class HostManager(object):
 
         self._no_capabilities_hosts.discard(host)
 
+    def _apply_capabilities_delta(self, host, delta, sequence):
+        """Return the capabilities of a host updated from a delta report.
+
+        A delta looks like this::
+
+            {'updated': {<key>: <value>, ...},
+             'removed': [<key>, ...],
+             'pools': {<pool name>: {'updated': {...}, 'removed': [...]}},
+             'removed_pools': [<pool name>, ...]}
+
+        Returns None if the delta doesn't follow the last report received
+        from the host, in which case the host keeps its capabilities until
+        its next full report.
+        """
+        last_sequence = self._capabilities_sequences.get(host)
+        if (host not in self.service_states or sequence is None or
+                last_sequence is None or sequence != last_sequence + 1):
+            LOG.debug("Ignoring capabilities delta %(seq)s from %(host)s, "
+                      "last report was %(last)s. Waiting for a full "
+                      "report.", {'seq': sequence, 'host': host,
+                                  'last': last_sequence})
+            return None
+
+        old_capabilities = self.service_states[host]
+        capabilities = dict(old_capabilities)
+        for key in delta.get('removed', []):
+            capabilities.pop(key, None)
+        capabilities.update(delta.get('updated', {}))
+
+        old_pools = old_capabilities.get('pools')
+        if isinstance(old_pools, list) and 'pools' not in delta.get(
+                'updated', {}):
+            pool_deltas = dict(delta.get('pools', {}))
+            removed_pools = set(delta.get('removed_pools', []))
+            pools = []
+            for old_pool in old_pools:
+                pool_name = old_pool['pool_name']
+                if pool_name in removed_pools:
+                    continue
+                # Pools are completed with backend info and the report
+                # time when applied, start from a copy without the time so
+                # the pool gets the time of this report.
+                pool = dict(old_pool)
+                pool.pop('timestamp', None)
+                pool_delta = pool_deltas.pop(pool_name, None)
+                if pool_delta:
+                    for key in pool_delta.get('removed', []):
+                        pool.pop(key, None)
+                    pool.update(pool_delta.get('updated', {}))
+                pools.append(pool)
+            # Remaining deltas are for new pools.
+            for pool_name, pool_delta in pool_deltas.items():
+                pools.append(dict(pool_delta.get('updated', {})))
+            capabilities['pools'] = pools
+        return capabilities
+
     def has_all_capabilities(self):
         return len(self._no_capabilities_hosts) == 0
 
-    def _update_host_state_map(self, context):
+    def _volume_services_expired(self):
+        ttl = CONF.scheduler_service_list_ttl
+        if ttl <= 0 or self._volume_services_refreshed is None:
+            return True
+        return timeutils.is_older_than(self._volume_services_refreshed, ttl)
 
-        # Get resource usage across the available volume nodes:
+    def _refresh_volume_services(self, context):
+        """Refresh the cached map of volume services that are up."""
         topic = CONF.volume_topic
         volume_services = objects.ServiceList.get_all_by_topic(context,
                                                                topic,
                                                                disabled=False)
-        active_hosts = set()
-        no_capabilities_hosts = set()
+        services = {}
         for service in volume_services.objects:
             host = service.host
             if not utils.service_is_up(service):
                 LOG.warning(_LW("volume service is down. (host: %s)"), host)
                 continue
+            services[host] = dict(service)
+
+        self._volume_services = services
+        if CONF.scheduler_service_list_ttl > 0:
+            self._volume_services_refreshed = timeutils.utcnow()
+
+    def _update_host_state_map(self, context):
+        services_refreshed = self._volume_services_expired()
+        if services_refreshed:
+            self._refresh_volume_services(context)
+
+        active_hosts = set()
+        no_capabilities_hosts = set()
+        for host, service in self._volume_services.items():
             capabilities = self.service_states.get(host, None)
             if capabilities is None:
                 no_capabilities_hosts.add(host)
                 continue
 
+            active_hosts.add(host)
             host_state = self.host_state_map.get(host)
             if not host_state:
                 host_state = self.host_state_cls(host,
                                                  capabilities=capabilities,
-                                                 service=
-                                                 dict(service))
+                                                 service=service)
                 self.host_state_map[host] = host_state
+            elif self._applied_capabilities.get(host) is capabilities:
+                # Nothing reported since the last update, only pick up
+                # changes to the service itself.
+                if services_refreshed and _service_changed(
+                        service, host_state.service):
+                    host_state.update_service(service)
+                    self.generation += 1
+                continue
+
             # update capabilities and attributes in host_state
             host_state.update_from_volume_capability(capabilities,
-                                                     service=
-                                                     dict(service))
-            active_hosts.add(host)
+                                                     service=service)
+            self._applied_capabilities[host] = capabilities
+            self.generation += 1
 
         self._no_capabilities_hosts = no_capabilities_hosts
 
@@ -488,6 +755,8 @@ class HostManager(object):
             LOG.info(_LI("Removing non-active host: %(host)s from "
                          "scheduler cache."), {'host': host})
             del self.host_state_map[host]
+            self._applied_capabilities.pop(host, None)
+            self.generation += 1
 
     def get_all_host_states(self, context):
         """Returns a dict of all the hosts the HostManager knows about.
@@ -501,30 +770,138 @@ class HostManager(object):
 
         self._update_host_state_map(context)
 
-        # build a pool_state map and return that map instead of host_state_map
-        all_pools = {}
-        for host, state in self.host_state_map.items():
-            for key in state.pools:
-                pool = state.pools[key]
-                # use host.pool_name to make sure key is unique
-                pool_key = '.'.join([host, pool.pool_name])
-                all_pools[pool_key] = pool
+        if self._all_pools_generation != self.generation:
+            # build a pool_state map and return that map instead of
+            # host_state_map
+            all_pools = {}
+            for host, state in self.host_state_map.items():
+                for key in state.pools:
+                    pool = state.pools[key]
+                    # use host.pool_name to make sure key is unique
+                    pool_key = '.'.join([host, pool.pool_name])
+                    all_pools[pool_key] = pool
+            self._all_pools = all_pools
+            self._all_pools_generation = self.generation
+
+        if self._shared_state is not None:
+            self._apply_shared_reservations()
+
+        return self._all_pools.values()
+
+    def _apply_shared_reservations(self):
+        """Consume the capacity reserved by other schedulers.
+
+        Reservations made before the last capability report of a pool are
+        considered to be reflected in the reported capacity.
+        """
+        try:
+            reservations = self._shared_state.get_reservations()
+        except Exception:
+            LOG.exception(_LE("Failed to get capacity reservations of other "
+                              "schedulers."))
+            return
+
+        pools = {pool.host: pool for pool in self._all_pools.values()}
+        for reservation in reservations:
+            pool = pools.get(reservation.host)
+            if (pool is None or
+                    reservation.id in pool.applied_reservations):
+                continue
+            reported = (pool.capabilities or {}).get('timestamp')
+            if (reported is not None and reservation.created_at <=
+                    shared_state.to_timestamp(reported)):
+                continue
+            pool.consume_from_volume({'size': reservation.size})
+            pool.applied_reservations.add(reservation.id)
+
+    def consume_from_volume(self, host_state, volume):
+        """Consume capacity of a host for a volume placed on it.
 
-        return all_pools.values()
+        The reservation is shared with the other schedulers when a shared
+        state backend is configured.
+        """
+        host_state.consume_from_volume(volume)
+        if self._shared_state is None:
+            return
 
-    def get_pools(self, context):
-        """Returns a dict of all pools on all hosts HostManager knows about."""
+        reservation = shared_state.Reservation(
+            str(uuid.uuid4()), self._scheduler_id, host_state.host,
+            volume['size'], timeutils.utcnow_ts(microsecond=True))
+        host_state.applied_reservations.add(reservation.id)
+        try:
+            self._shared_state.add_reservation(reservation)
+        except Exception:
+            LOG.exception(_LE("Failed to share capacity reservation of "
+                              "%(size)s GB on %(host)s."),
+                          {'size': reservation.size, 'host': reservation.host})
+
+    def get_pools(self, context, filters=None):
+        """Returns a dict of all pools on all hosts HostManager knows about.
+
+        The listing is only rebuilt when a host state changed. Besides the
+        'marker', 'limit' and 'offset' pagination parameters, filters may
+        contain:
+
+        - 'name': the name of the pool, host@backend#pool
+        - 'backend': the backend of the pool, host@backend
+        - any capability key, matching pools reporting that value.
+        """
 
         self._update_host_state_map(context)
 
-        all_pools = []
-        for host, state in self.host_state_map.items():
-            for key in state.pools:
-                pool = state.pools[key]
-                # use host.pool_name to make sure key is unique
-                pool_key = vol_utils.append_host(host, pool.pool_name)
-                new_pool = dict(name=pool_key)
-                new_pool.update(dict(capabilities=pool.capabilities))
-                all_pools.append(new_pool)
-
-        return all_pools
+        if self._pools_listing_generation != self.generation:
+            all_pools = []
+            for host, state in self.host_state_map.items():
+                for key in state.pools:
+                    pool = state.pools[key]
+                    # use host.pool_name to make sure key is unique
+                    pool_key = vol_utils.append_host(host, pool.pool_name)
+                    new_pool = dict(name=pool_key)
+                    new_pool.update(dict(capabilities=pool.capabilities))
+                    all_pools.append(new_pool)
+            all_pools.sort(key=lambda pool: pool['name'])
+            self._pools_listing = all_pools
+            self._pools_listing_generation = self.generation
+
+        if not filters:
+            return list(self._pools_listing)
+        return self._filter_pools(self._pools_listing, filters)
+
+    @staticmethod
+    def _filter_pools(pools, filters):
+        """Filter and paginate the pool listing, sorted by name."""
+        filters = dict(filters)
+        marker = filters.pop('marker', None)
+        limit = filters.pop('limit', None)
+        offset = filters.pop('offset', None) or 0
+        name = filters.pop('name', None)
+        backend = filters.pop('backend', None)
+
+        if marker is not None:
+            names = [pool['name'] for pool in pools]
+            start = bisect.bisect_right(names, marker)
+            if start == 0 or names[start - 1] != marker:
+                raise exception.InvalidInput(
+                    reason=_('Marker pool %s not found.') % marker)
+            pools = pools[start:]
+
+        result = []
+        for pool in pools:
+            if name is not None and pool['name'] != name:
+                continue
+            if (backend is not None and
+                    vol_utils.extract_host(pool['name']) != backend):
+                continue
+            capabilities = pool['capabilities']
+            # Filters come from the API query string, compare strings.
+            if any(key not in capabilities or
+                   six.text_type(capabilities[key]) != six.text_type(value)
+                   for key, value in filters.items()):
+                continue
+            if offset:
+                offset -= 1
+                continue
+            if limit is not None and len(result) >= limit:
+                break
+            result.append(pool)
+        return result
@@ -85,13 +85,16 @@ class SchedulerManager(manager.Manager):
         self.driver.reset()
 
     def update_service_capabilities(self, context, service_name=None,
-                                    host=None, capabilities=None, **kwargs):
+                                    host=None, capabilities=None,
+                                    sequence=None, delta=None, **kwargs):
         """Process a capability update from a service node."""
         if capabilities is None:
             capabilities = {}
         self.driver.update_service_capabilities(service_name,
                                                 host,
-                                                capabilities)
+                                                capabilities,
+                                                sequence=sequence,
+                                                delta=delta)
 
     def _wait_for_scheduler(self):
         # NOTE(dulek): We're waiting for scheduler to announce that it's ready
@@ -152,6 +155,35 @@ class SchedulerManager(manager.Manager):
         with flow_utils.DynamicLogListener(flow_engine, logger=LOG):
             flow_engine.run()
 
+    def create_volumes(self, context, request_spec_list,
+                       filter_properties_list=None):
+        """Schedule the creation of several volumes at once.
+
+        Hosts are filtered once per distinct request and each volume is
+        then sent to its volume service, bypassing the per volume
+        scheduling flow.
+        """
+        self._wait_for_scheduler()
+
+        if filter_properties_list is None:
+            filter_properties_list = [{} for __ in request_spec_list]
+
+        errors = self.driver.schedule_create_volumes(context,
+                                                     request_spec_list,
+                                                     filter_properties_list)
+
+        failure_task = create_volume.ScheduleCreateVolumeTask(db,
+                                                              self.driver)
+        for request_spec, error in zip(request_spec_list, errors):
+            if error is None:
+                continue
+            if not isinstance(error, exception.NoValidHost):
+                LOG.error(_LE("Failed to schedule volume %(volume_id)s: "
+                              "%(error)s"),
+                          {'volume_id': request_spec['volume_id'],
+                           'error': error})
+            failure_task.handle_schedule_error(context, request_spec, error)
+
     def request_service_capabilities(self, context):
         volume_rpcapi.VolumeAPI().publish_service_capabilities(context)
 
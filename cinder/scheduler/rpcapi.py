@@ -53,9 +53,12 @@ class SchedulerAPI(rpc.RPCAPI):
 
         2.0 - Remove 1.x compatibility
         2.1 - Adds support for sending objects over RPC in manage_existing()
+        2.2 - Add create_volumes method
+        2.3 - Add sequence and delta arguments to
+              update_service_capabilities
     """
 
-    RPC_API_VERSION = '2.1'
+    RPC_API_VERSION = '2.3'
     TOPIC = CONF.scheduler_topic
     BINARY = 'cinder-scheduler'
 
@@ -92,6 +95,31 @@ class SchedulerAPI(rpc.RPCAPI):
         cctxt = self.client.prepare(version=version)
         return cctxt.cast(ctxt, 'create_volume', **msg_args)
 
+    def create_volumes(self, ctxt, request_spec_list,
+                       filter_properties_list=None):
+        if filter_properties_list is None:
+            filter_properties_list = [{} for __ in request_spec_list]
+
+        if not self.client.can_send_version('2.2'):
+            # Older schedulers get one create_volume cast per volume.
+            for request_spec, filter_properties in zip(
+                    request_spec_list, filter_properties_list):
+                self.create_volume(ctxt, CONF.scheduler_topic,
+                                   request_spec['volume_id'],
+                                   snapshot_id=request_spec.get(
+                                       'snapshot_id'),
+                                   image_id=request_spec.get('image_id'),
+                                   request_spec=request_spec,
+                                   filter_properties=filter_properties)
+            return
+
+        request_spec_p_list = [jsonutils.to_primitive(request_spec)
+                               for request_spec in request_spec_list]
+        cctxt = self.client.prepare(version='2.2')
+        return cctxt.cast(ctxt, 'create_volumes',
+                          request_spec_list=request_spec_p_list,
+                          filter_properties_list=filter_properties_list)
+
     def migrate_volume_to_host(self, ctxt, topic, volume_id, host,
                                force_host_copy=False, request_spec=None,
                                filter_properties=None, volume=None):
@@ -141,9 +169,23 @@ class SchedulerAPI(rpc.RPCAPI):
 
     def update_service_capabilities(self, ctxt,
                                     service_name, host,
-                                    capabilities):
-        version = '2.0'
+                                    capabilities, sequence=None,
+                                    delta=None):
+        """Send the capabilities of a service to all schedulers.
+
+        If the schedulers support it, only the delta to the previous report
+        of the same service is sent when one is given.
+        """
+        msg_args = dict(service_name=service_name, host=host)
+        if self.client.can_send_version('2.3'):
+            version = '2.3'
+            msg_args['sequence'] = sequence
+            if delta is not None:
+                msg_args['delta'] = delta
+            else:
+                msg_args['capabilities'] = capabilities
+        else:
+            version = '2.0'
+            msg_args['capabilities'] = capabilities
         cctxt = self.client.prepare(fanout=True, version=version)
-        cctxt.cast(ctxt, 'update_service_capabilities',
-                   service_name=service_name, host=host,
-                   capabilities=capabilities)
+        cctxt.cast(ctxt, 'update_service_capabilities', **msg_args)
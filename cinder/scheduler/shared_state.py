@@ -0,0 +1,182 @@
+# Copyright (c) 2016 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Capacity reservations shared by several schedulers.
+
+A scheduler only knows about the capacity it consumed itself until the
+volume services report their new capabilities. Schedulers running side by
+side record the capacity they consume in a shared backend, so the others
+can take it into account.
+"""
+
+import calendar
+import collections
+import contextlib
+import sqlite3
+import threading
+
+from oslo_utils import timeutils
+import tooz
+from tooz import coordination as tooz_coordination
+
+from cinder import coordination
+
+Reservation = collections.namedtuple(
+    'Reservation', ['id', 'scheduler', 'host', 'size', 'created_at'])
+
+
+def to_timestamp(value):
+    """Return a datetime as a number of seconds since the epoch."""
+    return calendar.timegm(value.utctimetuple()) + value.microsecond / 1e6
+
+
+class SharedStateBackend(object):
+    """Base class of the backends storing capacity reservations.
+
+    :param ttl: number of seconds after which reservations are dropped,
+                should be longer than the interval between capability
+                reports of volume services.
+    """
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+
+    def _expired(self, reservation, now):
+        return reservation.created_at < now - self.ttl
+
+    def add_reservation(self, reservation):
+        """Record a reservation made by this scheduler."""
+        raise NotImplementedError()
+
+    def get_reservations(self):
+        """Return the reservations of all schedulers which didn't expire."""
+        raise NotImplementedError()
+
+
+class SQLiteBackend(SharedStateBackend):
+    """Store reservations in a SQLite database.
+
+    Only suitable for schedulers running on the same node.
+    """
+
+    def __init__(self, path, ttl):
+        super(SQLiteBackend, self).__init__(ttl)
+        self.path = path
+        with self._connect() as conn:
+            conn.execute('CREATE TABLE IF NOT EXISTS reservations ('
+                         'id TEXT PRIMARY KEY, scheduler TEXT, host TEXT, '
+                         'size REAL, created_at REAL)')
+
+    @contextlib.contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def add_reservation(self, reservation):
+        now = timeutils.utcnow_ts(microsecond=True)
+        with self._connect() as conn:
+            conn.execute('DELETE FROM reservations WHERE created_at < ?',
+                         (now - self.ttl,))
+            conn.execute('INSERT INTO reservations VALUES (?, ?, ?, ?, ?)',
+                         tuple(reservation))
+
+    def get_reservations(self):
+        now = timeutils.utcnow_ts(microsecond=True)
+        with self._connect() as conn:
+            rows = conn.execute('SELECT id, scheduler, host, size, '
+                                'created_at FROM reservations WHERE '
+                                'created_at >= ?', (now - self.ttl,))
+            return [Reservation(*row) for row in rows]
+
+
+class ToozBackend(SharedStateBackend):
+    """Share reservations through the distributed coordination backend.
+
+    Every scheduler joins a tooz group and publishes its own reservations
+    as its member capabilities.
+    """
+
+    GROUP = b'cinder-scheduler-reservations'
+
+    def __init__(self, ttl):
+        super(ToozBackend, self).__init__(ttl)
+        self.coordinator = coordination.Coordinator(prefix='cinder-scheduler-')
+        self._reservations = []
+        self._joined = False
+        self._lock = threading.Lock()
+
+    def _get_coordinator(self):
+        self.coordinator.start()
+        coordinator = self.coordinator.coordinator
+        if not self._joined:
+            try:
+                coordinator.create_group(self.GROUP).get()
+            except tooz_coordination.GroupAlreadyExist:
+                pass
+            try:
+                coordinator.join_group(self.GROUP, capabilities=[]).get()
+            except tooz_coordination.MemberAlreadyExist:
+                pass
+            self._joined = True
+        return coordinator
+
+    def add_reservation(self, reservation):
+        now = timeutils.utcnow_ts(microsecond=True)
+        with self._lock:
+            self._reservations = [r for r in self._reservations
+                                  if not self._expired(r, now)]
+            self._reservations.append(reservation)
+            capabilities = [list(r) for r in self._reservations]
+        coordinator = self._get_coordinator()
+        try:
+            coordinator.update_capabilities(self.GROUP, capabilities).get()
+        except tooz.NotImplemented:
+            # Some drivers, like the file one, only take capabilities when
+            # joining a group.
+            coordinator.leave_group(self.GROUP).get()
+            coordinator.join_group(self.GROUP,
+                                   capabilities=capabilities).get()
+
+    def get_reservations(self):
+        coordinator = self._get_coordinator()
+        now = timeutils.utcnow_ts(microsecond=True)
+        requests = [coordinator.get_member_capabilities(self.GROUP, member)
+                    for member in coordinator.get_members(self.GROUP).get()]
+        reservations = []
+        for request in requests:
+            try:
+                capabilities = request.get()
+            except tooz_coordination.MemberNotJoined:
+                # The scheduler left the group meanwhile.
+                continue
+            for item in capabilities or []:
+                reservation = Reservation(*item)
+                if not self._expired(reservation, now):
+                    reservations.append(reservation)
+        return reservations
+
+
+def get_backend(backend, path, ttl):
+    """Return the shared state backend to use, or None if disabled."""
+    if not backend:
+        return None
+    if backend == 'sqlite':
+        return SQLiteBackend(path, ttl)
+    return ToozBackend(ttl)
@@ -66,26 +66,67 @@ OFFSET_MIN = 10000
 OFFSET_MULT = 100
 
 
+def _free_capacity(host_state, unknown_weight):
+    free_space = host_state.free_capacity_gb
+    total_space = host_state.total_capacity_gb
+    if (free_space == 'infinite' or free_space == 'unknown' or
+            total_space == 'infinite' or total_space == 'unknown'):
+        # (zhiteng) 'infinite' and 'unknown' are treated the same
+        # here, for sorting purpose.
+
+        # As a partial fix for bug #1350638, 'infinite' and 'unknown' are
+        # given the lowest weight to discourage driver from report such
+        # capacity anymore.
+        return unknown_weight
+
+    return utils.calculate_virtual_free_capacity(
+        total_space,
+        free_space,
+        host_state.provisioned_capacity_gb,
+        host_state.thin_provisioning_support,
+        host_state.max_over_subscription_ratio,
+        host_state.reserved_percentage)
+
+
+def _record_bounds(weigher, weights):
+    """Set minval/maxval the way BaseWeigher.weigh_objects() does."""
+    if weights:
+        if weigher.minval is None:
+            weigher.minval = min(weights)
+        else:
+            weigher.minval = min(weigher.minval, min(weights))
+        if weigher.maxval is None:
+            weigher.maxval = max(weights)
+        else:
+            weigher.maxval = max(weigher.maxval, max(weights))
+
+
 class CapacityWeigher(weights.BaseHostWeigher):
     def weight_multiplier(self):
         """Override the weight multiplier."""
         return CONF.capacity_weight_multiplier
 
+    def _unknown_weight(self):
+        return -1 if CONF.capacity_weight_multiplier > 0 else float('inf')
+
     def weigh_objects(self, weighed_obj_list, weight_properties):
         """Override the weigh objects.
 
 
-        This override calls the parent to do the weigh objects and then
-        replaces any infinite weights with a value that is a multiple of the
-        delta between the min and max values.
+        This override computes the weights of all objects in a single pass,
+        reading the configuration once per request instead of once per
+        host, and then replaces any infinite weights with a value that is
+        a multiple of the delta between the min and max values.
 
         NOTE(jecarey): the infinite weight value is only used when the
         smallest value is being favored (negative multiplier).  When the
         largest weight value is being used a weight of -1 is used instead.
         See _weigh_object method.
         """
-        tmp_weights = super(CapacityWeigher, self).weigh_objects(
-            weighed_obj_list, weight_properties)
+        unknown_weight = self._unknown_weight()
+        tmp_weights = [_free_capacity(obj.obj, unknown_weight)
+                       for obj in weighed_obj_list]
+        _record_bounds(self, tmp_weights)
 
         if math.isinf(self.maxval):
             # NOTE(jecarey): if all weights were infinite then parent
@@ -102,27 +143,7 @@ class CapacityWeigher(weights.BaseHostWeigher):
 
     def _weigh_object(self, host_state, weight_properties):
         """Higher weights win.  We want spreading to be the default."""
-        free_space = host_state.free_capacity_gb
-        total_space = host_state.total_capacity_gb
-        if (free_space == 'infinite' or free_space == 'unknown' or
-                total_space == 'infinite' or total_space == 'unknown'):
-            # (zhiteng) 'infinite' and 'unknown' are treated the same
-            # here, for sorting purpose.
-
-            # As a partial fix for bug #1350638, 'infinite' and 'unknown' are
-            # given the lowest weight to discourage driver from report such
-            # capacity anymore.
-            free = -1 if CONF.capacity_weight_multiplier > 0 else float('inf')
-        else:
-            free = utils.calculate_virtual_free_capacity(
-                total_space,
-                free_space,
-                host_state.provisioned_capacity_gb,
-                host_state.thin_provisioning_support,
-                host_state.max_over_subscription_ratio,
-                host_state.reserved_percentage)
-
-        return free
+        return _free_capacity(host_state, self._unknown_weight())
 
 
 class AllocatedCapacityWeigher(weights.BaseHostWeigher):
@@ -130,6 +151,13 @@ class AllocatedCapacityWeigher(weights.BaseHostWeigher):
         """Override the weight multiplier."""
         return CONF.allocated_capacity_weight_multiplier
 
+    def weigh_objects(self, weighed_obj_list, weight_properties):
+        """Override the weigh objects to compute all weights in one pass."""
+        tmp_weights = [obj.obj.allocated_capacity_gb
+                       for obj in weighed_obj_list]
+        _record_bounds(self, tmp_weights)
+        return tmp_weights
+
     def _weigh_object(self, host_state, weight_properties):
         # Higher weights win.  We want spreading (choose host with lowest
         # allocated_capacity first) to be the default.
@@ -92,8 +92,7 @@ class GoodnessWeigher(weights.BaseHostWeigher):
         qos_specs = stats['qos_specs']
         volume_stats = stats['volume_stats']
 
-        result = evaluator.evaluate(
-            func,
+        result = evaluator.compile_expression(func).evaluate(
             extra=extra_specs,
             stats=host_stats,
             capabilities=host_caps,
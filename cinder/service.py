@@ -22,6 +22,7 @@ import inspect
 import os
 import random
 
+from oslo_concurrency import lockutils
 from oslo_concurrency import processutils
 from oslo_config import cfg
 from oslo_db import exception as db_exc
@@ -44,6 +45,7 @@ from cinder import objects
 from cinder.objects import base as objects_base
 from cinder import rpc
 from cinder import version
+from cinder.volume import volume_types
 
 
 LOG = logging.getLogger(__name__)
@@ -106,6 +108,49 @@ def setup_profiler(binary, host):
         osprofiler_web.disable()
 
 
+# Worker numbers claimed by this process, by service name.
+_worker_slots = {}
+
+
+def _get_worker_slot(name):
+    """Return a number telling apart the running processes of a service.
+
+    The process takes the lowest number no other process of the service
+    holds, and holds it with an external lock until it exits, so a process
+    restarted in place of another one gets the same number.
+    """
+    if name not in _worker_slots:
+        slot = 0
+        while True:
+            lock = lockutils.external_lock('%s-worker-%d' % (name, slot),
+                                           lock_file_prefix='cinder-')
+            if lock.acquire(blocking=False):
+                break
+            slot += 1
+        _worker_slots[name] = (slot, lock)
+    return _worker_slots[name][0]
+
+
+def start_volume_type_cache_listener(binary, host):
+    """Listen to the notifications invalidating the volume type cache.
+
+    Every process needs to see all the notifications, so each one listens
+    in its own pool, named after the service and the worker number of the
+    process so that restarts reuse the same queues. Returns None when
+    volume_type_cache_notifications is disabled.
+    """
+    if not CONF.volume_type_cache_notifications:
+        return None
+    targets = [messaging.Target(topic=topic)
+               for topic in CONF.oslo_messaging_notifications.topics]
+    name = 'volume-type-cache.%s.%s' % (binary, host)
+    pool = '%s.%d' % (name, _get_worker_slot(name))
+    listener = rpc.get_notification_listener(
+        targets, [volume_types.CacheInvalidationEndpoint()], pool=pool)
+    listener.start()
+    return listener
+
+
 class Service(service.Service):
     """Service object for binaries running on hosts.
 
@@ -159,6 +204,7 @@ class Service(service.Service):
 
         setup_profiler(binary, host)
         self.rpcserver = None
+        self.cache_listener = None
 
     def start(self):
         version_string = version.version_string()
@@ -182,6 +228,9 @@ class Service(service.Service):
 
         self.manager.init_host_with_rpc()
 
+        self.cache_listener = start_volume_type_cache_listener(self.binary,
+                                                               self.host)
+
         if self.report_interval:
             pulse = loopingcall.FixedIntervalLoopingCall(
                 self.report_state)
@@ -285,6 +334,12 @@ class Service(service.Service):
         except Exception:
             pass
 
+        if self.cache_listener:
+            try:
+                self.cache_listener.stop()
+            except Exception:
+                pass
+
         self.timers_skip = []
         for x in self.timers:
             try:
@@ -309,6 +364,8 @@ class Service(service.Service):
                     pass
         if self.rpcserver:
             self.rpcserver.wait()
+        if self.cache_listener:
+            self.cache_listener.wait()
         super(Service, self).wait()
 
     def periodic_tasks(self, raise_on_error=False):
@@ -399,6 +456,7 @@ class WSGIService(service.ServiceBase):
                     'workers': self.workers})
             raise exception.InvalidInput(msg)
         setup_profiler(name, self.host)
+        self.cache_listener = None
 
         self.server = wsgi.Server(CONF,
                                   name,
@@ -438,6 +496,8 @@ class WSGIService(service.ServiceBase):
         """
         if self.manager:
             self.manager.init_host()
+        self.cache_listener = start_volume_type_cache_listener(self.name,
+                                                               CONF.host)
         self.server.start()
         self.port = self.server.port
 
@@ -447,6 +507,8 @@ class WSGIService(service.ServiceBase):
         :returns: None
 
         """
+        if self.cache_listener:
+            self.cache_listener.stop()
         self.server.stop()
 
     def wait(self):
@@ -455,6 +517,8 @@ class WSGIService(service.ServiceBase):
         :returns: None
 
         """
+        if self.cache_listener:
+            self.cache_listener.wait()
         self.server.wait()
 
     def reset(self):
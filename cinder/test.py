@@ -50,6 +50,7 @@ from cinder import service
 from cinder.tests import fixtures as cinder_fixtures
 from cinder.tests.unit import conf_fixture
 from cinder.tests.unit import fake_notifier
+from cinder.volume import volume_types
 
 
 CONF = cfg.CONF
@@ -233,6 +234,10 @@ class TestCase(testtools.TestCase):
         # clear out the cache.
         sqla_api._GET_METHODS = {}
 
+        # Volume types are cached by id, and the ids of the fake volume
+        # types are reused across tests.
+        volume_types.clear_cache()
+
         self.override_config('backend_url', 'file://' + lock_path,
                              group='coordination')
         coordination.COORDINATOR.start()
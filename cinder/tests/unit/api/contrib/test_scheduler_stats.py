@@ -111,3 +111,51 @@ class SchedulerStatsAPITest(test.TestCase):
         }
 
         self.assertDictMatch(expected, res)
+
+    def test_get_pools_filters(self):
+        req = fakes.HTTPRequest.blank('/v3/%s/scheduler_stats?detail=True'
+                                      '&backend=host1@lvm&limit=1'
+                                      '&marker=host1@lvm#pool1' %
+                                      fake.PROJECT_ID, version='3.7')
+        req.environ['cinder.context'] = self.ctxt
+        mock_get_pools = self.mock_object(
+            self.controller.scheduler_api, 'get_pools',
+            mock.Mock(return_value=[dict(name='host1@lvm#pool2',
+                                         capabilities={})]))
+
+        res = self.controller.get_pools(req)
+
+        mock_get_pools.assert_called_once_with(
+            self.ctxt, filters={'backend': 'host1@lvm', 'limit': 1,
+                                'marker': 'host1@lvm#pool1'})
+        self.assertEqual([{'name': 'host1@lvm#pool2', 'capabilities': {}}],
+                         res['pools'])
+
+    def test_get_pools_filters_no_limit(self):
+        self.override_config('osapi_max_limit', 2)
+        req = fakes.HTTPRequest.blank('/v3/%s/scheduler_stats?backend=host1' %
+                                      fake.PROJECT_ID, version='3.7')
+        req.environ['cinder.context'] = self.ctxt
+        pools = [dict(name='host1@lvm#pool%d' % i, capabilities={})
+                 for i in range(3)]
+        mock_get_pools = self.mock_object(self.controller.scheduler_api,
+                                          'get_pools',
+                                          mock.Mock(return_value=pools))
+
+        res = self.controller.get_pools(req)
+
+        mock_get_pools.assert_called_once_with(
+            self.ctxt, filters={'backend': 'host1'})
+        self.assertEqual(3, len(res['pools']))
+
+    def test_get_pools_filters_old_version(self):
+        req = fakes.HTTPRequest.blank('/v3/%s/scheduler_stats?limit=1' %
+                                      fake.PROJECT_ID, version='3.6')
+        req.environ['cinder.context'] = self.ctxt
+        mock_get_pools = self.mock_object(self.controller.scheduler_api,
+                                          'get_pools',
+                                          mock.Mock(return_value=[]))
+
+        self.controller.get_pools(req)
+
+        mock_get_pools.assert_called_once_with(self.ctxt, filters=None)
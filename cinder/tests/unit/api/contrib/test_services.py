@@ -130,7 +130,7 @@ class FakeRequestWithHostBinary(object):
     GET = {"host": "host1", "binary": "cinder-volume"}
 
 
-def fake_service_get_all(context, **filters):
+def fake_service_get_all(context, use_slave=False, **filters):
     result = []
     host = filters.pop('host', None)
     for service in fake_services_list:
@@ -205,6 +205,21 @@ class VolumeTypesExtraSpecsTest(test.TestCase):
 
         self.assertEqual('value1', res_dict['key1'])
 
+    @mock.patch('cinder.volume.volume_types.clear_cache')
+    def test_update_item_clears_volume_type_cache(self, clear_cache):
+        self.stubs.Set(cinder.db,
+                       'volume_type_extra_specs_update_or_create',
+                       return_create_volume_type_extra_specs)
+        self.stubs.Set(cinder.db, 'volume_type_extra_specs_delete',
+                       delete_volume_type_extra_specs)
+        req = fakes.HTTPRequest.blank(self.api_path + '/key1')
+
+        self.controller.update(req, fake.VOLUME_ID, 'key1', {"key1": "v1"})
+        clear_cache.assert_called_once_with(fake.VOLUME_ID)
+        clear_cache.reset_mock()
+        self.controller.delete(req, fake.VOLUME_ID, 'key1')
+        clear_cache.assert_called_once_with(fake.VOLUME_ID)
+
     def test_update_item_too_many_keys(self):
         self.stubs.Set(cinder.db,
                        'volume_type_extra_specs_update_or_create',
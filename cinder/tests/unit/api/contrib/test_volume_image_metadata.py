@@ -14,6 +14,7 @@
 
 import uuid
 
+import mock
 from oslo_serialization import jsonutils
 from oslo_utils import timeutils
 import webob
@@ -185,6 +186,28 @@ class VolumeImageMetadataTest(test.TestCase):
         self.assertEqual({'key1': 'value1', 'key2': 'value2'},
                          self._get_image_metadata_list(res.body)[0])
 
+    def test_list_detail_volumes_single_image_metadata_query(self):
+        def fake_get_all(*args, **kwargs):
+            volume2 = fake_volume_api_get()
+            volume2.id = fake.VOLUME2_ID
+            return objects.VolumeList(objects=[fake_volume_api_get(),
+                                               volume2])
+
+        self.stubs.Set(volume.api.API, 'get_all', fake_get_all)
+        with mock.patch.object(volume.api.API,
+                               'get_list_volumes_image_metadata',
+                               return_value={
+                                   fake.VOLUME_ID: fake_image_metadata}
+                               ) as get_list:
+            res = self._make_request('/v2/%s/volumes/detail' %
+                                     fake.PROJECT_ID)
+
+        self.assertEqual(200, res.status_int)
+        get_list.assert_called_once_with(mock.ANY,
+                                         [fake.VOLUME_ID, fake.VOLUME2_ID])
+        self.assertEqual([fake_image_metadata, {}],
+                         self._get_image_metadata_list(res.body))
+
     def test_create_image_metadata(self):
         self.stubs.Set(volume.api.API, 'get_volume_image_metadata',
                        return_empty_image_metadata)
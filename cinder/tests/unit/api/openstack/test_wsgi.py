@@ -776,6 +776,39 @@ class ResourceTest(test.TestCase):
         self.assertEqual([2], called)
         self.assertEqual('foo', response)
 
+    def test_annotate_response(self):
+        class Controller(object):
+            def get_annotation_data(self, req, kind, item_ids):
+                fetched.append((kind, item_ids))
+                return {item_id: '%s-%s' % (kind, item_id)
+                        for item_id in item_ids}
+
+        fetched = []
+        resource = wsgi.Resource(Controller())
+        called = []
+
+        def annotate1(item, data):
+            called.append((1, item['id']))
+            item['k1'] = data['kind1'][item['id']]
+
+        def annotate2(item, data):
+            called.append((2, item['id']))
+            item['k2'] = data['kind1'][item['id']] + data['kind2'][item['id']]
+
+        req = wsgi.Request.blank('/tests')
+        req.add_annotation('items', annotate1, ('kind1',))
+        req.add_annotation('items', annotate2, ('kind1', 'kind2'))
+        resp_obj = wsgi.ResponseObject({'items': [{'id': 'a'}, {'id': 'b'}]})
+        resource.annotate_response(req, resp_obj)
+
+        self.assertEqual([('kind1', ['a', 'b']), ('kind2', ['a', 'b'])],
+                         sorted(fetched))
+        self.assertEqual([(1, 'a'), (2, 'a'), (1, 'b'), (2, 'b')], called)
+        self.assertEqual({'id': 'a', 'k1': 'kind1-a',
+                          'k2': 'kind1-akind2-a'},
+                         resp_obj.obj['items'][0])
+        self.assertEqual({}, req.pop_annotations())
+
 
 class ResponseObjectTest(test.TestCase):
     def test_default_code(self):
@@ -17,6 +17,8 @@
 Test suites for 'common' code used throughout the OpenStack HTTP API.
 """
 
+import datetime
+
 import mock
 from testtools import matchers
 import webob
@@ -25,6 +27,7 @@ import webob.exc
 from oslo_config import cfg
 
 from cinder.api import common
+from cinder import exception
 from cinder import test
 
 
@@ -226,6 +229,30 @@ class PaginationParamsTest(test.TestCase):
         self.assertEqual(expected,
                          common.get_pagination_params(req.GET.copy()))
 
+    def test_pagination_cursor(self):
+        values = {'created_at': datetime.datetime(2016, 7, 1, 10, 30, 5, 42),
+                  'id': '263abb28-1de6-412f-b00b-f0ee0c4333c2',
+                  'size': 1,
+                  'display_name': None}
+        cursor = common.encode_pagination_cursor(values)
+
+        self.assertTrue(common.is_pagination_cursor(cursor))
+        self.assertFalse(common.is_pagination_cursor(values['id']))
+        self.assertFalse(common.is_pagination_cursor(None))
+        self.assertEqual(values, common.decode_pagination_cursor(cursor))
+
+    def test_invalid_pagination_cursor(self):
+        for cursor in ('cursor-', 'cursor-!!', 'cursor-WzFd',
+                       common.encode_pagination_cursor(
+                           {'created_at': {'datetime': 'yesterday'}}),
+                       common.encode_pagination_cursor(
+                           {'created_at': {'datetime': '2016-07-01T10:30:05',
+                                           'other': 1}}),
+                       common.encode_pagination_cursor({'id': ['a', 'b']}),
+                       common.encode_pagination_cursor({'id': {'a': 'b'}})):
+            self.assertRaises(exception.InvalidInput,
+                              common.decode_pagination_cursor, cursor)
+
 
 class SortParamUtilsTest(test.TestCase):
 
@@ -174,7 +174,8 @@ def stub_snapshot(id, **kwargs):
 
 
 def stub_snapshot_get_all(context, filters=None, marker=None, limit=None,
-                          sort_keys=None, sort_dirs=None, offset=None):
+                          sort_keys=None, sort_dirs=None, offset=None,
+                          use_slave=False):
     return [stub_snapshot(fake.SNAPSHOT_ID, project_id=fake.PROJECT_ID),
             stub_snapshot(fake.SNAPSHOT2_ID, project_id=fake.PROJECT2_ID),
             stub_snapshot(fake.SNAPSHOT3_ID, project_id=fake.PROJECT3_ID)]
@@ -182,7 +183,8 @@ def stub_snapshot_get_all(context, filters=None, marker=None, limit=None,
 
 def stub_snapshot_get_all_by_project(context, project_id, filters=None,
                                      marker=None, limit=None, sort_keys=None,
-                                     sort_dirs=None, offset=None):
+                                     sort_dirs=None, offset=None,
+                                     use_slave=False):
     return [stub_snapshot(fake.VOLUME_ID)]
 
 
@@ -325,7 +325,8 @@ class SnapshotApiTest(test.TestCase):
             def stub_snapshot_get_all_by_project(context, project_id,
                                                  filters=None, marker=None,
                                                  limit=None, sort_keys=None,
-                                                 sort_dirs=None, offset=None):
+                                                 sort_dirs=None, offset=None,
+                                                 use_slave=False):
                 return [
                     stubs.stub_snapshot(fake.SNAPSHOT_ID,
                                         display_name='backup1'),
@@ -830,7 +830,8 @@ class VolumeApiTest(test.TestCase):
         get_all.assert_called_once_with(
             context, sort_dirs=['desc'], viewable_admin_meta=True,
             sort_keys=['created_at'], limit=None,
-            filters={'display_name': 'Volume-573108026'}, marker=None)
+            filters={'display_name': 'Volume-573108026'}, marker=None,
+            use_slave=True)
 
     @mock.patch('cinder.volume.api.API.get_all')
     def test_get_volumes_filter_with_list(self, get_all):
@@ -842,7 +843,8 @@ class VolumeApiTest(test.TestCase):
         get_all.assert_called_once_with(
             context, sort_dirs=['desc'], viewable_admin_meta=True,
             sort_keys=['created_at'], limit=None,
-            filters={'id': ['1', '2', '3']}, marker=None)
+            filters={'id': ['1', '2', '3']}, marker=None,
+            use_slave=True)
 
     @mock.patch('cinder.volume.api.API.get_all')
     def test_get_volumes_filter_with_expression(self, get_all):
@@ -854,7 +856,7 @@ class VolumeApiTest(test.TestCase):
         get_all.assert_called_once_with(
             context, sort_dirs=['desc'], viewable_admin_meta=True,
             sort_keys=['created_at'], limit=None, filters={'id': 'd+'},
-            marker=None)
+            marker=None, use_slave=True)
 
 
 class VolumesUnprocessableEntityTestCase(test.TestCase):
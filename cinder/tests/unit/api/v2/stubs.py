@@ -163,7 +163,8 @@ def stub_volume_api_get(self, context, volume_id, viewable_admin_meta=False):
 
 def stub_volume_get_all(context, search_opts=None, marker=None, limit=None,
                         sort_keys=None, sort_dirs=None, filters=None,
-                        viewable_admin_meta=False, offset=None):
+                        viewable_admin_meta=False, offset=None,
+                        load_profile=None):
     return [stub_volume(fake.VOLUME_ID, project_id=fake.PROJECT_ID),
             stub_volume(fake.VOLUME2_ID, project_id=fake.PROJECT2_ID),
             stub_volume(fake.VOLUME3_ID, project_id=fake.PROJECT3_ID)]
@@ -172,7 +173,8 @@ def stub_volume_get_all(context, search_opts=None, marker=None, limit=None,
 def stub_volume_get_all_by_project(self, context, marker, limit,
                                    sort_keys=None, sort_dirs=None,
                                    filters=None,
-                                   viewable_admin_meta=False, offset=None):
+                                   viewable_admin_meta=False, offset=None,
+                                   load_profile=None):
     return [stub_volume_get(self, context, fake.VOLUME_ID,
                             viewable_admin_meta=True)]
 
@@ -181,7 +183,7 @@ def stub_volume_api_get_all_by_project(self, context, marker, limit,
                                        sort_keys=None, sort_dirs=None,
                                        filters=None,
                                        viewable_admin_meta=False,
-                                       offset=None):
+                                       offset=None, load_profile=None):
     vol = stub_volume_get(self, context, fake.VOLUME_ID,
                           viewable_admin_meta=viewable_admin_meta)
     vol_obj = fake_volume.fake_volume_obj(context, **vol)
@@ -204,7 +206,8 @@ def stub_snapshot(id, **kwargs):
 
 
 def stub_snapshot_get_all(context, filters=None, marker=None, limit=None,
-                          sort_keys=None, sort_dirs=None, offset=None):
+                          sort_keys=None, sort_dirs=None, offset=None,
+                          use_slave=False):
     return [stub_snapshot(fake.VOLUME_ID, project_id=fake.PROJECT_ID),
             stub_snapshot(fake.VOLUME2_ID, project_id=fake.PROJECT2_ID),
             stub_snapshot(fake.VOLUME3_ID, project_id=fake.PROJECT3_ID)]
@@ -212,7 +215,8 @@ def stub_snapshot_get_all(context, filters=None, marker=None, limit=None,
 
 def stub_snapshot_get_all_by_project(context, project_id, filters=None,
                                      marker=None, limit=None, sort_keys=None,
-                                     sort_dirs=None, offset=None):
+                                     sort_dirs=None, offset=None,
+                                     use_slave=False):
     return [stub_snapshot(fake.SNAPSHOT_ID)]
 
 
@@ -408,6 +408,13 @@ class SnapshotApiTest(test.TestCase):
         self.assertRaises(webob.exc.HTTPBadRequest,
                           self.controller.index, req)
 
+    @mock.patch.object(db, 'snapshot_get_all_by_project', return_value=[])
+    def test_snapshot_list_reads_slave(self, mock_snapshot_get_all):
+        req = fakes.HTTPRequest.blank('/v2/%s/snapshots' % fake.PROJECT_ID)
+        self.controller.index(req)
+
+        self.assertTrue(mock_snapshot_get_all.call_args[1]['use_slave'])
+
     def _assert_list_next(self, expected_query=None, project=fake.PROJECT_ID,
                           **kwargs):
         """Check a page of snapshots list."""
@@ -532,7 +539,8 @@ class SnapshotApiTest(test.TestCase):
     def test_admin_list_snapshots_by_tenant_id(self, snapshot_metadata_get,
                                                snapshot_get_all):
         def get_all(context, filters=None, marker=None, limit=None,
-                    sort_keys=None, sort_dirs=None, offset=None):
+                    sort_keys=None, sort_dirs=None, offset=None,
+                    use_slave=False):
             if 'project_id' in filters and 'tenant1' in filters['project_id']:
                 return [stubs.stub_snapshot(fake.VOLUME_ID,
                                             tenant_id='tenant1')]
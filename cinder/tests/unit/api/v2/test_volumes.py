@@ -28,6 +28,7 @@ from webob import exc
 from cinder.api import common
 from cinder.api import extensions
 from cinder.api.v2 import volumes
+from cinder.common import constants
 from cinder import consistencygroup as consistencygroupAPI
 from cinder import context
 from cinder import db
@@ -879,7 +880,7 @@ class VolumeApiTest(test.TestCase):
                                            sort_keys=None, sort_dirs=None,
                                            filters=None,
                                            viewable_admin_meta=False,
-                                           offset=0):
+                                           offset=0, load_profile=None):
             return [
                 stubs.stub_volume(fake.VOLUME_ID, display_name='vol1'),
                 stubs.stub_volume(fake.VOLUME2_ID, display_name='vol2'),
@@ -984,7 +985,7 @@ class VolumeApiTest(test.TestCase):
                                            sort_keys=None, sort_dirs=None,
                                            filters=None,
                                            viewable_admin_meta=False,
-                                           offset=0):
+                                           offset=0, load_profile=None):
             return [
                 stubs.stub_volume(fake.VOLUME_ID, display_name='vol1'),
                 stubs.stub_volume(fake.VOLUME2_ID, display_name='vol2'),
@@ -1167,7 +1168,7 @@ class VolumeApiTest(test.TestCase):
                                            sort_keys=None, sort_dirs=None,
                                            filters=None,
                                            viewable_admin_meta=False,
-                                           offset=0):
+                                           offset=0, load_profile=None):
             self.assertTrue(filters['no_migration_targets'])
             self.assertNotIn('all_tenants', filters)
             return [stubs.stub_volume(fake.VOLUME_ID, display_name='vol1')]
@@ -1175,7 +1176,8 @@ class VolumeApiTest(test.TestCase):
         def stub_volume_get_all(context, marker, limit,
                                 sort_keys=None, sort_dirs=None,
                                 filters=None,
-                                viewable_admin_meta=False, offset=0):
+                                viewable_admin_meta=False, offset=0,
+                                load_profile=None):
             return []
         self.stubs.Set(db, 'volume_get_all_by_project',
                        stub_volume_get_all_by_project)
@@ -1194,14 +1196,15 @@ class VolumeApiTest(test.TestCase):
                                             sort_keys=None, sort_dirs=None,
                                             filters=None,
                                             viewable_admin_meta=False,
-                                            offset=0):
+                                            offset=0, load_profile=None):
             self.assertNotIn('no_migration_targets', filters)
             return [stubs.stub_volume(fake.VOLUME_ID, display_name='vol2')]
 
         def stub_volume_get_all2(context, marker, limit,
                                  sort_keys=None, sort_dirs=None,
                                  filters=None,
-                                 viewable_admin_meta=False, offset=0):
+                                 viewable_admin_meta=False, offset=0,
+                                 load_profile=None):
             return []
         self.stubs.Set(db, 'volume_get_all_by_project',
                        stub_volume_get_all_by_project2)
@@ -1218,13 +1221,14 @@ class VolumeApiTest(test.TestCase):
                                             sort_keys=None, sort_dirs=None,
                                             filters=None,
                                             viewable_admin_meta=False,
-                                            offset=0):
+                                            offset=0, load_profile=None):
             return []
 
         def stub_volume_get_all3(context, marker, limit,
                                  sort_keys=None, sort_dirs=None,
                                  filters=None,
-                                 viewable_admin_meta=False, offset=0):
+                                 viewable_admin_meta=False, offset=0,
+                                 load_profile=None):
             self.assertNotIn('no_migration_targets', filters)
             self.assertNotIn('all_tenants', filters)
             return [stubs.stub_volume(fake.VOLUME3_ID, display_name='vol3')]
@@ -1447,7 +1451,8 @@ class VolumeApiTest(test.TestCase):
             context, None, CONF.osapi_max_limit,
             sort_keys=['created_at'], sort_dirs=['desc'],
             filters={'display_name': display_name},
-            viewable_admin_meta=True, offset=0)
+            viewable_admin_meta=True, offset=0,
+            load_profile=constants.VOLUME_LOAD_DETAIL, use_slave=True)
 
     @mock.patch('cinder.volume.api.API.get_all')
     def test_get_volumes_filter_with_string(self, get_all):
@@ -1488,7 +1493,8 @@ class VolumeApiTest(test.TestCase):
             context, None, CONF.osapi_max_limit,
             sort_keys=['created_at'], sort_dirs=['desc'],
             filters={'display_name': 'Volume-573108026', 'bootable': True},
-            viewable_admin_meta=True, offset=0)
+            viewable_admin_meta=True, offset=0,
+            load_profile=constants.VOLUME_LOAD_DETAIL, use_slave=True)
 
     @mock.patch('cinder.volume.api.API.get_all')
     def test_get_volumes_filter_with_false(self, get_all):
@@ -1502,7 +1508,8 @@ class VolumeApiTest(test.TestCase):
             context, None, CONF.osapi_max_limit,
             sort_keys=['created_at'], sort_dirs=['desc'],
             filters={'display_name': 'Volume-573108026', 'bootable': False},
-            viewable_admin_meta=True, offset=0)
+            viewable_admin_meta=True, offset=0,
+            load_profile=constants.VOLUME_LOAD_DETAIL, use_slave=True)
 
     @mock.patch('cinder.volume.api.API.get_all')
     def test_get_volumes_filter_with_list(self, get_all):
@@ -1518,7 +1525,8 @@ class VolumeApiTest(test.TestCase):
             sort_keys=['created_at'], sort_dirs=['desc'],
             filters={'id': [fake.VOLUME_ID, fake.VOLUME2_ID, fake.VOLUME3_ID]},
             viewable_admin_meta=True,
-            offset=0)
+            offset=0,
+            load_profile=constants.VOLUME_LOAD_DETAIL, use_slave=True)
 
     @mock.patch('cinder.volume.api.API.get_all')
     def test_get_volumes_filter_with_expression(self, get_all):
@@ -1531,7 +1539,8 @@ class VolumeApiTest(test.TestCase):
         get_all.assert_called_once_with(
             context, None, CONF.osapi_max_limit,
             sort_keys=['created_at'], sort_dirs=['desc'],
-            filters={'display_name': 'd-'}, viewable_admin_meta=True, offset=0)
+            filters={'display_name': 'd-'}, viewable_admin_meta=True, offset=0,
+            load_profile=constants.VOLUME_LOAD_DETAIL, use_slave=True)
 
     @mock.patch('cinder.volume.api.API.get_all')
     def test_get_volumes_filter_with_status(self, get_all):
@@ -1546,7 +1555,8 @@ class VolumeApiTest(test.TestCase):
             ctxt, None, CONF.osapi_max_limit,
             sort_keys=['created_at'], sort_dirs=['desc'],
             filters={'status': 'available'}, viewable_admin_meta=True,
-            offset=0)
+            offset=0,
+            load_profile=constants.VOLUME_LOAD_DETAIL, use_slave=True)
 
     @mock.patch('cinder.volume.api.API.get_all')
     def test_get_volumes_filter_with_metadata(self, get_all):
@@ -1561,7 +1571,8 @@ class VolumeApiTest(test.TestCase):
             ctxt, None, CONF.osapi_max_limit,
             sort_keys=['created_at'], sort_dirs=['desc'],
             filters={'metadata': {'fake_key': 'fake_value'}},
-            viewable_admin_meta=True, offset=0)
+            viewable_admin_meta=True, offset=0,
+            load_profile=constants.VOLUME_LOAD_DETAIL, use_slave=True)
 
     @mock.patch('cinder.volume.api.API.get_all')
     def test_get_volumes_filter_with_availability_zone(self, get_all):
@@ -1576,7 +1587,8 @@ class VolumeApiTest(test.TestCase):
             ctxt, None, CONF.osapi_max_limit,
             sort_keys=['created_at'], sort_dirs=['desc'],
             filters={'availability_zone': 'nova'}, viewable_admin_meta=True,
-            offset=0)
+            offset=0,
+            load_profile=constants.VOLUME_LOAD_DETAIL, use_slave=True)
 
     @mock.patch('cinder.volume.api.API.get_all')
     def test_get_volumes_filter_with_bootable(self, get_all):
@@ -1591,7 +1603,8 @@ class VolumeApiTest(test.TestCase):
             ctxt, None, CONF.osapi_max_limit,
             sort_keys=['created_at'], sort_dirs=['desc'],
             filters={'bootable': True}, viewable_admin_meta=True,
-            offset=0)
+            offset=0,
+            load_profile=constants.VOLUME_LOAD_DETAIL, use_slave=True)
 
     @mock.patch('cinder.volume.api.API.get_all')
     def test_get_volumes_filter_with_invalid_filter(self, get_all):
@@ -1607,7 +1620,8 @@ class VolumeApiTest(test.TestCase):
             ctxt, None, CONF.osapi_max_limit,
             sort_keys=['created_at'], sort_dirs=['desc'],
             filters={'availability_zone': 'nova'}, viewable_admin_meta=True,
-            offset=0)
+            offset=0,
+            load_profile=constants.VOLUME_LOAD_DETAIL, use_slave=True)
 
     @mock.patch('cinder.volume.api.API.get_all')
     def test_get_volumes_sort_by_name(self, get_all):
@@ -1623,7 +1637,28 @@ class VolumeApiTest(test.TestCase):
         get_all.assert_called_once_with(
             ctxt, None, CONF.osapi_max_limit,
             sort_dirs=['desc'], viewable_admin_meta=True,
-            sort_keys=['display_name'], filters={}, offset=0)
+            sort_keys=['display_name'], filters={}, offset=0,
+            load_profile=constants.VOLUME_LOAD_DETAIL, use_slave=True)
+
+    @mock.patch('cinder.utils.add_visible_admin_metadata')
+    @mock.patch('cinder.volume.api.API.get_all')
+    def test_get_volumes_summary_loads_columns_only(self, get_all,
+                                                    add_admin_metadata):
+        req = mock.MagicMock()
+        ctxt = context.RequestContext(
+            fake.USER_ID, fake.PROJECT_ID, auth_token=True)
+        req.environ = {'cinder.context': ctxt}
+        req.params = {}
+        get_all.return_value = objects.VolumeList(
+            objects=[fake_volume.fake_volume_obj(ctxt)])
+        self.controller._view_builder.summary_list = mock.Mock()
+        self.controller._get_volumes(req, False)
+        get_all.assert_called_once_with(
+            ctxt, None, CONF.osapi_max_limit,
+            sort_dirs=['desc'], viewable_admin_meta=True,
+            sort_keys=['created_at'], filters={}, offset=0,
+            load_profile=constants.VOLUME_LOAD_SUMMARY, use_slave=True)
+        self.assertFalse(add_admin_metadata.called)
 
     def test_get_volume_filter_options_using_config(self):
         filter_list = ['name', 'status', 'metadata', 'bootable',
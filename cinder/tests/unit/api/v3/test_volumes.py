@@ -14,7 +14,9 @@
 
 import mock
 from oslo_config import cfg
+from six.moves import urllib
 
+from cinder.api import common
 from cinder.api import extensions
 from cinder.api.openstack import api_version_request as api_version
 from cinder.api.v3 import volumes
@@ -109,3 +111,36 @@ class VolumeApiTest(test.TestCase):
         res_dict = self.controller.index(req)
         volumes = res_dict['volumes']
         self.assertEqual(2, len(volumes))
+
+    def _get_volumes_page(self, version, marker=None):
+        url = '/v3/volumes?limit=1&sort=name:asc'
+        if marker:
+            url += '&marker=%s' % marker
+        req = fakes.HTTPRequest.blank(url)
+        req.headers["OpenStack-API-Version"] = "volume %s" % version
+        req.api_version_request = api_version.APIVersionRequest(version)
+        req.environ['cinder.context'] = self.ctxt
+        res_dict = self.controller.index(req)
+        next_link = res_dict['volumes_links'][0]['href']
+        params = urllib.parse.parse_qs(urllib.parse.urlsplit(next_link).query)
+        return res_dict['volumes'], params['marker'][0]
+
+    def test_volume_index_cursor(self):
+        vols = self._create_volume_with_glance_metadata()
+
+        volumes, marker = self._get_volumes_page('3.8')
+        self.assertEqual([vols[0].id], [v['id'] for v in volumes])
+        self.assertTrue(common.is_pagination_cursor(marker))
+        self.assertEqual({'display_name': 'test1',
+                          'created_at': vols[0].created_at,
+                          'id': vols[0].id},
+                         common.decode_pagination_cursor(marker))
+
+        volumes, marker = self._get_volumes_page('3.8', marker)
+        self.assertEqual([vols[1].id], [v['id'] for v in volumes])
+
+    def test_volume_index_cursor_unsupported_version(self):
+        vols = self._create_volume_with_glance_metadata()
+
+        volumes, marker = self._get_volumes_page('3.7')
+        self.assertEqual(vols[0].id, marker)
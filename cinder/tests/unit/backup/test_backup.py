@@ -1367,7 +1367,7 @@ class BackupAPITestCase(BaseBackupTest):
                          result)
         mock_backuplist.get_all_by_project.assert_called_once_with(
             self.ctxt, self.ctxt.project_id, {'key': 'value'}, None, None,
-            None, None, None)
+            None, None, None, use_slave=False)
 
     @mock.patch.object(objects, 'BackupList')
     @ddt.data(False, 'false', '0', 0, 'no')
@@ -1380,7 +1380,7 @@ class BackupAPITestCase(BaseBackupTest):
                          result)
         mock_backuplist.get_all_by_project.assert_called_once_with(
             self.ctxt, self.ctxt.project_id, {'key': 'value'}, None, None,
-            None, None, None)
+            None, None, None, use_slave=False)
 
     @mock.patch.object(objects, 'BackupList')
     @ddt.data(True, 'true', '1', 1, 'yes')
@@ -1392,7 +1392,8 @@ class BackupAPITestCase(BaseBackupTest):
         self.assertEqual(mock_backuplist.get_all.return_value,
                          result)
         mock_backuplist.get_all.assert_called_once_with(
-            self.ctxt, {'key': 'value'}, None, None, None, None, None)
+            self.ctxt, {'key': 'value'}, None, None, None, None, None,
+            use_slave=False)
 
     @mock.patch.object(objects, 'BackupList')
     def test_get_all_true_value_all_tenants_non_admin(self, mock_backuplist):
@@ -1404,7 +1405,7 @@ class BackupAPITestCase(BaseBackupTest):
                          result)
         mock_backuplist.get_all_by_project.assert_called_once_with(
             ctxt, ctxt.project_id, {'key': 'value'}, None, None, None, None,
-            None)
+            None, use_slave=False)
 
     @mock.patch.object(api.API, '_get_available_backup_service_host',
                        return_value='fake_host')
@@ -227,6 +227,49 @@ class PurgeDeletedTest(test.TestCase):
         self.assertEqual(2, snap_meta_rows)
         self.assertEqual(4, vol_glance_meta_rows)
 
+    def test_purge_deleted_rows_batched(self):
+        dialect = self.engine.url.get_dialect()
+        if dialect == sqlite.dialect:
+            import sqlite3
+            tup = sqlite3.sqlite_version_info
+            if tup[0] > 3 or (tup[0] == 3 and tup[1] >= 7):
+                self.conn.execute("PRAGMA foreign_keys = ON")
+        # Purge one row per transaction, children must go before parents
+        purged, done = db.purge_deleted_rows(self.context, age_in_days=10,
+                                             batch_size=1)
+
+        self.assertTrue(done)
+        self.assertEqual(4, purged['volumes'])
+        self.assertEqual(4, purged['volume_metadata'])
+        self.assertEqual(8, purged['volume_glance_metadata'])
+        tables = list(purged)
+        self.assertLess(tables.index('snapshot_metadata'),
+                        tables.index('snapshots'))
+        self.assertLess(tables.index('snapshots'), tables.index('volumes'))
+        self.assertLess(tables.index('volume_type_projects'),
+                        tables.index('volume_types'))
+        self.assertEqual(2, self.session.query(self.volumes).count())
+        self.assertEqual(2, self.session.query(self.snapshots).count())
+
+    def test_purge_deleted_rows_max_runtime(self):
+        timeutils.set_time_override()
+        self.addCleanup(timeutils.clear_time_override)
+        # Each batch takes longer than the time budget
+        self.mock_object(db_api.time, 'sleep',
+                         lambda seconds: timeutils.advance_time_seconds(2))
+
+        purged, done = db.purge_deleted_rows(self.context, age_in_days=10,
+                                             batch_size=1, sleep=1,
+                                             max_runtime=1)
+
+        self.assertFalse(done)
+        self.assertEqual(1, sum(purged.values()))
+        # Running it again resumes the purge
+        purged, done = db.purge_deleted_rows(self.context, age_in_days=10)
+        self.assertTrue(done)
+        self.assertEqual(2, self.session.query(self.volumes).count())
+        self.assertEqual(4, self.session.query(self.vgm).count())
+
     def test_purge_deleted_rows_bad_args(self):
         # Test with no age argument
         self.assertRaises(TypeError, db.purge_deleted_rows, self.context)
@@ -238,6 +281,10 @@ class PurgeDeletedTest(test.TestCase):
         self.assertRaises(exception.InvalidParameterValue,
                           db.purge_deleted_rows, self.context,
                           age_in_days=-1)
+        # Test with an empty batch
+        self.assertRaises(exception.InvalidParameterValue,
+                          db.purge_deleted_rows, self.context,
+                          age_in_days=10, batch_size=0)
 
     def test_purge_deleted_rows_integrity_failure(self):
         dialect = self.engine.url.get_dialect()
@@ -143,8 +143,10 @@ class TestServiceList(test_objects.BaseObjectsTestCase):
         service_get_all.return_value = [db_service]
 
         filters = {'host': 'host', 'binary': 'foo', 'disabled': False}
-        services = objects.ServiceList.get_all(self.context, filters)
-        service_get_all.assert_called_once_with(self.context, **filters)
+        services = objects.ServiceList.get_all(self.context, filters,
+                                               use_slave=True)
+        service_get_all.assert_called_once_with(self.context, use_slave=True,
+                                                **filters)
         self.assertEqual(1, len(services))
         TestService._compare(self, db_service, services[0])
 
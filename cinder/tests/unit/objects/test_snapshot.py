@@ -212,7 +212,8 @@ class TestSnapshotList(test_objects.BaseObjectsTestCase):
         self.assertEqual(1, len(snapshots))
         TestSnapshot._compare(self, fake_snapshot_obj, snapshots[0])
         snapshot_get_all.assert_called_once_with(self.context, search_opts,
-                                                 None, None, None, None, None)
+                                                 None, None, None, None, None,
+                                                 use_slave=False)
 
     @mock.patch('cinder.objects.Volume.get_by_id')
     @mock.patch('cinder.db.snapshot_get_by_host',
@@ -241,7 +242,8 @@ class TestSnapshotList(test_objects.BaseObjectsTestCase):
         get_all_by_project.assert_called_once_with(self.context,
                                                    self.project_id,
                                                    search_opts, None, None,
-                                                   None, None, None)
+                                                   None, None, None,
+                                                   use_slave=False)
 
     @mock.patch('cinder.objects.volume.Volume.get_by_id')
     @mock.patch('cinder.db.snapshot_get_all_for_volume',
@@ -317,4 +319,21 @@ class TestSnapshotList(test_objects.BaseObjectsTestCase):
         snapshot_obj['metadata'] = {'fake_key': 'fake_value'}
         TestSnapshot._compare(self, snapshot_obj, snapshots[0])
         snapshot_get_all.assert_called_once_with(self.context, search_opts,
-                                                 None, None, None, None, None)
+                                                 None, None, None, None, None,
+                                                 use_slave=False)
+
+    @mock.patch('cinder.db.snapshot_update_all')
+    def test_save_all(self, snapshot_update_all):
+        snapshots = [objects.Snapshot._from_db_object(
+            self.context, objects.Snapshot(),
+            dict(fake_db_snapshot, id=snapshot_id))
+            for snapshot_id in (fake.SNAPSHOT_ID, fake.SNAPSHOT2_ID)]
+        snapshots[1].status = fields.SnapshotStatus.ERROR
+
+        objects.SnapshotList.save_all(self.context, snapshots)
+
+        snapshot_update_all.assert_called_once_with(
+            self.context,
+            updates=[(fake.SNAPSHOT2_ID,
+                      {'status': fields.SnapshotStatus.ERROR})])
+        self.assertEqual({}, snapshots[1].obj_get_changes())
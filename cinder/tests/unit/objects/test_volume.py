@@ -16,6 +16,7 @@ import ddt
 import mock
 import six
 
+from cinder.common import constants
 from cinder import context
 from cinder import exception
 from cinder import objects
@@ -410,6 +411,39 @@ class TestVolumeList(test_objects.BaseObjectsTestCase):
         self.assertEqual(1, len(volumes))
         TestVolume._compare(self, db_volume, volumes[0])
 
+    @mock.patch('cinder.db.volume_get_all')
+    def test_get_all_summary_profile(self, volume_get_all):
+        db_volume = fake_volume.fake_db_volume(
+            volume_metadata=[{'key': 'foo', 'value': 'bar'}])
+        volume_get_all.return_value = [db_volume]
+
+        volumes = objects.VolumeList.get_all(
+            self.context, None, None,
+            load_profile=constants.VOLUME_LOAD_SUMMARY)
+
+        volume_get_all.assert_called_once_with(
+            self.context, None, None, sort_keys=None, sort_dirs=None,
+            filters=None, offset=None,
+            load_profile=constants.VOLUME_LOAD_SUMMARY, use_slave=False)
+        self.assertEqual(1, len(volumes))
+        self.assertFalse(volumes[0].obj_attr_is_set('metadata'))
+        self.assertFalse(volumes[0].obj_attr_is_set('volume_type'))
+
+    @mock.patch('cinder.db.volume_get_all_by_project')
+    def test_get_all_by_project_detail_profile(self, get_all_by_project):
+        db_volume = fake_volume.fake_db_volume(
+            volume_metadata=[{'key': 'foo', 'value': 'bar'}],
+            volume_attachment=[])
+        get_all_by_project.return_value = [db_volume]
+
+        volumes = objects.VolumeList.get_all_by_project(
+            self.context, self.context.project_id, None, None,
+            load_profile=constants.VOLUME_LOAD_DETAIL)
+
+        self.assertEqual(1, len(volumes))
+        self.assertEqual({'foo': 'bar'}, volumes[0].metadata)
+        self.assertEqual(0, len(volumes[0].volume_attachment))
+
     @mock.patch('cinder.db.volume_get_all_by_host')
     def test_get_by_host(self, get_all_by_host):
         db_volume = fake_volume.fake_db_volume()
@@ -441,3 +475,29 @@ class TestVolumeList(test_objects.BaseObjectsTestCase):
             mock.sentinel.sorted_dirs, mock.sentinel.filters)
         self.assertEqual(1, len(volumes))
         TestVolume._compare(self, db_volume, volumes[0])
+
+    @mock.patch('cinder.db.volume_metadata_update',
+                return_value={'key1': 'value1'})
+    @mock.patch('cinder.db.volume_update')
+    @mock.patch('cinder.db.volume_update_all')
+    def test_save_all(self, volume_update_all, volume_update,
+                      metadata_update):
+        volumes = [objects.Volume._from_db_object(
+            self.context, objects.Volume(),
+            fake_volume.fake_db_volume(id=volume_id))
+            for volume_id in (fake.VOLUME_ID, fake.VOLUME2_ID,
+                              fake.VOLUME3_ID)]
+        volumes[0].status = 'error'
+        volumes[2].status = 'error'
+        volumes[2].metadata = {'key1': 'value1'}
+
+        objects.VolumeList.save_all(self.context, volumes)
+
+        volume_update_all.assert_called_once_with(
+            self.context, updates=[(fake.VOLUME_ID, {'status': 'error'})])
+        volume_update.assert_called_once_with(self.context, fake.VOLUME3_ID,
+                                              {'status': 'error'})
+        metadata_update.assert_called_once_with(self.context, fake.VOLUME3_ID,
+                                                {'key1': 'value1'}, True)
+        for volume in volumes:
+            self.assertEqual({}, volume.obj_get_changes())
@@ -21,6 +21,7 @@ import mock
 from oslo_config import cfg
 
 from cinder import context
+from cinder.scheduler import base_weight
 from cinder.scheduler import weights
 from cinder import test
 from cinder.tests.unit.scheduler import fakes
@@ -50,7 +51,8 @@ class AllocatedCapacityWeigherTestCase(test.TestCase):
                                          disabled=disabled)
         host_states = self.host_manager.get_all_host_states(ctxt)
         _mock_service_get_all.assert_called_once_with(
-            ctxt, topic=CONF.volume_topic, disabled=disabled)
+            ctxt, topic=CONF.volume_topic, disabled=disabled,
+            use_slave=False)
         return host_states
 
     def test_default_of_spreading_first(self):
@@ -99,3 +101,19 @@ class AllocatedCapacityWeigherTestCase(test.TestCase):
         self.assertEqual(0.0, weighed_host.weight)
         self.assertEqual(
             'host1', utils.extract_host(weighed_host.obj.host))
+
+    def test_weigh_objects_matches_per_object_weighing(self):
+        hostinfo_list = self._get_all_hosts()
+        weighed_objs = [weights.WeighedHost(host, 0.0)
+                        for host in hostinfo_list]
+
+        weigher = weights.capacity.AllocatedCapacityWeigher()
+        batch = weigher.weigh_objects(weighed_objs, {})
+
+        per_object = weights.capacity.AllocatedCapacityWeigher()
+        expected = base_weight.BaseWeigher.weigh_objects(
+            per_object, weighed_objs, {})
+
+        self.assertEqual(expected, batch)
+        self.assertEqual(per_object.minval, weigher.minval)
+        self.assertEqual(per_object.maxval, weigher.maxval)
@@ -104,6 +104,13 @@ class FilterB(base_filter.BaseFilter):
         return None
 
 
+class FilterOdd(base_filter.BaseFilter):
+    io_bound = True
+
+    def _filter_one(self, obj, filter_properties):
+        return obj % 2
+
+
 class FakeExtensionManager(list):
 
     def __init__(self, namespace):
@@ -203,3 +210,21 @@ class TestBaseFilterHandler(test.TestCase):
             cargs = mock_log.debug.call_args[0][0]
             self.assertIn(msg, cargs)
             self.assertIn(exp_output, cargs)
+
+    def test_get_filtered_objects_io_bound_last(self):
+        calls = []
+
+        def fake_filter_all(name):
+            def filter_all(self, list_objs, filter_properties):
+                calls.append((name, list(list_objs)))
+                return list_objs[1:]
+            return filter_all
+
+        self.mock_object(FilterOdd, 'filter_all', fake_filter_all('odd'))
+        self.mock_object(FilterA, 'filter_all', fake_filter_all('a'))
+
+        result = self.handler.get_filtered_objects([FilterOdd, FilterA],
+                                                   [1, 2, 3, 4], {})
+
+        self.assertEqual([3, 4], result)
+        self.assertEqual([('a', [1, 2, 3, 4]), ('odd', [2, 3, 4])], calls)
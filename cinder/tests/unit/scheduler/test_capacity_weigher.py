@@ -20,6 +20,7 @@ import mock
 from oslo_config import cfg
 
 from cinder import context
+from cinder.scheduler import base_weight
 from cinder.scheduler import weights
 from cinder import test
 from cinder.tests.unit.scheduler import fakes
@@ -50,7 +51,8 @@ class CapacityWeigherTestCase(test.TestCase):
                                          disabled=disabled)
         host_states = self.host_manager.get_all_host_states(ctxt)
         _mock_service_get_all.assert_called_once_with(
-            ctxt, topic=CONF.volume_topic, disabled=disabled)
+            ctxt, topic=CONF.volume_topic, disabled=disabled,
+            use_slave=False)
         return host_states
 
     # If thin_provisioning_support = False, use the following formula:
@@ -337,3 +339,19 @@ class CapacityWeigherTestCase(test.TestCase):
         worst_host = weighed_hosts[-1]
         self.assertEqual(-1.0, worst_host.weight)
         self.assertEqual('host5', utils.extract_host(worst_host.obj.host))
+
+    def test_weigh_objects_matches_per_object_weighing(self):
+        hostinfo_list = self._get_all_hosts()
+        weighed_objs = [weights.WeighedHost(host, 0.0)
+                        for host in hostinfo_list]
+
+        weigher = weights.capacity.CapacityWeigher()
+        batch = weigher.weigh_objects(weighed_objs, {})
+
+        per_object = weights.capacity.CapacityWeigher()
+        expected = base_weight.BaseWeigher.weigh_objects(
+            per_object, weighed_objs, {})
+
+        self.assertEqual(expected, batch)
+        self.assertEqual(per_object.minval, weigher.minval)
+        self.assertEqual(per_object.maxval, weigher.maxval)
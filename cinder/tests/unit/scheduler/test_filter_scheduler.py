@@ -77,6 +77,38 @@ class FilterSchedulerTestCase(test_scheduler.SchedulerTestCase):
         self.assertIsNotNone(weighed_host.obj)
         self.assertTrue(_mock_service_get_all.called)
 
+    @mock.patch('cinder.db.service_get_all')
+    def test_schedule_consistencygroup_narrows_candidates(
+            self, _mock_service_get_all):
+        sched = fakes.FakeFilterScheduler()
+        sched.host_manager = fakes.FakeHostManager()
+        fake_context = context.RequestContext('user', 'project',
+                                              is_admin=True)
+        fakes.mock_host_manager_db_calls(_mock_service_get_all)
+        get_filtered_hosts = self.mock_object(
+            sched.host_manager, 'get_filtered_hosts',
+            mock.Mock(wraps=sched.host_manager.get_filtered_hosts))
+        get_weighed_hosts = self.mock_object(
+            sched.host_manager, 'get_weighed_hosts',
+            mock.Mock(wraps=sched.host_manager.get_weighed_hosts))
+
+        request_spec_list = [
+            {'volume_properties': {'project_id': 1, 'size': 0},
+             'volume_type': {'name': 'Type%d' % i, 'extra_specs': {}}}
+            for i in range(3)]
+        weighed_hosts = sched._get_weighted_candidates_group(
+            fake_context, request_spec_list)
+
+        self.assertEqual(['host4#lvm4'],
+                         [host.obj.host for host in weighed_hosts])
+        self.assertEqual(3, get_filtered_hosts.call_count)
+        # Once a volume type was checked, only the pools of the backends
+        # supporting it are filtered.
+        self.assertEqual(['host4#lvm4'],
+                         [pool.host for pool in
+                          get_filtered_hosts.call_args_list[1][0][0]])
+        self.assertEqual(1, get_weighed_hosts.call_count)
+
     @mock.patch('cinder.db.service_get_all')
     def test_schedule_consistencygroup_no_cg_support_in_extra_specs(
             self,
@@ -192,6 +224,32 @@ class FilterSchedulerTestCase(test_scheduler.SchedulerTestCase):
         self.assertIsNotNone(weighed_host.obj)
         self.assertTrue(_mock_service_get_all.called)
 
+    @mock.patch('cinder.db.service_get_all')
+    def test_schedule_weighs_top_hosts(self, _mock_service_get_all):
+        self.flags(scheduler_max_attempts=2)
+        sched = fakes.FakeFilterScheduler()
+        sched.host_manager = fakes.FakeHostManager()
+        fake_context = context.RequestContext('user', 'project',
+                                              is_admin=True)
+        fakes.mock_host_manager_db_calls(_mock_service_get_all)
+        request_spec = {'volume_type': {'name': 'LVM_iSCSI'},
+                        'volume_properties': {'project_id': 1,
+                                              'size': 1}}
+
+        weighed_hosts = sched._get_weighted_candidates(
+            fake_context, request_spec, {}, limit=sched.max_attempts)
+        all_weighed_hosts = sched._get_weighted_candidates(
+            fake_context, request_spec, {})
+
+        self.assertEqual(2, len(weighed_hosts))
+        self.assertEqual([h.obj.host for h in all_weighed_hosts[:2]],
+                         [h.obj.host for h in weighed_hosts])
+        with mock.patch.object(sched, '_get_weighted_candidates',
+                               return_value=weighed_hosts) as get_candidates:
+            sched._schedule(fake_context, request_spec, {})
+        get_candidates.assert_called_once_with(fake_context, request_spec,
+                                               {}, candidates=None, limit=2)
+
     @mock.patch('cinder.db.service_get_all')
     def test_create_volume_clear_host_different_with_cg(self,
                                                         _mock_service_get_all):
@@ -223,6 +281,120 @@ class FilterSchedulerTestCase(test_scheduler.SchedulerTestCase):
         weighed_host = sched._schedule(fake_context, request_spec, {})
         self.assertEqual('host1#lvm1', weighed_host.obj.host)
 
+    @mock.patch('cinder.db.service_get_all')
+    def test_schedule_reuses_cached_candidates(self, _mock_service_get_all):
+        self.flags(scheduler_candidate_cache_ttl=60)
+        sched = fakes.FakeFilterScheduler()
+        sched.host_manager = fakes.FakeHostManager()
+        fakes.mock_host_manager_db_calls(_mock_service_get_all)
+        fake_context = context.RequestContext('user', 'project',
+                                              is_admin=True)
+
+        def request_spec():
+            return {'volume_type': {'name': 'LVM_iSCSI'},
+                    'volume_properties': {'project_id': 1,
+                                          'size': 1}}
+
+        with mock.patch.object(sched.host_manager, 'get_filtered_hosts',
+                               wraps=sched.host_manager.get_filtered_hosts
+                               ) as mock_filter:
+            first = sched._schedule(fake_context, request_spec(), {})
+            second = sched._schedule(fake_context, request_spec(), {})
+
+        self.assertIsNotNone(first)
+        self.assertIsNotNone(second)
+        self.assertEqual(2, mock_filter.call_count)
+        self.assertFalse(mock_filter.call_args_list[0][1].get(
+            'capacity_only', False))
+        self.assertTrue(mock_filter.call_args_list[1][1]['capacity_only'])
+        self.assertEqual(1, len(sched._candidate_cache))
+
+        # A request with a different shape doesn't hit the cache.
+        spec = request_spec()
+        spec['volume_properties']['size'] = 2
+        sched._schedule(fake_context, spec, {})
+        self.assertEqual(2, len(sched._candidate_cache))
+
+    @mock.patch('cinder.db.service_get_all')
+    def test_schedule_candidate_cache_disabled(self, _mock_service_get_all):
+        sched = fakes.FakeFilterScheduler()
+        sched.host_manager = fakes.FakeHostManager()
+        fakes.mock_host_manager_db_calls(_mock_service_get_all)
+        fake_context = context.RequestContext('user', 'project',
+                                              is_admin=True)
+        request_spec = {'volume_type': {'name': 'LVM_iSCSI'},
+                        'volume_properties': {'project_id': 1,
+                                              'size': 1}}
+        sched._schedule(fake_context, request_spec, {})
+        self.assertEqual({}, sched._candidate_cache)
+
+    def test_request_shape_skips_retries(self):
+        self.flags(scheduler_candidate_cache_ttl=60)
+        sched = fakes.FakeFilterScheduler()
+        request_spec = {'volume_type': {'name': 'LVM_iSCSI'},
+                        'volume_properties': {'project_id': 1,
+                                              'size': 1}}
+        fake_context = context.RequestContext('user', 'project')
+        self.assertIsNotNone(sched._get_request_shape(fake_context,
+                                                      request_spec, {}))
+        self.assertIsNone(sched._get_request_shape(
+            fake_context, request_spec, {'retry': {'num_attempts': 2,
+                                                   'hosts': ['host1']}}))
+        self.assertIsNone(sched._get_request_shape(
+            fake_context, request_spec, {'vol_exists_on': 'host1'}))
+
+    def test_request_shape_includes_project(self):
+        sched = fakes.FakeFilterScheduler()
+        request_spec = {'volume_type': {'name': 'LVM_iSCSI'},
+                        'volume_properties': {'size': 1}}
+        filter_properties = {'scheduler_hints': {'local_to_instance': 'uuid'}}
+        self.assertNotEqual(
+            sched._get_request_shape(context.RequestContext('user',
+                                                            'project1'),
+                                     request_spec, filter_properties),
+            sched._get_request_shape(context.RequestContext('user',
+                                                            'project2'),
+                                     request_spec, filter_properties))
+
+    @mock.patch('cinder.scheduler.driver.volume_update_db')
+    @mock.patch('cinder.db.service_get_all')
+    def test_schedule_create_volumes(self, _mock_service_get_all,
+                                     _mock_volume_update_db):
+        sched = fakes.FakeFilterScheduler()
+        sched.host_manager = fakes.FakeHostManager()
+        sched.volume_rpcapi = mock.Mock()
+        fakes.mock_host_manager_db_calls(_mock_service_get_all)
+        fake_context = context.RequestContext('user', 'project',
+                                              is_admin=True)
+
+        request_specs = [{'volume_id': 'fake_id%s' % i,
+                          'volume_type': {'name': 'LVM_iSCSI'},
+                          'volume_properties': {'project_id': 1,
+                                                'size': 1}}
+                         for i in range(3)]
+        # No host is in this availability zone.
+        request_specs[2]['volume_properties']['availability_zone'] = 'none'
+        filter_properties = [{} for __ in request_specs]
+
+        with mock.patch.object(sched.host_manager, 'get_filtered_hosts',
+                               wraps=sched.host_manager.get_filtered_hosts
+                               ) as mock_filter:
+            errors = sched.schedule_create_volumes(fake_context,
+                                                   request_specs,
+                                                   filter_properties)
+
+        self.assertIsNone(errors[0])
+        self.assertIsNone(errors[1])
+        self.assertIsInstance(errors[2], exception.NoValidHost)
+        # The second volume only re-checks capacity on the hosts that
+        # passed filtering for the first one.
+        self.assertEqual(3, mock_filter.call_count)
+        self.assertTrue(mock_filter.call_args_list[1][1]['capacity_only'])
+        self.assertFalse(mock_filter.call_args_list[2][1].get(
+            'capacity_only', False))
+        self.assertEqual(2, _mock_volume_update_db.call_count)
+        self.assertEqual(2, sched.volume_rpcapi.create_volume.call_count)
+
     def test_max_attempts(self):
         self.flags(scheduler_max_attempts=4)
 
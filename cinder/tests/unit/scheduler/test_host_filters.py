@@ -25,7 +25,9 @@ from cinder import context
 from cinder import db
 from cinder import exception
 from cinder.scheduler import filters
+from cinder.scheduler.filters import capabilities_filter
 from cinder.scheduler.filters import extra_specs_ops
+from cinder.scheduler.filters import instance_locality_filter
 from cinder import test
 from cinder.tests.unit import fake_constants as fake
 from cinder.tests.unit.scheduler import fakes
@@ -725,6 +727,34 @@ class AffinityFilterTestCase(HostFiltersTestCase):
 
         self.assertFalse(filt_cls.host_passes(host, filter_properties))
 
+    def test_same_filter_looks_up_volumes_once(self):
+        filt_cls = self.class_map['SameBackendFilter']()
+        hosts = [fakes.FakeHostState('host1#pool%s' % i, {})
+                 for i in range(3)]
+        volume = utils.create_volume(self.context, host='host1#pool1')
+
+        filter_properties = {'context': self.context.elevated(),
+                             'scheduler_hints': {
+            'same_host': [volume.id], }}
+
+        with mock.patch.object(filt_cls.volume_api, 'get_all',
+                               wraps=filt_cls.volume_api.get_all
+                               ) as mock_get_all:
+            result = list(filt_cls.filter_all(hosts, filter_properties))
+
+        self.assertEqual([hosts[1]], result)
+        self.assertEqual(1, mock_get_all.call_count)
+        self.assertEqual({'same_host': ['host1#pool1']},
+                         filter_properties['affinity_hosts'])
+
+        # Another filter instance for the same request reuses the result.
+        filt_cls = self.class_map['SameBackendFilter']()
+        with mock.patch.object(filt_cls.volume_api,
+                               'get_all') as mock_get_all:
+            self.assertTrue(filt_cls.host_passes(hosts[1],
+                                                 filter_properties))
+        self.assertFalse(mock_get_all.called)
+
 
 class DriverFilterTestCase(HostFiltersTestCase):
     def test_passing_function(self):
@@ -919,6 +949,8 @@ class DriverFilterTestCase(HostFiltersTestCase):
 class InstanceLocalityFilterTestCase(HostFiltersTestCase):
     def setUp(self):
         super(InstanceLocalityFilterTestCase, self).setUp()
+        instance_locality_filter.clear_cache()
+        self.addCleanup(instance_locality_filter.clear_cache)
         self.override_config('nova_endpoint_template',
                              'http://novahost:8774/v2/%(project_id)s')
         self.context.service_catalog = \
@@ -955,6 +987,107 @@ class InstanceLocalityFilterTestCase(HostFiltersTestCase):
                              'scheduler_hints': {'local_to_instance': uuid}}
         self.assertFalse(filt_cls.host_passes(host, filter_properties))
 
+    @mock.patch('cinder.compute.nova.API.get_server')
+    @mock.patch('cinder.compute.nova.API.has_extension', return_value=True)
+    def test_hosts_share_lookup(self, _mock_has_extension, _mock_get_server):
+        _mock_get_server.return_value = mock.Mock(
+            **{'OS-EXT-SRV-ATTR:host': 'host2'})
+        filt_cls = self.class_map['InstanceLocalityFilter']
+        hosts = [fakes.FakeHostState('host%s' % i, {}) for i in range(1, 5)]
+        uuid = 'e29b11d4-15ef-34a9-a716-598a6f0b5467'
+
+        filter_properties = {'context': self.context,
+                             'scheduler_hints': {'local_to_instance': uuid}}
+        handler = filters.HostFilterHandler('cinder.scheduler.filters')
+        result = handler.get_filtered_objects([filt_cls], hosts,
+                                              filter_properties)
+
+        self.assertEqual([hosts[1]], result)
+        _mock_get_server.assert_called_once_with(
+            self.context, uuid, privileged_user=True,
+            timeout=mock.ANY)
+
+    @mock.patch('cinder.compute.nova.API.get_server')
+    @mock.patch('cinder.compute.nova.API.has_extension', return_value=True)
+    def test_lookup_shared_across_requests(self, _mock_has_extension,
+                                           _mock_get_server):
+        self.flags(instance_locality_cache_ttl=60)
+        _mock_get_server.return_value = mock.Mock(
+            **{'OS-EXT-SRV-ATTR:host': 'host1'})
+        host = fakes.FakeHostState('host1', {})
+        uuid = 'e29b11d4-15ef-34a9-a716-598a6f0b5467'
+        filter_properties = {'context': self.context,
+                             'scheduler_hints': {'local_to_instance': uuid}}
+
+        for __ in range(3):
+            filt_cls = self.class_map['InstanceLocalityFilter']()
+            self.assertTrue(filt_cls.host_passes(host, filter_properties))
+        self.assertEqual(1, _mock_get_server.call_count)
+
+        # Without the shared cache, every request asks Nova.
+        self.flags(instance_locality_cache_ttl=0)
+        instance_locality_filter.clear_cache()
+        for __ in range(2):
+            filt_cls = self.class_map['InstanceLocalityFilter']()
+            self.assertTrue(filt_cls.host_passes(host, filter_properties))
+        self.assertEqual(3, _mock_get_server.call_count)
+
+    @mock.patch('cinder.compute.nova.API.get_server')
+    @mock.patch('cinder.compute.nova.API.has_extension', return_value=True)
+    def test_unknown_instance_cached(self, _mock_has_extension,
+                                     _mock_get_server):
+        self.flags(instance_locality_negative_cache_ttl=10)
+        uuid = 'e29b11d4-15ef-34a9-a716-598a6f0b5467'
+        _mock_get_server.side_effect = exception.ServerNotFound(uuid=uuid)
+        host = fakes.FakeHostState('host1', {})
+        filter_properties = {'context': self.context,
+                             'scheduler_hints': {'local_to_instance': uuid}}
+
+        for __ in range(2):
+            filt_cls = self.class_map['InstanceLocalityFilter']()
+            self.assertRaises(exception.ServerNotFound,
+                              filt_cls.host_passes, host, filter_properties)
+        self.assertEqual(1, _mock_get_server.call_count)
+
+    @mock.patch('cinder.compute.nova.API.get_server')
+    @mock.patch('cinder.compute.nova.API.has_extension', return_value=True)
+    def test_lookup_not_shared_across_projects(self, _mock_has_extension,
+                                               _mock_get_server):
+        self.flags(instance_locality_cache_ttl=60,
+                   instance_locality_negative_cache_ttl=10)
+        uuid = 'e29b11d4-15ef-34a9-a716-598a6f0b5467'
+        _mock_get_server.side_effect = exception.ServerNotFound(uuid=uuid)
+        host = fakes.FakeHostState('host1', {})
+        other_context = context.RequestContext(fake.USER2_ID,
+                                               fake.PROJECT2_ID)
+        filt_cls = self.class_map['InstanceLocalityFilter']()
+        self.assertRaises(exception.ServerNotFound, filt_cls.host_passes,
+                          host, {'context': other_context,
+                                 'scheduler_hints':
+                                     {'local_to_instance': uuid}})
+
+        _mock_get_server.side_effect = None
+        _mock_get_server.return_value = mock.Mock(
+            **{'OS-EXT-SRV-ATTR:host': 'host1'})
+        filt_cls = self.class_map['InstanceLocalityFilter']()
+        self.assertTrue(filt_cls.host_passes(
+            host, {'context': self.context,
+                   'scheduler_hints': {'local_to_instance': uuid}}))
+        self.assertEqual(2, _mock_get_server.call_count)
+
+    @mock.patch.object(instance_locality_filter, '_MAX_CACHED_INSTANCES', 2)
+    def test_cache_evicts_least_recently_used(self):
+        self.flags(instance_locality_cache_ttl=60)
+        cache = instance_locality_filter._cache_instance_host
+        get_cached = instance_locality_filter._get_cached_instance_host
+        cache(fake.PROJECT_ID, 'uuid1', 'host1')
+        cache(fake.PROJECT_ID, 'uuid2', 'host2')
+        self.assertEqual((True, 'host1'), get_cached(fake.PROJECT_ID, 'uuid1'))
+        cache(fake.PROJECT_ID, 'uuid3', 'host3')
+
+        self.assertEqual((False, None), get_cached(fake.PROJECT_ID, 'uuid2'))
+        self.assertEqual((True, 'host1'), get_cached(fake.PROJECT_ID, 'uuid1'))
+
     def test_handles_none(self):
         filt_cls = self.class_map['InstanceLocalityFilter']()
         host = fakes.FakeHostState('host1', {})
@@ -1026,6 +1159,7 @@ class ExtraSpecsOpsTestCase(test.TestCase):
     def _do_extra_specs_ops_test(self, value, req, matches):
         assertion = self.assertTrue if matches else self.assertFalse
         assertion(extra_specs_ops.match(value, req))
+        assertion(extra_specs_ops.compile_req(req)(value))
 
     def test_extra_specs_matches_simple(self):
         self._do_extra_specs_ops_test(
@@ -1280,6 +1414,26 @@ class BasicFiltersTestCase(HostFiltersTestCase):
                                     'service': service})
         assertion = self.assertTrue if passes else self.assertFalse
         assertion(filt_cls.host_passes(host, filter_properties))
+        assertion(list(filt_cls.filter_all([host], filter_properties)))
+
+    def test_capability_filter_compiled_specs_cached(self):
+        resource_type = {'id': 'fake_id',
+                         'extra_specs': {'opt1': '>= 2',
+                                         'capabilities:opt2': '<is> True',
+                                         'vendor:opt3': 'ignored'}}
+        compiled = capabilities_filter.get_compiled_extra_specs(resource_type)
+        self.assertEqual([('capabilities:opt2', ('opt2',)),
+                          ('opt1', ('opt1',))],
+                         sorted((key, scope) for key, scope, _r, _m
+                                in compiled))
+        self.assertIs(compiled,
+                      capabilities_filter.get_compiled_extra_specs(
+                          resource_type))
+
+        resource_type['extra_specs'] = {'opt1': '>= 3'}
+        self.assertIsNot(compiled,
+                         capabilities_filter.get_compiled_extra_specs(
+                             resource_type))
 
     def test_capability_filter_passes_extra_specs_simple(self):
         self._do_test_type_filter_extra_specs(
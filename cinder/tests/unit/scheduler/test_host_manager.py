@@ -16,6 +16,7 @@
 Tests For HostManager
 """
 
+import collections
 from datetime import datetime
 
 import mock
@@ -120,6 +121,61 @@ class HostManagerTestCase(test.TestCase):
                     'host3': host3_volume_capabs}
         self.assertDictMatch(expected, service_states)
 
+    @mock.patch('oslo_utils.timeutils.utcnow')
+    def test_update_service_capabilities_delta(self, _mock_utcnow):
+        _mock_utcnow.side_effect = [31337, 31338, 31339]
+        capabilities = {'volume_backend_name': 'lvm',
+                        'driver_version': '1.0',
+                        'pools': [{'pool_name': 'pool1',
+                                   'free_capacity_gb': 100},
+                                  {'pool_name': 'pool2',
+                                   'free_capacity_gb': 200,
+                                   'QoS_support': True}]}
+        self.host_manager.update_service_capabilities('volume', 'host1',
+                                                      capabilities,
+                                                      sequence=1)
+        # Pools are completed when applied to the host states.
+        self.host_manager.service_states['host1']['pools'][0][
+            'timestamp'] = 31337
+
+        delta = {'updated': {'driver_version': '1.1'},
+                 'removed': ['volume_backend_name'],
+                 'pools': {'pool2': {'updated': {'free_capacity_gb': 150},
+                                     'removed': ['QoS_support']},
+                           'pool3': {'updated': {'pool_name': 'pool3',
+                                                 'free_capacity_gb': 300}}},
+                 'removed_pools': ['pool1']}
+        self.host_manager.update_service_capabilities('volume', 'host1',
+                                                      {}, sequence=2,
+                                                      delta=delta)
+
+        expected = {'driver_version': '1.1',
+                    'timestamp': 31338,
+                    'pools': [{'pool_name': 'pool2',
+                               'free_capacity_gb': 150},
+                              {'pool_name': 'pool3',
+                               'free_capacity_gb': 300}]}
+        self.assertEqual(expected, self.host_manager.service_states['host1'])
+
+        # A delta following a lost report is ignored.
+        self.host_manager.update_service_capabilities(
+            'volume', 'host1', {}, sequence=4,
+            delta={'updated': {'driver_version': '1.2'}})
+        self.assertEqual(expected, self.host_manager.service_states['host1'])
+
+        # Until the next full report.
+        self.host_manager.update_service_capabilities('volume', 'host1',
+                                                      capabilities,
+                                                      sequence=5)
+        self.assertEqual('lvm', self.host_manager.service_states['host1'][
+            'volume_backend_name'])
+
+    def test_update_service_capabilities_delta_unknown_host(self):
+        self.host_manager.update_service_capabilities(
+            'volume', 'host1', {}, sequence=2,
+            delta={'updated': {'driver_version': '1.2'}})
+        self.assertNotIn('host1', self.host_manager.service_states)
+
     @mock.patch('cinder.utils.service_is_up')
     @mock.patch('cinder.db.service_get_all')
     def test_has_all_capabilities(self, _mock_service_get_all,
@@ -306,6 +362,107 @@ class HostManagerTestCase(test.TestCase):
             test_service.TestService._compare(self, volume_node,
                                               host_state_map[host].service)
 
+    @mock.patch('cinder.db.service_get_all')
+    @mock.patch('cinder.utils.service_is_up')
+    def test_get_all_host_states_incremental(self, _mock_service_is_up,
+                                             _mock_service_get_all):
+        context = 'fake_context'
+        services = [
+            dict(id=1, host='host1', topic='volume', disabled=False,
+                 availability_zone='zone1', updated_at=timeutils.utcnow()),
+            dict(id=2, host='host2', topic='volume', disabled=False,
+                 availability_zone='zone1', updated_at=timeutils.utcnow()),
+        ]
+        _mock_service_get_all.return_value = services
+        _mock_service_is_up.return_value = True
+
+        self.host_manager.update_service_capabilities(
+            'volume', 'host1', dict(volume_backend_name='AAA',
+                                    total_capacity_gb=512,
+                                    free_capacity_gb=200))
+        self.host_manager.update_service_capabilities(
+            'volume', 'host2', dict(volume_backend_name='BBB',
+                                    total_capacity_gb=256,
+                                    free_capacity_gb=100))
+        pools = self.host_manager.get_all_host_states(context)
+        self.assertEqual(2, len(pools))
+        generation = self.host_manager.generation
+
+        # Nothing changed, so no host state gets rebuilt.
+        with mock.patch.object(host_manager.HostState,
+                               'update_from_volume_capability') as mock_upd:
+            pools = self.host_manager.get_all_host_states(context)
+            self.assertFalse(mock_upd.called)
+        self.assertEqual(2, len(pools))
+        self.assertEqual(generation, self.host_manager.generation)
+
+        # Only the host that reported gets updated.
+        self.host_manager.update_service_capabilities(
+            'volume', 'host2', dict(volume_backend_name='BBB',
+                                    total_capacity_gb=256,
+                                    free_capacity_gb=50))
+        pools = self.host_manager.get_all_host_states(context)
+        self.assertGreater(self.host_manager.generation, generation)
+        self.assertEqual(
+            50, self.host_manager.host_state_map['host2'].pools['BBB']
+            .free_capacity_gb)
+        self.assertEqual(
+            200, self.host_manager.host_state_map['host1'].pools['AAA']
+            .free_capacity_gb)
+
+        # Heartbeats of the services don't invalidate the listings.
+        generation = self.host_manager.generation
+        for service in services:
+            service['updated_at'] = timeutils.utcnow()
+            service['report_count'] = service.get('report_count', 0) + 1
+        self.host_manager.get_all_host_states(context)
+        self.assertEqual(generation, self.host_manager.generation)
+
+        # A change in the service is propagated to the pools.
+        services[0]['availability_zone'] = 'zone2'
+        self.host_manager.get_all_host_states(context)
+        self.assertGreater(self.host_manager.generation, generation)
+        host1 = self.host_manager.host_state_map['host1']
+        self.assertEqual('zone2', host1.service['availability_zone'])
+        self.assertEqual('zone2',
+                         host1.pools['AAA'].service['availability_zone'])
+
+    @mock.patch('cinder.db.service_get_all')
+    @mock.patch('cinder.utils.service_is_up')
+    def test_get_all_host_states_service_list_ttl(self, _mock_service_is_up,
+                                                  _mock_service_get_all):
+        self.flags(scheduler_service_list_ttl=60)
+        context = 'fake_context'
+        services = [
+            dict(id=1, host='host1', topic='volume', disabled=False,
+                 availability_zone='zone1', updated_at=timeutils.utcnow()),
+        ]
+        _mock_service_get_all.return_value = services
+        _mock_service_is_up.return_value = True
+        self.host_manager.update_service_capabilities(
+            'volume', 'host1', dict(volume_backend_name='AAA',
+                                    total_capacity_gb=512,
+                                    free_capacity_gb=200))
+
+        self.host_manager.get_all_host_states(context)
+        self.host_manager.get_all_host_states(context)
+        self.assertEqual(1, _mock_service_get_all.call_count)
+
+        # Capability reports are applied without waiting for the TTL.
+        self.host_manager.update_service_capabilities(
+            'volume', 'host1', dict(volume_backend_name='AAA',
+                                    total_capacity_gb=512,
+                                    free_capacity_gb=100))
+        pools = list(self.host_manager.get_all_host_states(context))
+        self.assertEqual(100, pools[0].free_capacity_gb)
+        self.assertEqual(1, _mock_service_get_all.call_count)
+
+        # Once the TTL expires the service list is queried again.
+        with mock.patch.object(timeutils, 'is_older_than',
+                               return_value=True):
+            self.host_manager.get_all_host_states(context)
+        self.assertEqual(2, _mock_service_get_all.call_count)
+
     @mock.patch('cinder.db.service_get_all')
     @mock.patch('cinder.utils.service_is_up')
     def test_get_pools(self, _mock_service_is_up,
@@ -397,6 +554,61 @@ class HostManagerTestCase(test.TestCase):
             self.assertEqual(sorted(expected, key=sort_func),
                              sorted(res, key=sort_func))
 
+    @mock.patch('cinder.db.service_get_all')
+    @mock.patch('cinder.utils.service_is_up', return_value=True)
+    def test_get_pools_filters(self, _mock_service_is_up,
+                               _mock_service_get_all):
+        context = 'fake_context'
+        _mock_service_get_all.return_value = [
+            dict(id=i, host=host, topic='volume', disabled=False,
+                 availability_zone='zone1', updated_at=timeutils.utcnow())
+            for i, host in enumerate(['host1@lvm', 'host2@lvm'])]
+        service_states = {
+            'host1@lvm': dict(timestamp=None,
+                              pools=[dict(pool_name='pool%d' % i,
+                                          QoS_support=bool(i % 2))
+                                     for i in range(4)]),
+            'host2@lvm': dict(timestamp=None,
+                              pools=[dict(pool_name='pool0',
+                                          QoS_support=True)]),
+        }
+
+        def names(pools):
+            return [pool['name'] for pool in pools]
+
+        with mock.patch.dict(self.host_manager.service_states,
+                             service_states):
+            self.assertEqual(['host1@lvm#pool0', 'host1@lvm#pool1',
+                              'host1@lvm#pool2', 'host1@lvm#pool3',
+                              'host2@lvm#pool0'],
+                             names(self.host_manager.get_pools(context)))
+            self.assertEqual(['host2@lvm#pool0'], names(
+                self.host_manager.get_pools(context,
+                                            {'backend': 'host2@lvm'})))
+            self.assertEqual(['host1@lvm#pool2'], names(
+                self.host_manager.get_pools(context,
+                                            {'name': 'host1@lvm#pool2'})))
+            self.assertEqual(['host1@lvm#pool3', 'host2@lvm#pool0'], names(
+                self.host_manager.get_pools(context,
+                                            {'QoS_support': 'True',
+                                             'marker': 'host1@lvm#pool1'})))
+            self.assertEqual(['host1@lvm#pool2'], names(
+                self.host_manager.get_pools(context,
+                                            {'QoS_support': 'False',
+                                             'limit': 1, 'offset': 1})))
+            self.assertRaises(exception.InvalidInput,
+                              self.host_manager.get_pools, context,
+                              {'marker': 'host1@lvm#pool9'})
+
+            # The listing is only rebuilt when capabilities change.
+            listing = self.host_manager._pools_listing
+            self.host_manager.get_pools(context)
+            self.assertIs(listing, self.host_manager._pools_listing)
+            self.host_manager.update_service_capabilities(
+                'volume', 'host2@lvm', service_states['host2@lvm'])
+            self.host_manager.get_pools(context)
+            self.assertIsNot(listing, self.host_manager._pools_listing)
+
 
 class HostStateTestCase(test.TestCase):
     """Test case for HostState class."""
@@ -586,6 +798,62 @@ class HostStateTestCase(test.TestCase):
         self.assertEqual(0,
                          fake_host.pools['_pool0'].provisioned_capacity_gb)
 
+    def test_pools_are_compact(self):
+        fake_host = host_manager.HostState('host1')
+        capability = {'timestamp': None,
+                      'pools': [{'pool_name': 'pool%d' % i,
+                                 ''.join(['custom_', 'capability']): i}
+                                for i in range(2)]}
+
+        fake_host.update_from_volume_capability(capability,
+                                                service={'host': 'host1'})
+
+        pool0 = fake_host.pools['pool0']
+        pool1 = fake_host.pools['pool1']
+        self.assertFalse(hasattr(pool0, '__dict__'))
+        self.assertIs(fake_host.service.data, pool0.service.data)
+        self.assertIs(pool0.service.data, pool1.service.data)
+        key0 = [k for k in pool0.capabilities if k.startswith('custom_')][0]
+        key1 = [k for k in pool1.capabilities if k.startswith('custom_')][0]
+        self.assertIs(key0, key1)
+
+
+class ReadOnlyDictTestCase(test.TestCase):
+    """Test case for ReadOnlyDict class."""
+
+    def test_copy_on_write(self):
+        source = {'key': 'value'}
+        read_only = host_manager.ReadOnlyDict(source)
+        source['key'] = 'new value'
+
+        self.assertEqual({'key': 'value'}, dict(read_only))
+        self.assertIs(read_only.data,
+                      host_manager.ReadOnlyDict(read_only).data)
+
+    def test_unicode_keys_interned(self):
+        prefix = u'custom_'
+        read_only0 = host_manager.ReadOnlyDict({prefix + u'key': 1})
+        read_only1 = host_manager.ReadOnlyDict({prefix + u'key': 2})
+
+        key0 = list(read_only0)[0]
+        self.assertIs(key0, list(read_only1)[0])
+        self.assertEqual(1, read_only0[u'custom_key'])
+
+    def test_non_ascii_keys_kept(self):
+        read_only = host_manager.ReadOnlyDict({u'cl\xe9': 1})
+
+        self.assertEqual(1, read_only[u'cl\xe9'])
+
+    def test_mapping_without_dict(self):
+        read_only = host_manager.ReadOnlyDict({'key': 'value'})
+
+        self.assertIsInstance(read_only, collections.Mapping)
+        self.assertFalse(hasattr(read_only, '__dict__'))
+        self.assertEqual({'key': 'value'}, read_only)
+        self.assertEqual(read_only, host_manager.ReadOnlyDict(read_only))
+        self.assertIn('key', read_only)
+        self.assertIsNone(read_only.get('missing'))
+
 
 class PoolStateTestCase(test.TestCase):
     """Test case for HostState class."""
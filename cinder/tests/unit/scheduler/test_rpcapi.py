@@ -77,7 +77,9 @@ class SchedulerRpcAPITestCase(test.TestCase):
                 for kwarg, value in self.fake_kwargs.items():
                     self.assertEqual(expected_msg[kwarg], value)
 
-    def test_update_service_capabilities(self):
+    @mock.patch('oslo_messaging.RPCClient.can_send_version',
+                return_value=False)
+    def test_update_service_capabilities_old(self, can_send_version):
         self._test_scheduler_api('update_service_capabilities',
                                  rpc_method='cast',
                                  service_name='fake_name',
@@ -85,6 +87,34 @@ class SchedulerRpcAPITestCase(test.TestCase):
                                  capabilities='fake_capabilities',
                                  fanout=True,
                                  version='2.0')
+        can_send_version.assert_called_once_with('2.3')
+
+    @mock.patch('oslo_messaging.RPCClient.can_send_version',
+                return_value=True)
+    def test_update_service_capabilities(self, can_send_version):
+        self._test_scheduler_api('update_service_capabilities',
+                                 rpc_method='cast',
+                                 service_name='fake_name',
+                                 host='fake_host',
+                                 capabilities='fake_capabilities',
+                                 sequence=1,
+                                 fanout=True,
+                                 version='2.3')
+
+    @mock.patch('oslo_messaging.RPCClient.can_send_version',
+                return_value=True)
+    def test_update_service_capabilities_delta(self, can_send_version):
+        ctxt = context.RequestContext('fake_user', 'fake_project')
+        rpcapi = scheduler_rpcapi.SchedulerAPI()
+        with mock.patch.object(rpcapi.client, 'prepare') as mock_prepare:
+            rpcapi.update_service_capabilities(
+                ctxt, 'fake_name', 'fake_host', 'fake_capabilities',
+                sequence=2, delta='fake_delta')
+
+        mock_prepare.assert_called_once_with(fanout=True, version='2.3')
+        mock_prepare.return_value.cast.assert_called_once_with(
+            ctxt, 'update_service_capabilities', service_name='fake_name',
+            host='fake_host', sequence=2, delta='fake_delta')
 
     def test_create_volume(self):
         self._test_scheduler_api('create_volume',
@@ -98,6 +128,38 @@ class SchedulerRpcAPITestCase(test.TestCase):
                                  volume='volume',
                                  version='2.0')
 
+    @mock.patch('oslo_messaging.RPCClient.can_send_version',
+                return_value=True)
+    def test_create_volumes(self, can_send_version):
+        self._test_scheduler_api('create_volumes',
+                                 rpc_method='cast',
+                                 request_spec_list=['fake_request_spec'],
+                                 filter_properties_list=['filter_properties'],
+                                 version='2.2')
+        can_send_version.assert_called_once_with('2.2')
+
+    @mock.patch('oslo_messaging.RPCClient.can_send_version',
+                return_value=False)
+    @mock.patch('cinder.scheduler.rpcapi.SchedulerAPI.create_volume')
+    def test_create_volumes_old_scheduler(self, create_volume,
+                                          can_send_version):
+        ctxt = context.RequestContext('fake_user', 'fake_project')
+        rpcapi = scheduler_rpcapi.SchedulerAPI()
+        request_specs = [{'volume_id': 'fake_id1', 'snapshot_id': 'snap',
+                          'image_id': None},
+                         {'volume_id': 'fake_id2'}]
+
+        rpcapi.create_volumes(ctxt, request_specs)
+
+        self.assertEqual(
+            [mock.call(ctxt, mock.ANY, 'fake_id1', snapshot_id='snap',
+                       image_id=None, request_spec=request_specs[0],
+                       filter_properties={}),
+             mock.call(ctxt, mock.ANY, 'fake_id2', snapshot_id=None,
+                       image_id=None, request_spec=request_specs[1],
+                       filter_properties={})],
+            create_volume.call_args_list)
+
     def test_migrate_volume_to_host(self):
         self._test_scheduler_api('migrate_volume_to_host',
                                  rpc_method='cast',
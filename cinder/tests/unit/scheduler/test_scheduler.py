@@ -103,7 +103,8 @@ class SchedulerManagerTestCase(test.TestCase):
         self.manager.update_service_capabilities(self.context,
                                                  service_name=service,
                                                  host=host)
-        _mock_update_cap.assert_called_once_with(service, host, {})
+        _mock_update_cap.assert_called_once_with(service, host, {},
+                                                 sequence=None, delta=None)
 
     @mock.patch('cinder.scheduler.driver.Scheduler.'
                 'update_service_capabilities')
@@ -117,7 +118,22 @@ class SchedulerManagerTestCase(test.TestCase):
                                                  service_name=service,
                                                  host=host,
                                                  capabilities=capabilities)
-        _mock_update_cap.assert_called_once_with(service, host, capabilities)
+        _mock_update_cap.assert_called_once_with(service, host, capabilities,
+                                                 sequence=None, delta=None)
+
+    @mock.patch('cinder.scheduler.driver.Scheduler.'
+                'update_service_capabilities')
+    def test_update_service_capabilities_delta(self, _mock_update_cap):
+        service = 'fake_service'
+        host = 'fake_host'
+        delta = {'updated': {'fake_capability': 'fake_value'}}
+
+        self.manager.update_service_capabilities(self.context,
+                                                 service_name=service,
+                                                 host=host, sequence=2,
+                                                 delta=delta)
+        _mock_update_cap.assert_called_once_with(service, host, {},
+                                                 sequence=2, delta=delta)
 
     @mock.patch('cinder.scheduler.driver.Scheduler.schedule_create_volume')
     @mock.patch('cinder.message.api.API.create')
@@ -147,6 +163,34 @@ class SchedulerManagerTestCase(test.TestCase):
             self.context.project_id, resource_type='VOLUME',
             resource_uuid=volume.id)
 
+    @mock.patch('cinder.scheduler.driver.Scheduler.schedule_create_volume')
+    @mock.patch('cinder.message.api.API.create')
+    @mock.patch('cinder.db.volume_update')
+    def test_create_volumes(self, _mock_volume_update, _mock_message_create,
+                            _mock_sched_create):
+        # The volume that can't be placed is put in error state, the
+        # others are scheduled.
+        volumes = [fake_volume.fake_volume_obj(self.context,
+                                               id=fake.VOLUME_ID),
+                   fake_volume.fake_volume_obj(self.context,
+                                               id=fake.VOLUME2_ID)]
+        request_specs = [{'volume_id': volume.id} for volume in volumes]
+        _mock_sched_create.side_effect = [None,
+                                          exception.NoValidHost(reason="")]
+
+        self.manager.create_volumes(self.context, request_specs)
+
+        self.assertEqual([mock.call(self.context, request_specs[0], {}),
+                          mock.call(self.context, request_specs[1], {})],
+                         _mock_sched_create.call_args_list)
+        _mock_volume_update.assert_called_once_with(self.context,
+                                                    fake.VOLUME2_ID,
+                                                    {'status': 'error'})
+        _mock_message_create.assert_called_once_with(
+            self.context, defined_messages.UNABLE_TO_ALLOCATE,
+            self.context.project_id, resource_type='VOLUME',
+            resource_uuid=fake.VOLUME2_ID)
+
     @mock.patch('cinder.scheduler.driver.Scheduler.schedule_create_volume')
     @mock.patch('eventlet.sleep')
     def test_create_volume_no_delay(self, _mock_sleep, _mock_sched_create):
@@ -0,0 +1,131 @@
+# Copyright (c) 2016 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+"""
+Tests For the scheduler shared state backends.
+"""
+
+import os
+
+import fixtures
+import mock
+from oslo_utils import timeutils
+
+from cinder import context
+from cinder.scheduler import shared_state
+from cinder import test
+from cinder.tests.unit.scheduler import fakes
+
+
+class SharedStateBackendTestCase(test.TestCase):
+    def setUp(self):
+        super(SharedStateBackendTestCase, self).setUp()
+        self.path = os.path.join(self.useFixture(fixtures.TempDir()).path,
+                                 'shared_state.sqlite')
+
+    def _reservation(self, host='host1', created_at=None):
+        if created_at is None:
+            created_at = timeutils.utcnow_ts(microsecond=True)
+        return shared_state.Reservation('id-%s-%s' % (host, created_at),
+                                        'scheduler1', host, 10, created_at)
+
+    def _test_backend(self, backend1, backend2):
+        reservation1 = self._reservation('host1')
+        reservation2 = self._reservation('host2')
+        expired = self._reservation(
+            'host3', timeutils.utcnow_ts(microsecond=True) - 120)
+
+        backend1.add_reservation(expired)
+        backend1.add_reservation(reservation1)
+        backend2.add_reservation(reservation2)
+
+        for backend in (backend1, backend2):
+            self.assertEqual(
+                [reservation1, reservation2],
+                sorted(backend.get_reservations(), key=lambda r: r.host))
+
+    def test_sqlite_backend(self):
+        self._test_backend(shared_state.SQLiteBackend(self.path, 60),
+                           shared_state.SQLiteBackend(self.path, 60))
+
+    def test_tooz_backend(self):
+        backend1 = shared_state.ToozBackend(60)
+        backend2 = shared_state.ToozBackend(60)
+        self.addCleanup(backend1.coordinator.stop)
+        self.addCleanup(backend2.coordinator.stop)
+        self._test_backend(backend1, backend2)
+
+    def test_get_backend(self):
+        self.assertIsNone(shared_state.get_backend(None, self.path, 60))
+        self.assertIsInstance(
+            shared_state.get_backend('sqlite', self.path, 60),
+            shared_state.SQLiteBackend)
+        self.assertIsInstance(shared_state.get_backend('tooz', None, 60),
+                              shared_state.ToozBackend)
+
+
+class SharedStateHostManagerTestCase(test.TestCase):
+    def setUp(self):
+        super(SharedStateHostManagerTestCase, self).setUp()
+        self.flags(scheduler_shared_state_backend='sqlite',
+                   scheduler_shared_state_path=os.path.join(
+                       self.useFixture(fixtures.TempDir()).path,
+                       'shared_state.sqlite'))
+        self.context = context.get_admin_context()
+
+    def _get_pool(self, manager, host):
+        for pool in manager.get_all_host_states(self.context):
+            if pool.host.startswith(host + '#'):
+                return pool
+
+    @mock.patch('cinder.db.service_get_all')
+    def test_consumed_capacity_shared(self, _mock_service_get_all):
+        fakes.mock_host_manager_db_calls(_mock_service_get_all)
+        manager1 = fakes.FakeHostManager()
+        manager2 = fakes.FakeHostManager()
+
+        manager1.consume_from_volume(self._get_pool(manager1, 'host1'),
+                                     {'size': 10})
+
+        self.assertEqual(1014, self._get_pool(manager1, 'host1')
+                         .free_capacity_gb)
+        # Reservations are only applied once.
+        self.assertEqual(1014, self._get_pool(manager2, 'host1')
+                         .free_capacity_gb)
+        self.assertEqual(1014, self._get_pool(manager2, 'host1')
+                         .free_capacity_gb)
+        self.assertEqual(300, self._get_pool(manager2, 'host2')
+                         .free_capacity_gb)
+
+        # A newer report of the back-end includes the reserved capacity.
+        capabilities = dict(manager2.service_states['host1'],
+                            free_capacity_gb=1000)
+        manager2.update_service_capabilities('volume', 'host1', capabilities)
+        self.assertEqual(1000, self._get_pool(manager2, 'host1')
+                         .free_capacity_gb)
+
+    @mock.patch('cinder.db.service_get_all')
+    def test_backend_failure_ignored(self, _mock_service_get_all):
+        fakes.mock_host_manager_db_calls(_mock_service_get_all)
+        manager = fakes.FakeHostManager()
+        self.mock_object(manager._shared_state, 'get_reservations',
+                         mock.Mock(side_effect=Exception))
+        self.mock_object(manager._shared_state, 'add_reservation',
+                         mock.Mock(side_effect=Exception))
+
+        manager.consume_from_volume(self._get_pool(manager, 'host1'),
+                                    {'size': 10})
+
+        self.assertEqual(1014, self._get_pool(manager, 'host1')
+                         .free_capacity_gb)
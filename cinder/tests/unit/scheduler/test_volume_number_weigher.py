@@ -76,7 +76,8 @@ class VolumeNumberWeigherTestCase(test.TestCase):
                                          disabled=disabled)
         host_states = self.host_manager.get_all_host_states(ctxt)
         _mock_service_get_all.assert_called_once_with(
-            ctxt, topic=CONF.volume_topic, disabled=disabled)
+            ctxt, topic=CONF.volume_topic, disabled=disabled,
+            use_slave=False)
         return host_states
 
     def test_volume_number_weight_multiplier1(self):
@@ -17,6 +17,8 @@
 Tests For Scheduler weights.
 """
 
+import mock
+
 from cinder.scheduler import base_weight
 from cinder import test
 
@@ -52,3 +54,35 @@ class TestWeightHandler(test.TestCase):
         for seq, result, minval, maxval in map_:
             ret = base_weight.normalize(seq, minval=minval, maxval=maxval)
             self.assertEqual(result, tuple(ret))
+
+    def _get_weighed_objects(self, multiplier, limit=None):
+        class FakeWeigher(base_weight.BaseWeigher):
+            def weight_multiplier(self):
+                return multiplier
+
+            def _weigh_object(self, obj, weight_properties):
+                return obj
+
+        self.weigh_object = self.mock_object(
+            FakeWeigher, '_weigh_object',
+            mock.Mock(side_effect=lambda obj, props: float(obj)))
+        handler = base_weight.BaseWeightHandler(base_weight.BaseWeigher,
+                                                'cinder.scheduler.weights')
+        return handler.get_weighed_objects([FakeWeigher],
+                                           [3, 1, 4, 1, 5, 9, 2, 6], {},
+                                           limit=limit)
+
+    def test_get_weighed_objects(self):
+        weighed_objs = self._get_weighed_objects(1.0)
+        self.assertEqual([9, 6, 5, 4, 3, 2, 1, 1],
+                         [obj.obj for obj in weighed_objs])
+
+    def test_get_weighed_objects_limit(self):
+        weighed_objs = self._get_weighed_objects(-1.0, limit=3)
+        self.assertEqual([1, 1, 2], [obj.obj for obj in weighed_objs])
+        self.assertEqual(-0.125, weighed_objs[2].weight)
+
+    def test_get_weighed_objects_zero_multiplier(self):
+        weighed_objs = self._get_weighed_objects(0.0, limit=2)
+        self.assertEqual([3, 1], [obj.obj for obj in weighed_objs])
+        self.assertFalse(self.weigh_object.called)
@@ -408,6 +408,60 @@ class TestCinderManageCmd(test.TestCase):
         with mock.patch('sys.stdout', new=six.StringIO()):
             self.assertRaises(exception.InvalidInput, db_cmds.sync, 1)
 
+    @mock.patch('cinder.db.purge_deleted_rows')
+    @mock.patch('cinder.context.get_admin_context')
+    def test_db_commands_purge(self, get_admin_context, purge_deleted_rows):
+        ctxt = context.RequestContext('admin', 'fake', True)
+        get_admin_context.return_value = ctxt
+        purge_deleted_rows.return_value = ({'volume_metadata': 3,
+                                            'volumes': 1}, True)
+        db_cmds = cinder_manage.DbCommands()
+        with mock.patch('sys.stdout', new=six.StringIO()) as fake_out:
+            db_cmds.purge(30, batch_size=100, sleep=0.5, max_runtime=60)
+
+        purge_deleted_rows.assert_called_once_with(
+            ctxt, 30, batch_size=100, sleep=0.5, max_runtime=60)
+        self.assertIn('volume_metadata', fake_out.getvalue())
+        self.assertNotIn('Purge stopped', fake_out.getvalue())
+
+    @mock.patch('cinder.db.purge_deleted_rows')
+    @mock.patch('cinder.context.get_admin_context')
+    def test_db_commands_purge_stopped(self, get_admin_context,
+                                       purge_deleted_rows):
+        get_admin_context.return_value = context.RequestContext(
+            'admin', 'fake', True)
+        purge_deleted_rows.return_value = ({'volumes': 1}, False)
+        db_cmds = cinder_manage.DbCommands()
+        with mock.patch('sys.stdout', new=six.StringIO()) as fake_out:
+            db_cmds.purge(30, max_runtime=60)
+
+        self.assertIn('Purge stopped after 60 seconds', fake_out.getvalue())
+
+    def test_db_commands_purge_bad_batch_size(self):
+        db_cmds = cinder_manage.DbCommands()
+        with mock.patch('sys.stdout', new=six.StringIO()):
+            exit = self.assertRaises(SystemExit, db_cmds.purge, 30,
+                                     batch_size=0)
+        self.assertEqual(1, exit.code)
+
+    @mock.patch('cinder.db.usage_counters_reconcile')
+    @mock.patch('cinder.context.get_admin_context')
+    def test_db_commands_reconcile_usage_counters(self, get_admin_context,
+                                                  reconcile):
+        ctxt = context.RequestContext('admin', 'fake', True)
+        get_admin_context.return_value = ctxt
+        reconcile.return_value = [
+            ('project1', '', {'volumes': 2, 'gigabytes': 3},
+             {'volumes': 1, 'gigabytes': 3})]
+        db_cmds = cinder_manage.DbCommands()
+        with mock.patch('sys.stdout', new=six.StringIO()) as fake_out:
+            db_cmds.reconcile_usage_counters(project_id='project1')
+
+        reconcile.assert_called_once_with(ctxt, project_id='project1')
+        output = fake_out.getvalue()
+        self.assertIn('2 -> 1', output)
+        self.assertNotIn('gigabytes', output)
+
     @mock.patch('cinder.version.version_string')
     def test_versions_commands_list(self, version_string):
         version_cmds = cinder_manage.VersionCommands()
@@ -439,7 +493,8 @@ class TestCinderManageCmd(test.TestCase):
             host_cmds.list()
 
             get_admin_context.assert_called_once_with()
-            service_get_all.assert_called_once_with(mock.sentinel.ctxt)
+            service_get_all.assert_called_once_with(mock.sentinel.ctxt,
+                                                    use_slave=False)
             self.assertEqual(expected_out, fake_out.getvalue())
 
     @mock.patch('cinder.db.service_get_all')
@@ -462,7 +517,8 @@ class TestCinderManageCmd(test.TestCase):
             host_cmds.list(zone='fake-az1')
 
             get_admin_context.assert_called_once_with()
-            service_get_all.assert_called_once_with(mock.sentinel.ctxt)
+            service_get_all.assert_called_once_with(mock.sentinel.ctxt,
+                                                    use_slave=False)
             self.assertEqual(expected_out, fake_out.getvalue())
 
     @mock.patch('cinder.objects.base.CinderObjectSerializer')
@@ -676,7 +732,8 @@ class TestCinderManageCmd(test.TestCase):
 
             get_admin_context.assert_called_once_with()
             backup_get_all.assert_called_once_with(ctxt, None, None, None,
-                                                   None, None, None)
+                                                   None, None, None,
+                                                   use_slave=False)
             self.assertEqual(expected_out, fake_out.getvalue())
 
     @mock.patch('cinder.db.backup_update')
@@ -747,7 +804,7 @@ class TestCinderManageCmd(test.TestCase):
 
             self.assertEqual(expected_out, fake_out.getvalue())
             get_admin_context.assert_called_with()
-            service_get_all.assert_called_with(ctxt)
+            service_get_all.assert_called_with(ctxt, use_slave=False)
 
     def test_service_commands_list(self):
         service = {'binary': 'cinder-binary',
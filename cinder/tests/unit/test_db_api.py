@@ -15,17 +15,23 @@
 
 
 import datetime
+import os
 
 import enum
+import fixtures
 import mock
 from oslo_config import cfg
+from oslo_db.sqlalchemy import session as db_session
 from oslo_utils import uuidutils
 import six
+import sqlalchemy
 
 from cinder.api import common
+from cinder.common import constants
 from cinder import context
 from cinder import db
 from cinder.db.sqlalchemy import api as sqlalchemy_api
+from cinder.db.sqlalchemy import models
 from cinder import exception
 from cinder import objects
 from cinder.objects import fields
@@ -406,6 +412,48 @@ class DBAPIVolumeTestCase(BaseTest):
         self._assertEqualListsOfObjects(volumes, db.volume_get_all(
                                         self.ctxt, None, None, ['host'], None))
 
+    def test_volume_get_all_summary_profile(self):
+        db.volume_create(self.ctxt, {'metadata': {'k1': 'v1'}})
+        volumes = db.volume_get_all(
+            self.ctxt, None, None,
+            load_profile=constants.VOLUME_LOAD_SUMMARY)
+
+        self.assertEqual(1, len(volumes))
+        unloaded = sqlalchemy.inspect(volumes[0]).unloaded
+        self.assertTrue({'volume_metadata', 'volume_admin_metadata',
+                         'volume_type', 'volume_attachment',
+                         'consistencygroup'}.issubset(unloaded))
+
+    def test_volume_get_all_detail_profile(self):
+        metadata = {'k1': 'v1', 'k2': 'v2', 'k3': 'v3'}
+        for volume_id in ('1', '2', '3'):
+            db.volume_create(self.ctxt, {'id': volume_id,
+                                         'metadata': metadata})
+        db.volume_admin_metadata_update(self.ctxt, '2', {'readonly': 'True'},
+                                        False)
+
+        result = db.volume_get_all(self.ctxt, None, 2, ['id'], ['asc'],
+                                   load_profile=constants.VOLUME_LOAD_DETAIL)
+
+        # Related rows don't multiply the volumes that honour the limit
+        self.assertEqual(['1', '2'], [volume.id for volume in result])
+        for volume in result:
+            unloaded = sqlalchemy.inspect(volume).unloaded
+            self.assertNotIn('volume_metadata', unloaded)
+            self.assertNotIn('volume_admin_metadata', unloaded)
+            self.assertNotIn('volume_attachment', unloaded)
+            self.assertEqual(metadata, {m.key: m.value
+                                        for m in volume.volume_metadata})
+        self.assertEqual([[], ['readonly']],
+                         [[m.key for m in v.volume_admin_metadata]
+                          for v in result])
+
+    def test_volume_get_all_by_project_unknown_profile(self):
+        self.assertRaises(exception.InvalidInput,
+                          db.volume_get_all_by_project, self.ctxt,
+                          self.ctxt.project_id, None, None,
+                          load_profile='everything')
+
     def test_volume_get_all_marker_passed(self):
         volumes = [
             db.volume_create(self.ctxt, {'id': 1}),
@@ -417,6 +465,25 @@ class DBAPIVolumeTestCase(BaseTest):
         self._assertEqualListsOfObjects(volumes[2:], db.volume_get_all(
                                         self.ctxt, 2, 2, ['id'], ['asc']))
 
+    def test_volume_get_all_cursor_passed(self):
+        volumes = [db.volume_create(self.ctxt, {'size': i % 2})
+                   for i in range(5)]
+        volumes.sort(key=lambda v: (v.size, v.created_at, v.id))
+        marker = volumes[1]
+        cursor = common.encode_pagination_cursor(
+            {'size': marker.size, 'created_at': marker.created_at,
+             'id': marker.id})
+        # The cursor is enough, even when the marker volume is gone.
+        db.volume_destroy(self.ctxt, marker.id)
+
+        self._assertEqualListsOfObjects(volumes[2:4], db.volume_get_all(
+            self.ctxt, cursor, 2, ['size'], ['asc']))
+
+    def test_volume_get_all_cursor_wrong_sort_keys(self):
+        cursor = common.encode_pagination_cursor({'id': fake.VOLUME_ID})
+        self.assertRaises(exception.InvalidInput, db.volume_get_all,
+                          self.ctxt, cursor, 2, ['size'], ['asc'])
+
     def test_volume_get_all_by_host(self):
         volumes = []
         for i in range(3):
@@ -942,6 +1009,60 @@ class DBAPIVolumeTestCase(BaseTest):
         self.assertRaises(exception.VolumeNotFound, db.volume_update,
                           self.ctxt, 42, {})
 
+    def test_volume_update_all_pairs(self):
+        volumes = [db.volume_create(self.ctxt, {'host': 'h1'})
+                   for i in range(4)]
+        deleted = db.volume_create(self.ctxt, {'host': 'h1'})
+        db.volume_destroy(self.ctxt, deleted['id'])
+
+        updated = db.volume_update_all(
+            self.ctxt,
+            updates=[(volumes[0]['id'], {'status': 'error'}),
+                     (volumes[1]['id'], {'status': 'error'}),
+                     (volumes[2]['id'], {'provider_id': 'p2'}),
+                     (volumes[3]['id'], {'provider_id': 'p3'}),
+                     (deleted['id'], {'status': 'error'})])
+
+        self.assertEqual(4, updated)
+        result = [db.volume_get(self.ctxt, volume['id'])
+                  for volume in volumes]
+        self.assertEqual(['error', 'error', None, None],
+                         [volume['status'] for volume in result])
+        self.assertEqual([None, None, 'p2', 'p3'],
+                         [volume['provider_id'] for volume in result])
+        self.assertTrue(all(volume['updated_at'] for volume in result))
+        deleted = db.volume_get(self.ctxt.elevated(read_deleted='yes'),
+                                deleted['id'])
+        self.assertEqual('deleted', deleted['status'])
+
+    def test_volume_update_all_filters(self):
+        volume1 = db.volume_create(self.ctxt, {'host': 'h1',
+                                               'status': 'creating'})
+        volume2 = db.volume_create(self.ctxt, {'host': 'h1',
+                                               'status': 'available'})
+        volume3 = db.volume_create(self.ctxt, {'host': 'h2',
+                                               'status': 'creating'})
+
+        updated = db.volume_update_all(
+            self.ctxt, filters={'host': 'h1', 'status': ['creating']},
+            values={'status': 'error'})
+
+        self.assertEqual(1, updated)
+        self.assertEqual(['error', 'available', 'creating'],
+                         [db.volume_get(self.ctxt, volume['id'])['status']
+                          for volume in (volume1, volume2, volume3)])
+
+    def test_volume_update_all_invalid(self):
+        volume = db.volume_create(self.ctxt, {})
+        self.assertRaises(exception.InvalidInput, db.volume_update_all,
+                          self.ctxt, updates=[(volume['id'],
+                                               {'metadata': {'a': 'b'}})])
+        self.assertRaises(exception.InvalidInput, db.volume_update_all,
+                          self.ctxt, values={'status': 'error'})
+        self.assertRaises(exception.InvalidInput, db.volume_update_all,
+                          self.ctxt, filters={'foo': 'bar'},
+                          values={'id': fake.VOLUME2_ID})
+
     def test_volume_metadata_get(self):
         metadata = {'a': 'b', 'c': 'd'}
         db.volume_create(self.ctxt, {'id': 1, 'metadata': metadata})
@@ -1219,6 +1340,30 @@ class DBAPISnapshotTestCase(BaseTest):
         actual = db.snapshot_data_get_for_project(self.ctxt, 'project1')
         self.assertEqual((1, 42), actual)
 
+    def test_snapshot_update_all(self):
+        db.volume_create(self.ctxt, {'id': 1})
+        for snapshot_id in (1, 2, 3):
+            db.snapshot_create(self.ctxt,
+                               {'id': snapshot_id, 'volume_id': 1,
+                                'status': fields.SnapshotStatus.CREATING})
+
+        updated = db.snapshot_update_all(
+            self.ctxt, updates=[(1, {'status': fields.SnapshotStatus.ERROR}),
+                                (2, {'status': fields.SnapshotStatus.ERROR})])
+        self.assertEqual(2, updated)
+        updated = db.snapshot_update_all(
+            self.ctxt, filters={'status': fields.SnapshotStatus.CREATING},
+            values={'progress': '0%'})
+        self.assertEqual(1, updated)
+
+        snapshots = [db.snapshot_get(self.ctxt, snapshot_id)
+                     for snapshot_id in (1, 2, 3)]
+        self.assertEqual([fields.SnapshotStatus.ERROR] * 2 +
+                         [fields.SnapshotStatus.CREATING],
+                         [snapshot.status for snapshot in snapshots])
+        self.assertEqual([None, None, '0%'],
+                         [snapshot.progress for snapshot in snapshots])
+
     def test_snapshot_get_all_by_filter(self):
         db.volume_create(self.ctxt, {'id': 1})
         db.volume_create(self.ctxt, {'id': 2})
@@ -1992,6 +2137,138 @@ class DBAPIQuotaTestCase(BaseTest):
                          self.ctxt, 'p1'))
 
 
+class DBAPIUsageCounterTestCase(BaseTest):
+
+    """Tests for the volume and snapshot usage counters."""
+
+    def _counters(self, project_id=fake.PROJECT_ID, volume_type_id=None):
+        return sqlalchemy_api._usage_counters_get(
+            self.ctxt, project_id, volume_type_id=volume_type_id)
+
+    def _expected(self, **values):
+        return dict(dict.fromkeys(sqlalchemy_api.USAGE_COUNTERS, 0), **values)
+
+    def test_volume_counters(self):
+        volume = db.volume_create(self.ctxt,
+                                  {'project_id': fake.PROJECT_ID,
+                                   'volume_type_id': fake.VOLUME_TYPE_ID,
+                                   'size': 2})
+        db.volume_create(self.ctxt, {'project_id': fake.PROJECT_ID,
+                                     'size': 3})
+        db.volume_create(self.ctxt, {'project_id': fake.PROJECT2_ID,
+                                     'size': 4})
+        self.assertEqual(self._expected(volumes=2, gigabytes=5),
+                         self._counters())
+        self.assertEqual(self._expected(volumes=1, gigabytes=2),
+                         self._counters(volume_type_id=fake.VOLUME_TYPE_ID))
+
+        db.volume_update(self.ctxt, volume.id,
+                         {'size': 5, 'volume_type_id': fake.VOLUME_TYPE2_ID})
+        self.assertEqual(self._expected(),
+                         self._counters(volume_type_id=fake.VOLUME_TYPE_ID))
+        self.assertEqual(self._expected(volumes=1, gigabytes=5),
+                         self._counters(volume_type_id=fake.VOLUME_TYPE2_ID))
+
+        db.volume_destroy(self.ctxt, volume.id)
+        db.volume_destroy(self.ctxt, volume.id)
+        self.assertEqual(self._expected(volumes=1, gigabytes=3),
+                         self._counters())
+        self.assertEqual(self._expected(volumes=1, gigabytes=4),
+                         self._counters(project_id=fake.PROJECT2_ID))
+
+    def test_snapshot_counters(self):
+        volume = db.volume_create(self.ctxt,
+                                  {'project_id': fake.PROJECT_ID,
+                                   'volume_type_id': fake.VOLUME_TYPE_ID,
+                                   'size': 1})
+        snapshot = db.snapshot_create(self.ctxt,
+                                      {'project_id': fake.PROJECT_ID,
+                                       'volume_id': volume.id,
+                                       'volume_size': 1})
+        db.snapshot_create(self.ctxt, {'project_id': fake.PROJECT_ID,
+                                       'volume_id': volume.id,
+                                       'volume_size': 1})
+        self.assertEqual(self._expected(volumes=1, gigabytes=1, snapshots=2,
+                                        snapshot_gigabytes=2),
+                         self._counters(volume_type_id=fake.VOLUME_TYPE_ID))
+
+        # The snapshots follow the type of their volume
+        db.volume_update(self.ctxt, volume.id,
+                         {'volume_type_id': fake.VOLUME_TYPE2_ID})
+        self.assertEqual(self._expected(),
+                         self._counters(volume_type_id=fake.VOLUME_TYPE_ID))
+
+        db.snapshot_destroy(self.ctxt, snapshot.id)
+        self.assertEqual(self._expected(volumes=1, gigabytes=1, snapshots=1,
+                                        snapshot_gigabytes=1),
+                         self._counters(volume_type_id=fake.VOLUME_TYPE2_ID))
+
+    def test_transfer_moves_counters(self):
+        volume = db.volume_create(self.ctxt, {'project_id': fake.PROJECT_ID,
+                                              'status': 'available',
+                                              'size': 2})
+        transfer = db.transfer_create(self.ctxt, {'volume_id': volume.id,
+                                                  'display_name': 'name',
+                                                  'salt': 'salt',
+                                                  'crypt_hash': 'hash'})
+        db.transfer_accept(self.ctxt, transfer.id, fake.USER2_ID,
+                           fake.PROJECT2_ID)
+
+        self.assertEqual(self._expected(), self._counters())
+        self.assertEqual(self._expected(volumes=1, gigabytes=2),
+                         self._counters(project_id=fake.PROJECT2_ID))
+
+    def test_sync_reads_counters(self):
+        db.volume_create(self.ctxt, {'project_id': fake.PROJECT_ID,
+                                     'size': 2})
+        sqlalchemy_api.model_query(self.ctxt, models.UsageCounter).\
+            update({'volumes': 7})
+        session = sqlalchemy_api.get_session()
+
+        self.assertEqual({'volumes': 7}, sqlalchemy_api._sync_volumes(
+            self.ctxt, fake.PROJECT_ID, session))
+        self.override_config('quota_usage_counters', False)
+        self.assertEqual({'volumes': 1}, sqlalchemy_api._sync_volumes(
+            self.ctxt, fake.PROJECT_ID, session))
+
+    def test_usage_counters_reconcile(self):
+        volume = db.volume_create(self.ctxt,
+                                  {'project_id': fake.PROJECT_ID,
+                                   'volume_type_id': fake.VOLUME_TYPE_ID,
+                                   'size': 2})
+        db.snapshot_create(self.ctxt, {'project_id': fake.PROJECT_ID,
+                                       'volume_id': volume.id,
+                                       'volume_size': 2})
+        db.volume_create(self.ctxt, {'project_id': fake.PROJECT2_ID,
+                                     'size': 4})
+        sqlalchemy_api.model_query(self.ctxt, models.UsageCounter).\
+            filter_by(project_id=fake.PROJECT_ID).\
+            update({'volumes': 7, 'snapshot_gigabytes': 0})
+        sqlalchemy_api.model_query(self.ctxt, models.UsageCounter).\
+            filter_by(project_id=fake.PROJECT2_ID).\
+            delete()
+
+        fixed = db.usage_counters_reconcile(self.ctxt,
+                                            project_id=fake.PROJECT_ID)
+
+        expected = self._expected(volumes=1, gigabytes=2, snapshots=1,
+                                  snapshot_gigabytes=2)
+        self.assertEqual([(fake.PROJECT_ID, fake.VOLUME_TYPE_ID,
+                           dict(expected, volumes=7, snapshot_gigabytes=0),
+                           expected)], fixed)
+        self.assertEqual(expected, self._counters())
+        self.assertEqual(self._expected(),
+                         self._counters(project_id=fake.PROJECT2_ID))
+
+        fixed = db.usage_counters_reconcile(self.ctxt)
+
+        expected = self._expected(volumes=1, gigabytes=4)
+        self.assertEqual([(fake.PROJECT2_ID, '', self._expected(),
+                           expected)], fixed)
+        self.assertEqual(expected,
+                         self._counters(project_id=fake.PROJECT2_ID))
+
+
 class DBAPIBackupTestCase(BaseTest):
 
     """Tests for db.api.backup_* methods."""
@@ -2500,3 +2777,71 @@ class DBAPIGenericTestCase(BaseTest):
         # Admin can find it
         res = sqlalchemy_api.resource_exists(self.ctxt, model, snap.id)
         self.assertTrue(res, msg="Admin cannot find the Snapshot")
+
+
+class DBAPIReadReplicaTestCase(BaseTest):
+    """Tests for the DB API calls that can read from the slave database."""
+
+    def setUp(self):
+        super(DBAPIReadReplicaTestCase, self).setUp()
+        # Two SQLite files stand in for the main database and its replica.
+        path = self.useFixture(fixtures.TempDir()).path
+        facade = db_session.EngineFacade(
+            'sqlite:///%s' % os.path.join(path, 'main.sqlite'),
+            slave_connection='sqlite:///%s' % os.path.join(path,
+                                                           'slave.sqlite'))
+        for use_slave in (False, True):
+            models.BASE.metadata.create_all(
+                facade.get_engine(use_slave=use_slave))
+        self.mock_object(sqlalchemy_api, '_FACADE', facade)
+        self.slave_session = facade.get_session(use_slave=True)
+
+    def _create_on_slave(self, model, values):
+        with self.slave_session.begin():
+            self.slave_session.add(model(**values))
+
+    def test_volume_get_all_reads_slave(self):
+        db.volume_create(self.ctxt, {'id': fake.VOLUME_ID,
+                                     'project_id': fake.PROJECT_ID})
+        self._create_on_slave(models.Volume, {'id': fake.VOLUME2_ID,
+                                              'project_id': fake.PROJECT_ID})
+
+        volumes = db.volume_get_all(self.ctxt, None, None, use_slave=True)
+        self.assertEqual([fake.VOLUME2_ID], [v.id for v in volumes])
+        volumes = db.volume_get_all_by_project(self.ctxt, fake.PROJECT_ID,
+                                               None, None, use_slave=True)
+        self.assertEqual([fake.VOLUME2_ID], [v.id for v in volumes])
+        # Other calls still use the main database
+        self.assertEqual(fake.VOLUME_ID,
+                         db.volume_get(self.ctxt, fake.VOLUME_ID).id)
+        self.assertRaises(exception.VolumeNotFound, db.volume_get,
+                          self.ctxt, fake.VOLUME2_ID)
+
+    def test_service_get_all_reads_slave(self):
+        db.service_create(self.ctxt, {'host': 'main'})
+        self._create_on_slave(models.Service, {'host': 'slave'})
+
+        self.assertEqual(
+            ['slave'],
+            [s.host for s in db.service_get_all(self.ctxt, use_slave=True)])
+
+    def test_reads_main_by_default(self):
+        db.volume_create(self.ctxt, {'id': fake.VOLUME_ID,
+                                     'project_id': fake.PROJECT_ID})
+        db.service_create(self.ctxt, {'host': 'main'})
+        self._create_on_slave(models.Volume, {'id': fake.VOLUME2_ID,
+                                              'project_id': fake.PROJECT_ID})
+        self._create_on_slave(models.Service, {'host': 'slave'})
+
+        volumes = db.volume_get_all(self.ctxt, None, None)
+        self.assertEqual([fake.VOLUME_ID], [v.id for v in volumes])
+        self.assertEqual(['main'],
+                         [s.host for s in db.service_get_all(self.ctxt)])
+
+    def test_read_only_flag_reset(self):
+        self.mock_object(sqlalchemy_api, '_service_query',
+                         mock.Mock(side_effect=exception.CinderException))
+
+        self.assertRaises(exception.CinderException, db.service_get_all,
+                          self.ctxt, use_slave=True)
+        self.assertFalse(sqlalchemy_api._READER.active)
@@ -137,3 +137,26 @@ class EvaluatorTestCase(test.TestCase):
         self.assertRaises(exception.EvaluatorParseException,
                           evaluator.evaluate,
                           "7 / 0")
+
+    def test_compiled_expression_reuse(self):
+        evaluator.clear_cache()
+        compiled = evaluator.compile_expression("stats.iops * 2")
+        self.assertIs(compiled,
+                      evaluator.compile_expression("stats.iops * 2"))
+        self.assertEqual(200, compiled.evaluate(stats={'iops': 100}))
+        self.assertEqual(40, compiled.evaluate(stats={'iops': 20}))
+
+    def test_compiled_expression_cache_bounded(self):
+        evaluator.clear_cache()
+        self.mock_object(evaluator, '_MAX_CACHED_EXPRESSIONS', 2)
+        first = evaluator.compile_expression("1 + 1")
+        evaluator.compile_expression("2 + 2")
+        evaluator.compile_expression("3 + 3")
+        self.assertIsNot(first, evaluator.compile_expression("1 + 1"))
+
+    def test_compile_bad_expression_not_cached(self):
+        evaluator.clear_cache()
+        self.assertRaises(exception.EvaluatorParseException,
+                          evaluator.compile_expression,
+                          "1/*1")
+        self.assertNotIn("1/*1", evaluator._cache)
@@ -839,6 +839,54 @@ class MigrationsMixin(test_migrations.WalkVersionsMixin):
         self.assertIsInstance(messages.c.resource_type.type,
                               self.VARCHAR_TYPE)
 
+    def _check_075(self, engine, data):
+        """Test adding the volume pagination indexes."""
+        self.assertTrue(db_utils.index_exists(
+            engine, 'volumes', 'volumes_project_deleted_created_at_id_idx'))
+        self.assertTrue(db_utils.index_exists(engine, 'volumes',
+                                              'volumes_host_deleted_idx'))
+
+    def _pre_upgrade_076(self, engine):
+        """Create volumes and snapshots to count in the usage counters."""
+        project_id = str(uuid.uuid4())
+        volume_ids = [str(uuid.uuid4()) for i in range(4)]
+        volumes = db_utils.get_table(engine, 'volumes')
+        for volume_id, volume_type_id, size, deleted in (
+                (volume_ids[0], 'type1', 2, False),
+                (volume_ids[1], 'type1', 3, False),
+                (volume_ids[2], None, 4, False),
+                (volume_ids[3], 'type1', 5, True)):
+            volumes.insert().values(id=volume_id, project_id=project_id,
+                                    volume_type_id=volume_type_id, size=size,
+                                    deleted=deleted).execute()
+        snapshots = db_utils.get_table(engine, 'snapshots')
+        snapshots.insert().values(id=str(uuid.uuid4()), project_id=project_id,
+                                  volume_id=volume_ids[0], volume_size=2,
+                                  deleted=False).execute()
+        return {'project_id': project_id}
+
+    def _check_076(self, engine, data):
+        """Test adding and filling the usage counters table."""
+        usage_counters = db_utils.get_table(engine, 'usage_counters')
+        self.assertIsInstance(usage_counters.c.project_id.type,
+                              self.VARCHAR_TYPE)
+        self.assertIsInstance(usage_counters.c.volume_type_id.type,
+                              self.VARCHAR_TYPE)
+        self.assertIsInstance(usage_counters.c.volumes.type,
+                              self.INTEGER_TYPE)
+        self.assertIsInstance(usage_counters.c.deleted.type,
+                              self.BOOL_TYPE)
+
+        rows = usage_counters.select().\
+            where(usage_counters.c.project_id == data['project_id']).\
+            execute().fetchall()
+        counters = {row.volume_type_id: (row.volumes, row.gigabytes,
+                                         row.snapshots,
+                                         row.snapshot_gigabytes)
+                    for row in rows}
+        self.assertEqual({'type1': (2, 5, 1, 2), '': (1, 4, 0, 0)},
+                         counters)
+
     def test_walk_versions(self):
         self.walk_versions(False, False)
 
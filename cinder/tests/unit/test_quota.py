@@ -1702,11 +1702,15 @@ class QuotaReserveSqlAlchemyTestCase(test.TestCase):
         self.usages = {}
         self.usages_created = {}
         self.reservations_created = {}
+        self.reservations_create_calls = 0
+        self.locked_resources = None
 
         def fake_get_session():
             return FakeSession()
 
-        def fake_get_quota_usages(context, session, project_id):
+        def fake_get_quota_usages(context, session, project_id,
+                                  resources=None):
+            self.locked_resources = resources
             return self.usages.copy()
 
         def fake_quota_usage_create(context, project_id, resource, in_use,
@@ -1720,16 +1724,17 @@ class QuotaReserveSqlAlchemyTestCase(test.TestCase):
 
             return quota_usage_ref
 
-        def fake_reservation_create(context, uuid, usage_id, project_id,
-                                    resource, delta, expire, session=None,
-                                    allocated_id=None):
-            reservation_ref = self._make_reservation(
-                uuid, usage_id, project_id, resource, delta, expire,
-                timeutils.utcnow(), timeutils.utcnow(), allocated_id)
-
-            self.reservations_created[resource] = reservation_ref
-
-            return reservation_ref
+        def fake_reservations_create(context, reservations, session=None):
+            self.reservations_create_calls += 1
+            for values in reservations:
+                reservation_ref = self._make_reservation(
+                    values['uuid'], values['usage_id'], values['project_id'],
+                    values['resource'], values['delta'], values['expire'],
+                    timeutils.utcnow(), timeutils.utcnow(),
+                    values['allocated_id'])
+                self.reservations_created[values['resource']] = (
+                    reservation_ref)
+            return [values['uuid'] for values in reservations]
 
         def fake_qagabp(context, project_id):
             self.assertEqual('test_project', project_id)
@@ -1740,7 +1745,8 @@ class QuotaReserveSqlAlchemyTestCase(test.TestCase):
         self.stubs.Set(sqa_api, 'get_session', fake_get_session)
         self.stubs.Set(sqa_api, '_get_quota_usages', fake_get_quota_usages)
         self.stubs.Set(sqa_api, '_quota_usage_create', fake_quota_usage_create)
-        self.stubs.Set(sqa_api, '_reservation_create', fake_reservation_create)
+        self.stubs.Set(sqa_api, '_reservations_create',
+                       fake_reservations_create)
 
         patcher = mock.patch.object(timeutils, 'utcnow')
         self.addCleanup(patcher.stop)
@@ -1848,11 +1854,11 @@ class QuotaReserveSqlAlchemyTestCase(test.TestCase):
         self.compare_reservation(
             result,
             [dict(resource='volumes',
-                  usage_id=self.usages_created['volumes'],
+                  usage_id=self.usages_created['volumes'].id,
                   project_id='test_project',
                   delta=7),
              dict(resource='gigabytes',
-                  usage_id=self.usages_created['gigabytes'],
+                  usage_id=self.usages_created['gigabytes'].id,
                   delta=2 * 1024), ])
         # But if we try reserve 8 volumes(more free quota that we have)
         deltas = dict(volumes=8,
@@ -1888,11 +1894,11 @@ class QuotaReserveSqlAlchemyTestCase(test.TestCase):
         self.compare_reservation(
             result,
             [dict(resource='volumes',
-                  usage_id=self.usages_created['volumes'],
+                  usage_id=self.usages_created['volumes'].id,
                   project_id='test_project',
                   delta=2),
              dict(resource='gigabytes',
-                  usage_id=self.usages_created['gigabytes'],
+                  usage_id=self.usages_created['gigabytes'].id,
                   delta=2 * 1024), ])
 
     def test_quota_reserve_negative_in_use(self):
@@ -1921,11 +1927,11 @@ class QuotaReserveSqlAlchemyTestCase(test.TestCase):
         self.assertEqual({}, self.usages_created)
         self.compare_reservation(result,
                                  [dict(resource='volumes',
-                                       usage_id=self.usages['volumes'],
+                                       usage_id=self.usages['volumes'].id,
                                        project_id='test_project',
                                        delta=2),
                                   dict(resource='gigabytes',
-                                       usage_id=self.usages['gigabytes'],
+                                       usage_id=self.usages['gigabytes'].id,
                                        delta=2 * 1024), ])
 
     def test_quota_reserve_until_refresh(self):
@@ -1952,11 +1958,11 @@ class QuotaReserveSqlAlchemyTestCase(test.TestCase):
         self.assertEqual({}, self.usages_created)
         self.compare_reservation(result,
                                  [dict(resource='volumes',
-                                       usage_id=self.usages['volumes'],
+                                       usage_id=self.usages['volumes'].id,
                                        project_id='test_project',
                                        delta=2),
                                   dict(resource='gigabytes',
-                                       usage_id=self.usages['gigabytes'],
+                                       usage_id=self.usages['gigabytes'].id,
                                        delta=2 * 1024), ])
 
     def test_quota_reserve_max_age(self):
@@ -1988,13 +1994,46 @@ class QuotaReserveSqlAlchemyTestCase(test.TestCase):
         self.assertEqual({}, self.usages_created)
         self.compare_reservation(result,
                                  [dict(resource='volumes',
-                                       usage_id=self.usages['volumes'],
+                                       usage_id=self.usages['volumes'].id,
                                        project_id='test_project',
                                        delta=2),
                                   dict(resource='gigabytes',
-                                       usage_id=self.usages['gigabytes'],
+                                       usage_id=self.usages['gigabytes'].id,
                                        delta=2 * 1024), ])
 
+    def test_quota_reserve_max_age_not_due(self):
+        max_age = 3600
+        record_created = (timeutils.utcnow() -
+                          datetime.timedelta(seconds=10))
+        self.init_usage('test_project', 'volumes', 3, 0,
+                        created_at=record_created, updated_at=record_created)
+        context = FakeContext('test_project', 'test_class')
+        quotas = dict(volumes=5)
+        deltas = dict(volumes=2)
+        self._stub_allocated_get_all_by_project()
+        sqa_api.quota_reserve(context, self.resources, quotas, deltas,
+                              self.expire, 0, max_age)
+
+        self.assertEqual(set(), self.sync_called)
+        self.compare_usage(self.usages, [dict(resource='volumes',
+                                              in_use=3,
+                                              reserved=2), ])
+
+    def test_quota_reserve_locks_delta_resources(self):
+        self.init_usage('test_project', 'volumes', 3, 0)
+        self.init_usage('test_project', 'gigabytes', 3, 0)
+        context = FakeContext('test_project', 'test_class')
+        quotas = dict(volumes=5, gigabytes=10 * 1024, )
+        deltas = dict(volumes=2, gigabytes=2 * 1024, )
+        self._stub_allocated_get_all_by_project()
+        result = sqa_api.quota_reserve(context, self.resources, quotas,
+                                       deltas, self.expire, 0, 0)
+
+        self.assertEqual(sorted(deltas), sorted(self.locked_resources))
+        # All the reservations are inserted at once
+        self.assertEqual(1, self.reservations_create_calls)
+        self.assertEqual(2, len(result))
+
     def test_quota_reserve_no_refresh(self):
         self.init_usage('test_project', 'volumes', 3, 0)
         self.init_usage('test_project', 'gigabytes', 3, 0)
@@ -2019,11 +2058,11 @@ class QuotaReserveSqlAlchemyTestCase(test.TestCase):
         self.assertEqual({}, self.usages_created)
         self.compare_reservation(result,
                                  [dict(resource='volumes',
-                                       usage_id=self.usages['volumes'],
+                                       usage_id=self.usages['volumes'].id,
                                        project_id='test_project',
                                        delta=2),
                                   dict(resource='gigabytes',
-                                       usage_id=self.usages['gigabytes'],
+                                       usage_id=self.usages['gigabytes'].id,
                                        delta=2 * 1024), ])
 
     def test_quota_reserve_unders(self):
@@ -2050,11 +2089,11 @@ class QuotaReserveSqlAlchemyTestCase(test.TestCase):
         self.assertEqual({}, self.usages_created)
         self.compare_reservation(result,
                                  [dict(resource='volumes',
-                                       usage_id=self.usages['volumes'],
+                                       usage_id=self.usages['volumes'].id,
                                        project_id='test_project',
                                        delta=-2),
                                   dict(resource='gigabytes',
-                                       usage_id=self.usages['gigabytes'],
+                                       usage_id=self.usages['gigabytes'].id,
                                        delta=-2 * 1024), ])
 
     def test_quota_reserve_overs(self):
@@ -2107,11 +2146,11 @@ class QuotaReserveSqlAlchemyTestCase(test.TestCase):
         self.assertEqual({}, self.usages_created)
         self.compare_reservation(result,
                                  [dict(resource='volumes',
-                                       usage_id=self.usages['volumes'],
+                                       usage_id=self.usages['volumes'].id,
                                        project_id='test_project',
                                        delta=-2),
                                   dict(resource='gigabytes',
-                                       usage_id=self.usages['gigabytes'],
+                                       usage_id=self.usages['gigabytes'].id,
                                        project_id='test_project',
                                        delta=-2 * 1024), ])
 
@@ -32,6 +32,7 @@ from cinder import objects
 from cinder import rpc
 from cinder import service
 from cinder import test
+from cinder.volume import volume_types
 
 
 test_service_opts = [
@@ -246,6 +247,47 @@ class ServiceTestCase(test.TestCase):
         serv.rpcserver.stop.assert_called_once_with()
         serv.rpcserver.wait.assert_called_once_with()
 
+    @mock.patch.object(rpc, 'get_notification_listener')
+    @mock.patch.object(rpc, 'get_server')
+    @mock.patch('cinder.db')
+    def test_service_volume_type_cache_listener(self, mock_db, mock_rpc,
+                                                mock_listener):
+        self.override_config('volume_type_cache_notifications', True)
+        serv = service.Service(
+            self.host,
+            self.binary,
+            self.topic,
+            'cinder.tests.unit.test_service.FakeManager'
+        )
+        serv.start()
+        serv.stop()
+        serv.wait()
+
+        targets, endpoints = mock_listener.call_args[0]
+        self.assertEqual(['notifications'], [t.topic for t in targets])
+        self.assertIsInstance(endpoints[0],
+                              volume_types.CacheInvalidationEndpoint)
+        self.assertEqual(
+            'volume-type-cache.%s.%s.0' % (self.binary, self.host),
+            mock_listener.call_args[1]['pool'])
+        serv.cache_listener.start.assert_called_once_with()
+        serv.cache_listener.stop.assert_called_once_with()
+        serv.cache_listener.wait.assert_called_once_with()
+
+    @mock.patch.dict(service._worker_slots, clear=True)
+    @mock.patch('oslo_concurrency.lockutils.external_lock')
+    def test_get_worker_slot(self, mock_lock):
+        # Worker 0 is held by another process of the service
+        mock_lock.return_value.acquire.side_effect = [False, True]
+
+        self.assertEqual(1, service._get_worker_slot('fake-service'))
+        self.assertEqual(1, service._get_worker_slot('fake-service'))
+        mock_lock.assert_has_calls([
+            mock.call('fake-service-worker-0', lock_file_prefix='cinder-'),
+            mock.call('fake-service-worker-1', lock_file_prefix='cinder-')],
+            any_order=True)
+        self.assertEqual(2, mock_lock.call_count)
+
     @mock.patch('cinder.service.Service.report_state')
     @mock.patch('cinder.service.Service.periodic_tasks')
     @mock.patch.object(service.loopingcall, 'FixedIntervalLoopingCall')
@@ -341,6 +341,45 @@ class VolumeTestCase(BaseVolumeTestCase):
         self.assertEqual("error", volume.status)
         self.volume.delete_volume(self.context, volume_id, volume=volume)
 
+    def test_init_host_sets_stuck_volumes_and_snapshots_to_error(self):
+        """init_host writes the volumes and snapshots set to error in bulk."""
+        volumes = [tests_utils.create_volume(self.context, status='creating',
+                                             size=0, host=CONF.host)
+                   for i in range(2)]
+        snapshot = tests_utils.create_snapshot(
+            self.context, volumes[0].id,
+            status=fields.SnapshotStatus.CREATING)
+        mock_update_all = self.mock_object(
+            db, 'volume_update_all',
+            mock.Mock(side_effect=db.volume_update_all))
+        mock_save = self.mock_object(objects.Volume, 'save')
+
+        self.volume.init_host()
+
+        mock_update_all.assert_called_once_with(
+            mock.ANY, updates=[(volumes[0].id, {'status': 'error'}),
+                               (volumes[1].id, {'status': 'error'})])
+        self.assertFalse(mock_save.called)
+        for volume in volumes:
+            volume.refresh()
+            self.assertEqual('error', volume.status)
+        snapshot.refresh()
+        self.assertEqual(fields.SnapshotStatus.ERROR, snapshot.status)
+
+    def test_init_host_saves_stuck_volumes_when_a_later_one_fails(self):
+        """A failing volume doesn't lose the errors set on previous ones."""
+        stuck = tests_utils.create_volume(self.context, status='creating',
+                                          size=0, host=CONF.host)
+        tests_utils.create_volume(self.context, status='downloading',
+                                  size=0, host=CONF.host)
+        self.mock_object(self.volume.driver, 'clear_download',
+                         mock.Mock(side_effect=exception.CinderException))
+
+        self.volume.init_host()
+
+        stuck.refresh()
+        self.assertEqual('error', stuck.status)
+
     def test_init_host_clears_uploads_available_volume(self):
         """init_host will clean an available volume stuck in uploading."""
         volume = tests_utils.create_volume(self.context, status='uploading',
@@ -495,6 +534,52 @@ class VolumeTestCase(BaseVolumeTestCase):
                          scheduler_rpcapi.client.serializer._base.version_cap)
         self.assertIsNone(scheduler_rpcapi.client.serializer._base.manifest)
 
+    def test_publish_service_capabilities_delta(self):
+        self.override_config('full_capabilities_report_interval', 1)
+        manager = vol_manager.VolumeManager()
+        mock_update = self.mock_object(manager.scheduler_rpcapi,
+                                       'update_service_capabilities')
+        stats = {'volume_backend_name': 'lvm', 'driver_version': '1.0',
+                 'pools': [{'pool_name': 'pool1', 'free_capacity_gb': 100},
+                           {'pool_name': 'pool2', 'free_capacity_gb': 200}]}
+        manager.update_service_capabilities(stats)
+
+        manager._publish_service_capabilities(self.context)
+        # Drivers may update the stats they reported in place.
+        stats['driver_version'] = '1.1'
+        stats['pools'][1]['free_capacity_gb'] = 150
+        stats['pools'].pop(0)
+        manager._publish_service_capabilities(self.context)
+        manager._publish_service_capabilities(self.context)
+
+        expected_delta = {'updated': {'driver_version': '1.1'},
+                          'removed': [],
+                          'pools': {'pool2': {
+                              'updated': {'free_capacity_gb': 150},
+                              'removed': []}},
+                          'removed_pools': ['pool1']}
+        self.assertEqual(
+            [mock.call(self.context, 'volume', manager.host, stats,
+                       sequence=1, delta=None),
+             mock.call(self.context, 'volume', manager.host, stats,
+                       sequence=2, delta=expected_delta),
+             mock.call(self.context, 'volume', manager.host, stats,
+                       sequence=3, delta=None)],
+            mock_update.call_args_list)
+
+    def test_publish_service_capabilities_full(self):
+        manager = vol_manager.VolumeManager()
+        mock_update = self.mock_object(manager.scheduler_rpcapi,
+                                       'update_service_capabilities')
+        manager.update_service_capabilities({'driver_version': '1.0'})
+        manager._publish_service_capabilities(self.context)
+
+        with mock.patch.object(manager, '_report_driver_status'):
+            manager.publish_service_capabilities(self.context)
+
+        self.assertEqual(2, mock_update.call_count)
+        self.assertIsNone(mock_update.call_args[1]['delta'])
+
     @mock.patch.object(vol_manager.VolumeManager,
                        'update_service_capabilities')
     def test_report_filter_goodness_function(self, mock_update):
@@ -5352,6 +5437,42 @@ class ReplicationTestCase(BaseVolumeTestCase):
                           self.context,
                           host=CONF.host)
 
+    @mock.patch.object(objects.Service, 'get_by_args')
+    def test_failover_host_manager_updates_volumes(self, mock_get_service):
+        """The manager writes the failover volume updates in bulk."""
+        service = fake_service.fake_service_obj(self.context,
+                                                binary='cinder-volume')
+        service.frozen = False
+        mock_get_service.return_value = service
+        self.mock_object(service, 'save')
+        vol0 = tests_utils.create_volume(self.context, host=CONF.host)
+        vol1 = tests_utils.create_volume(self.context, host=CONF.host)
+        updates = [{'volume_id': vol0.id,
+                    'updates': {'replication_status': 'failed-over',
+                                'provider_id': 'p0'}},
+                   {'volume_id': vol1.id,
+                    'updates': {'replication_status': 'failed-over',
+                                'provider_id': 'p1'}}]
+        self.mock_object(self.volume.driver, 'failover_host',
+                         mock.Mock(return_value=('secondary', updates)))
+        mock_update_all = self.mock_object(
+            db, 'volume_update_all',
+            mock.Mock(side_effect=db.volume_update_all))
+        mock_save = self.mock_object(objects.Volume, 'save')
+
+        self.volume.failover_host(self.context, 'secondary')
+
+        mock_update_all.assert_called_once_with(
+            self.context, updates=[(u['volume_id'], u['updates'])
+                                   for u in updates])
+        self.assertFalse(mock_save.called)
+        for volume, provider_id in ((vol0, 'p0'), (vol1, 'p1')):
+            volume.refresh()
+            self.assertEqual('failed-over', volume.replication_status)
+            self.assertEqual(provider_id, volume.provider_id)
+        self.assertEqual(fields.ReplicationStatus.FAILED_OVER,
+                         service.replication_status)
+
     @mock.patch.object(volume_rpcapi.VolumeAPI, 'freeze_host')
     @mock.patch.object(cinder.db, 'conditional_update')
     @mock.patch.object(cinder.db, 'service_get')
@@ -511,3 +511,88 @@ class VolumeTypeTestCase(test.TestCase):
         volume_types.create(self.ctxt, "type-test", is_public=False)
         vtype = volume_types.get_volume_type_by_name(self.ctxt, 'type-test')
         self.assertIsNotNone(vtype.get('extra_specs', None))
+
+    def test_get_volume_type_cached(self):
+        type_ref = volume_types.create(self.ctxt, "type-test",
+                                       {"key1": "val1"})
+        with mock.patch.object(db, 'volume_type_get',
+                               wraps=db.volume_type_get) as type_get:
+            vtype = volume_types.get_volume_type(self.ctxt, type_ref['id'])
+            vtype['extra_specs']['key1'] = 'modified'
+            specs = volume_types.get_volume_type_extra_specs(type_ref['id'])
+            self.assertEqual(1, type_get.call_count)
+            self.assertEqual({'key1': 'val1'}, specs)
+
+            volume_types.update(self.ctxt, type_ref['id'], 'type-renamed',
+                                None)
+            vtype = volume_types.get_volume_type(self.ctxt, type_ref['id'])
+            self.assertEqual('type-renamed', vtype['name'])
+
+    def test_get_volume_type_cache_expires(self):
+        self.override_config('volume_type_cache_ttl', 10)
+        type_ref = volume_types.create(self.ctxt, "type-test")
+        now = datetime.datetime.utcnow()
+        with mock.patch('oslo_utils.timeutils.utcnow', return_value=now):
+            volume_types.get_volume_type(self.ctxt, type_ref['id'])
+        db.volume_type_update(self.ctxt, type_ref['id'],
+                              {'description': 'changed', 'name': None,
+                               'is_public': None})
+
+        now += datetime.timedelta(seconds=5)
+        with mock.patch('oslo_utils.timeutils.utcnow', return_value=now):
+            vtype = volume_types.get_volume_type(self.ctxt, type_ref['id'])
+        self.assertIsNone(vtype['description'])
+
+        now += datetime.timedelta(seconds=6)
+        with mock.patch('oslo_utils.timeutils.utcnow', return_value=now):
+            vtype = volume_types.get_volume_type(self.ctxt, type_ref['id'])
+        self.assertEqual('changed', vtype['description'])
+
+    def test_get_volume_type_not_cached(self):
+        ctxt = context.RequestContext(fake.USER_ID, fake.PROJECT_ID,
+                                      is_admin=False)
+        type_ref = volume_types.create(self.ctxt, "type-test")
+        with mock.patch.object(db, 'volume_type_get',
+                               wraps=db.volume_type_get) as type_get:
+            volume_types.get_volume_type(ctxt, type_ref['id'])
+            volume_types.get_volume_type(ctxt, type_ref['id'])
+            self.assertEqual(2, type_get.call_count)
+
+            self.override_config('volume_type_cache_ttl', 0)
+            volume_types.get_volume_type(self.ctxt, type_ref['id'])
+            volume_types.get_volume_type(self.ctxt, type_ref['id'])
+            self.assertEqual(4, type_get.call_count)
+
+    def test_qos_specs_update_clears_cache(self):
+        qos_ref = qos_specs.create(self.ctxt, 'qos-specs-1', {'k1': 'v1'})
+        type_ref = volume_types.create(self.ctxt, "type1")
+        qos_specs.associate_qos_with_type(self.ctxt, qos_ref['id'],
+                                          type_ref['id'])
+        res = volume_types.get_volume_type_qos_specs(type_ref['id'])
+        self.assertEqual({'k1': 'v1'}, res['qos_specs']['specs'])
+
+        qos_specs.update(self.ctxt, qos_ref['id'], {'k1': 'v2'})
+        res = volume_types.get_volume_type_qos_specs(type_ref['id'])
+        self.assertEqual({'k1': 'v2'}, res['qos_specs']['specs'])
+
+        qos_specs.disassociate_qos_specs(self.ctxt, qos_ref['id'],
+                                         type_ref['id'])
+        res = volume_types.get_volume_type_qos_specs(type_ref['id'])
+        self.assertIsNone(res['qos_specs'])
+
+    @mock.patch('cinder.volume.volume_types.clear_cache')
+    def test_cache_invalidation_endpoint(self, clear_cache):
+        endpoint = volume_types.CacheInvalidationEndpoint()
+        endpoint.info(self.ctxt, 'volumeType', 'volume_type.update',
+                      {'volume_types': {'id': fake.VOLUME_TYPE_ID}}, {})
+        endpoint.info(self.ctxt, 'volumeTypeExtraSpecs',
+                      'volume_type_extra_specs.delete',
+                      {'type_id': fake.VOLUME_TYPE2_ID, 'id': 'key1'}, {})
+        endpoint.info(self.ctxt, 'QoSSpecs', 'qos_specs.update',
+                      {'id': fake.QOS_SPEC_ID}, {})
+        endpoint.info(self.ctxt, 'volume', 'volume.create.end', {}, {})
+
+        self.assertEqual([mock.call(fake.VOLUME_TYPE_ID),
+                          mock.call(fake.VOLUME_TYPE2_ID),
+                          mock.call()],
+                         clear_cache.call_args_list)
@@ -476,7 +476,7 @@ class API(base.Base):
 
     def get_all(self, context, marker=None, limit=None, sort_keys=None,
                 sort_dirs=None, filters=None, viewable_admin_meta=False,
-                offset=None):
+                offset=None, load_profile=None, use_slave=False):
         check_policy(context, 'get_all')
 
         if filters is None:
@@ -511,14 +511,16 @@ class API(base.Base):
                                                  sort_keys=sort_keys,
                                                  sort_dirs=sort_dirs,
                                                  filters=filters,
-                                                 offset=offset)
+                                                 offset=offset,
+                                                 load_profile=load_profile,
+                                                 use_slave=use_slave)
         else:
             if viewable_admin_meta:
                 context = context.elevated()
             volumes = objects.VolumeList.get_all_by_project(
                 context, context.project_id, marker, limit,
                 sort_keys=sort_keys, sort_dirs=sort_dirs, filters=filters,
-                offset=offset)
+                offset=offset, load_profile=load_profile, use_slave=use_slave)
 
         LOG.info(_LI("Get all volumes completed successfully."))
         return volumes
@@ -542,7 +544,7 @@ class API(base.Base):
 
     def get_all_snapshots(self, context, search_opts=None, marker=None,
                           limit=None, sort_keys=None, sort_dirs=None,
-                          offset=None):
+                          offset=None, use_slave=False):
         check_policy(context, 'get_all_snapshots')
 
         search_opts = search_opts or {}
@@ -552,11 +554,11 @@ class API(base.Base):
             del search_opts['all_tenants']
             snapshots = objects.SnapshotList.get_all(
                 context, search_opts, marker, limit, sort_keys, sort_dirs,
-                offset)
+                offset, use_slave=use_slave)
         else:
             snapshots = objects.SnapshotList.get_all_by_project(
                 context, context.project_id, search_opts, marker, limit,
-                sort_keys, sort_dirs, offset)
+                sort_keys, sort_dirs, offset, use_slave=use_slave)
 
         LOG.info(_LI("Get all snapshots completed successfully."))
         return snapshots
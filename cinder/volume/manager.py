@@ -326,16 +326,16 @@ class VolumeManager(manager.SchedulerDependentManager):
             volumes, snapshots)
 
         if updates:
+            volume_updates = []
             for volume in volumes:
                 # NOTE(JDG): Make sure returned item is in this hosts volumes
                 update = (
                     [updt for updt in updates if updt['id'] ==
                         volume['id']][0])
                 if update:
-                    self.db.volume_update(
-                        ctxt,
-                        update['id'],
-                        {'provider_id': update['provider_id']})
+                    volume_updates.append(
+                        (update['id'], {'provider_id': update['provider_id']}))
+            self.db.volume_update_all(ctxt, updates=volume_updates)
 
         # NOTE(jdg): snapshots are slighty harder, because
         # we do not have a host column and of course no get
@@ -343,6 +343,7 @@ class VolumeManager(manager.SchedulerDependentManager):
         # response off of it
         if snapshot_updates:
             cinder_snaps = self.db.snapshot_get_all(ctxt)
+            provider_updates = []
             for snap in cinder_snaps:
                 # NOTE(jdg): For now we only update those that have no entry
                 if not snap.get('provider_id', None):
@@ -350,10 +351,10 @@ class VolumeManager(manager.SchedulerDependentManager):
                         [updt for updt in snapshot_updates if updt['id'] ==
                             snap['id']][0])
                     if update:
-                        self.db.snapshot_update(
-                            ctxt,
-                            update['id'],
-                            {'provider_id': update['provider_id']})
+                        provider_updates.append(
+                            (update['id'],
+                             {'provider_id': update['provider_id']}))
+            self.db.snapshot_update_all(ctxt, updates=provider_updates)
 
     def init_host(self):
         """Perform any required initialization."""
@@ -384,45 +385,48 @@ class VolumeManager(manager.SchedulerDependentManager):
         try:
             self.stats['pools'] = {}
             self.stats.update({'allocated_capacity_gb': 0})
-            for volume in volumes:
-                # available volume should also be counted into allocated
-                if volume['status'] in ['in-use', 'available']:
-                    # calculate allocated capacity for driver
-                    self._count_allocated_capacity(ctxt, volume)
-
-                    try:
-                        if volume['status'] in ['in-use']:
-                            self.driver.ensure_export(ctxt, volume)
-                    except Exception:
-                        LOG.exception(_LE("Failed to re-export volume, "
-                                          "setting to ERROR."),
-                                      resource=volume)
+            try:
+                for volume in volumes:
+                    # available volume should also be counted into allocated
+                    if volume['status'] in ['in-use', 'available']:
+                        # calculate allocated capacity for driver
+                        self._count_allocated_capacity(ctxt, volume)
+
+                        try:
+                            if volume['status'] in ['in-use']:
+                                self.driver.ensure_export(ctxt, volume)
+                        except Exception:
+                            LOG.exception(_LE("Failed to re-export volume, "
+                                              "setting to ERROR."),
+                                          resource=volume)
+                            volume.status = 'error'
+                    elif volume['status'] in ('downloading', 'creating'):
+                        LOG.warning(_LW("Detected volume stuck "
+                                        "in %(curr_status)s "
+                                        "status, setting to ERROR."),
+                                    {'curr_status': volume['status']},
+                                    resource=volume)
+
+                        if volume['status'] == 'downloading':
+                            self.driver.clear_download(ctxt, volume)
                         volume.status = 'error'
-                        volume.save()
-                elif volume['status'] in ('downloading', 'creating'):
-                    LOG.warning(_LW("Detected volume stuck "
-                                    "in %(curr_status)s "
-                                    "status, setting to ERROR."),
-                                {'curr_status': volume['status']},
-                                resource=volume)
-
-                    if volume['status'] == 'downloading':
-                        self.driver.clear_download(ctxt, volume)
-                    volume.status = 'error'
-                    volume.save()
-                elif volume.status == 'uploading':
+                    elif volume.status == 'uploading':
                         # Set volume status to available or in-use.
                         self.db.volume_update_status_based_on_attachment(
                             ctxt, volume.id)
-                else:
-                    pass
+                    else:
+                        pass
+            finally:
+                # Write the volumes set to error with a few bulk updates,
+                # even when a later volume failed.
+                objects.VolumeList.save_all(ctxt, volumes)
             snapshots = objects.SnapshotList.get_by_host(
                 ctxt, self.host, {'status': fields.SnapshotStatus.CREATING})
             for snapshot in snapshots:
                 LOG.warning(_LW("Detected snapshot stuck in creating "
                             "status, setting to ERROR."), resource=snapshot)
                 snapshot.status = fields.SnapshotStatus.ERROR
-                snapshot.save()
+            objects.SnapshotList.save_all(ctxt, snapshots)
         except Exception:
             LOG.exception(_LE("Error during re-export on driver init."),
                           resource=volume)
@@ -1940,7 +1944,7 @@ class VolumeManager(manager.SchedulerDependentManager):
     def publish_service_capabilities(self, context):
         """Collect driver status and then publish."""
         self._report_driver_status(context)
-        self._publish_service_capabilities(context)
+        self._publish_service_capabilities(context, full=True)
 
     def _notify_about_volume_usage(self,
                                    context,
@@ -3288,6 +3292,7 @@ class VolumeManager(manager.SchedulerDependentManager):
             service.disabled_reason = "failed-over"
             service.save()
 
+        volume_updates = []
         for update in volume_update_list:
             # Response must include an id key: {volume_id: <cinder-uuid>}
             if not update.get('volume_id'):
@@ -3298,9 +3303,9 @@ class VolumeManager(manager.SchedulerDependentManager):
             #  provider_auth
             #  provider_id
             #  replication_status
-            vobj = objects.Volume.get_by_id(context, update['volume_id'])
-            vobj.update(update.get('updates', {}))
-            vobj.save()
+            volume_updates.append((update['volume_id'],
+                                   update.get('updates', {})))
+        self.db.volume_update_all(context, updates=volume_updates)
 
         LOG.info(_LI("Failed over to replication target successfully."))
 
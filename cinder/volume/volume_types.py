@@ -20,9 +20,15 @@
 """Built-in volume type properties."""
 
 
+import collections
+import copy
+import datetime
+import threading
+
 from oslo_config import cfg
 from oslo_db import exception as db_exc
 from oslo_log import log as logging
+from oslo_utils import timeutils
 
 from cinder import context
 from cinder import db
@@ -34,6 +40,79 @@ CONF = cfg.CONF
 LOG = logging.getLogger(__name__)
 QUOTAS = quota.QUOTAS
 
+# Volume types and QoS specs read with an admin context, shared by all the
+# requests of the process. Entries are keyed by (kind, volume type id,
+# fields) and hold (expires_at, value).
+_MAX_CACHED_ENTRIES = 1024
+_cache = collections.OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _get_cached(key):
+    """Return (found, value) for a key from the shared cache."""
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached is None:
+            return False, None
+        expires_at, value = cached
+        if timeutils.utcnow() >= expires_at:
+            del _cache[key]
+            return False, None
+        # Most recently used entries are kept last.
+        del _cache[key]
+        _cache[key] = cached
+    # Callers are free to modify what they get back.
+    return True, copy.deepcopy(value)
+
+
+def _cache_value(key, value):
+    ttl = CONF.volume_type_cache_ttl
+    if ttl <= 0:
+        return
+    expires_at = timeutils.utcnow() + datetime.timedelta(seconds=ttl)
+    value = copy.deepcopy(value)
+    with _cache_lock:
+        _cache.pop(key, None)
+        _cache[key] = (expires_at, value)
+        while len(_cache) > _MAX_CACHED_ENTRIES:
+            _cache.popitem(last=False)
+
+
+def clear_cache(volume_type_id=None):
+    """Forget the cached volume types and QoS specs.
+
+    Only the entries of the given volume type are forgotten when
+    volume_type_id is given.
+    """
+    with _cache_lock:
+        if volume_type_id is None:
+            _cache.clear()
+            return
+        for key in [key for key in _cache if key[1] == volume_type_id]:
+            del _cache[key]
+
+
+class CacheInvalidationEndpoint(object):
+    """Notification endpoint forgetting the volume types changed elsewhere.
+
+    The volume type and extra specs notifications name the changed volume
+    type. QoS specs may be associated with several volume types, so their
+    notifications clear the whole cache.
+    """
+
+    def info(self, ctxt, publisher_id, event_type, payload, metadata):
+        if event_type.startswith('qos_specs.'):
+            clear_cache()
+        elif event_type.startswith('volume_type_extra_specs.'):
+            clear_cache(payload.get('type_id'))
+        elif event_type.startswith('volume_type.'):
+            volume_type = payload.get('volume_types') or {}
+            type_id = volume_type.get('id')
+            if type_id:
+                clear_cache(type_id)
+            else:
+                clear_cache()
+
 
 def create(context,
            name,
@@ -82,6 +161,8 @@ def update(context, id, name, description, is_public=None):
     except db_exc.DBError:
         LOG.exception(_LE('DB error:'))
         raise exception.VolumeTypeUpdateFailed(id=id)
+    finally:
+        clear_cache(id)
     return type_updated
 
 
@@ -93,6 +174,7 @@ def destroy(context, id):
     else:
         elevated = context if context.is_admin else context.elevated()
         db.volume_type_destroy(elevated, id)
+        clear_cache(id)
 
 
 def get_all_types(context, inactive=0, filters=None, marker=None,
@@ -112,7 +194,12 @@ def get_all_types(context, inactive=0, filters=None, marker=None,
 
 
 def get_volume_type(ctxt, id, expected_fields=None):
-    """Retrieves single volume type by id."""
+    """Retrieves single volume type by id.
+
+    Volume types read with an admin context are cached for
+    volume_type_cache_ttl seconds. Other contexts only see the volume types
+    they have access to, so they always read them from the database.
+    """
     if id is None:
         msg = _("id cannot be None")
         raise exception.InvalidVolumeType(reason=msg)
@@ -120,7 +207,16 @@ def get_volume_type(ctxt, id, expected_fields=None):
     if ctxt is None:
         ctxt = context.get_admin_context()
 
-    return db.volume_type_get(ctxt, id, expected_fields=expected_fields)
+    if not ctxt.is_admin:
+        return db.volume_type_get(ctxt, id, expected_fields=expected_fields)
+
+    key = ('type', id, frozenset(expected_fields or ()))
+    found, volume_type = _get_cached(key)
+    if not found:
+        volume_type = db.volume_type_get(ctxt, id,
+                                         expected_fields=expected_fields)
+        _cache_value(key, volume_type)
+    return volume_type
 
 
 def get_volume_type_by_name(context, name):
@@ -180,7 +276,9 @@ def add_volume_type_access(context, volume_type_id, project_id):
         msg = _("Type access modification is not applicable to public volume "
                 "type.")
         raise exception.InvalidVolumeType(reason=msg)
-    return db.volume_type_access_add(elevated, volume_type_id, project_id)
+    access = db.volume_type_access_add(elevated, volume_type_id, project_id)
+    clear_cache(volume_type_id)
+    return access
 
 
 def remove_volume_type_access(context, volume_type_id, project_id):
@@ -193,7 +291,9 @@ def remove_volume_type_access(context, volume_type_id, project_id):
         msg = _("Type access modification is not applicable to public volume "
                 "type.")
         raise exception.InvalidVolumeType(reason=msg)
-    return db.volume_type_access_remove(elevated, volume_type_id, project_id)
+    access = db.volume_type_access_remove(elevated, volume_type_id, project_id)
+    clear_cache(volume_type_id)
+    return access
 
 
 def is_encrypted(context, volume_type_id):
@@ -210,9 +310,13 @@ def get_volume_type_encryption(context, volume_type_id):
 
 def get_volume_type_qos_specs(volume_type_id):
     """Get all qos specs for given volume type."""
-    ctxt = context.get_admin_context()
-    res = db.volume_type_qos_specs_get(ctxt,
-                                       volume_type_id)
+    key = ('qos_specs', volume_type_id, None)
+    found, res = _get_cached(key)
+    if not found:
+        ctxt = context.get_admin_context()
+        res = db.volume_type_qos_specs_get(ctxt,
+                                           volume_type_id)
+        _cache_value(key, res)
     return res
 
 
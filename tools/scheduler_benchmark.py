@@ -0,0 +1,261 @@
+#! /usr/bin/env python
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Benchmark the filter scheduler against a synthetic fleet of back-ends.
+
+The HostManager is fed with capability reports of fake volume services and
+schedule_create_volume is called in a loop, with the database and the
+volume RPC API stubbed out. Latency percentiles and throughput are reported
+for whole requests and for each filter and weigher.
+
+Example::
+
+    python tools/scheduler_benchmark.py --backends 100 --pools 4 \\
+        --requests 2000 --capabilities full \\
+        --filters AvailabilityZoneFilter,CapacityFilter,CapabilitiesFilter
+"""
+
+from __future__ import print_function
+
+import argparse
+import collections
+import logging
+import sys
+import timeit
+import uuid
+
+import mock
+from oslo_config import cfg
+from oslo_utils import timeutils
+
+from cinder.common import config  # noqa
+from cinder import context
+from cinder import objects
+from cinder.scheduler import filter_scheduler
+
+
+CONF = cfg.CONF
+CONF.import_opt('scheduler_default_filters', 'cinder.scheduler.host_manager')
+CONF.import_opt('scheduler_default_weighers', 'cinder.scheduler.host_manager')
+
+CAPABILITY_SHAPES = ('basic', 'full')
+
+
+def percentile(samples, percent):
+    """Return the nearest-rank percentile of a sorted list of samples."""
+    if not samples:
+        return 0.0
+    rank = int(round(percent / 100.0 * len(samples) + 0.5)) - 1
+    return samples[min(max(rank, 0), len(samples) - 1)]
+
+
+class Timings(object):
+    """Collect the duration of calls, grouped by name."""
+
+    def __init__(self):
+        self.samples = collections.OrderedDict()
+
+    def add(self, name, duration):
+        self.samples.setdefault(name, []).append(duration)
+
+    def wrap(self, name, func, consume=False):
+        def timed(*args, **kwargs):
+            start = timeit.default_timer()
+            result = func(*args, **kwargs)
+            # Filters may return generators, time the actual filtering.
+            if consume and result is not None:
+                result = list(result)
+            self.add(name, timeit.default_timer() - start)
+            return result
+        return timed
+
+    def report(self, out=sys.stdout):
+        print('%-32s %8s %10s %10s %12s' %
+              ('name', 'calls', 'p50 (ms)', 'p99 (ms)', 'calls/s'), file=out)
+        for name, samples in self.samples.items():
+            samples = sorted(samples)
+            total = sum(samples)
+            print('%-32s %8d %10.3f %10.3f %12.1f' %
+                  (name, len(samples), percentile(samples, 50) * 1000,
+                   percentile(samples, 99) * 1000,
+                   len(samples) / total if total else 0.0), file=out)
+
+
+def build_pool(args, backend_index, pool_index):
+    pool = {'pool_name': 'pool%d' % pool_index,
+            'total_capacity_gb': 1024 * 1024,
+            'free_capacity_gb': 1024 * 1024 - backend_index - pool_index,
+            'allocated_capacity_gb': backend_index + pool_index,
+            'provisioned_capacity_gb': backend_index + pool_index,
+            'max_over_subscription_ratio': 1.0,
+            'thin_provisioning_support': False,
+            'thick_provisioning_support': True,
+            'reserved_percentage': 0,
+            'QoS_support': False}
+    if args.capabilities == 'full':
+        pool.update({'thin_provisioning_support': bool(backend_index % 2),
+                     'thick_provisioning_support': True,
+                     'max_over_subscription_ratio': 20.0,
+                     'multiattach': True,
+                     'QoS_support': True,
+                     'consistencygroup_support': True,
+                     'replication_enabled': bool(pool_index % 2),
+                     'compression': True,
+                     'filter_function': 'volume.size < 1000',
+                     'goodness_function': 'capabilities.free_capacity_gb '
+                                          '/ 1024'})
+        for index in range(args.extra_capabilities):
+            pool['custom_capability_%d' % index] = index
+    return pool
+
+
+def build_fleet(args):
+    """Return the services and capability reports of the fake back-ends."""
+    now = timeutils.utcnow()
+    services = []
+    capabilities = {}
+    for index in range(args.backends):
+        host = 'host%d@backend%d' % (index, index)
+        services.append({'id': index + 1,
+                         'host': host,
+                         'binary': 'cinder-volume',
+                         'topic': CONF.volume_topic,
+                         'disabled': False,
+                         'availability_zone': 'nova',
+                         'report_count': 1,
+                         'created_at': now,
+                         'updated_at': now,
+                         'deleted': False})
+        capabilities[host] = {
+            'volume_backend_name': 'backend%d' % index,
+            'vendor_name': 'Benchmark',
+            'driver_version': '1.0',
+            'storage_protocol': 'iSCSI',
+            'pools': [build_pool(args, index, pool_index)
+                      for pool_index in range(args.pools)]}
+    return services, capabilities
+
+
+def build_request(args):
+    volume_type = {'id': 'benchmark-type', 'name': 'benchmark',
+                   'extra_specs': dict(spec.split('=', 1)
+                                       for spec in args.extra_spec)}
+    return {'volume_id': str(uuid.uuid4()),
+            'volume_properties': {'project_id': 'benchmark',
+                                  'size': args.size},
+            'volume_type': volume_type}
+
+
+def run(args):
+    if args.filters:
+        CONF.set_override('scheduler_default_filters',
+                          args.filters.split(','))
+    if args.weighers:
+        CONF.set_override('scheduler_default_weighers',
+                          args.weighers.split(','))
+
+    services, capabilities = build_fleet(args)
+    ctxt = context.get_admin_context()
+    timings = Timings()
+
+    patches = [mock.patch('cinder.db.service_get_all',
+                          return_value=services),
+               mock.patch('cinder.utils.service_is_up', return_value=True),
+               mock.patch('cinder.scheduler.driver.volume_update_db'),
+               mock.patch('cinder.volume.rpcapi.VolumeAPI')]
+    for patch in patches:
+        patch.start()
+
+    try:
+        scheduler = filter_scheduler.FilterScheduler()
+        manager = scheduler.host_manager
+        for host, capability in capabilities.items():
+            manager.update_service_capabilities('volume', host, capability)
+
+        for cls in manager._choose_host_filters(None):
+            patch = mock.patch.object(
+                cls, 'filter_all',
+                timings.wrap(cls.__name__, cls.filter_all, consume=True))
+            patch.start()
+            patches.append(patch)
+        for cls in manager._choose_host_weighers(None):
+            patch = mock.patch.object(
+                cls, 'weigh_objects',
+                timings.wrap(cls.__name__, cls.weigh_objects))
+            patch.start()
+            patches.append(patch)
+
+        schedule = timings.wrap('schedule_create_volume',
+                                scheduler.schedule_create_volume)
+        for __ in range(args.warmup):
+            scheduler.schedule_create_volume(ctxt, build_request(args), {})
+        timings.samples.clear()
+
+        start = timeit.default_timer()
+        for __ in range(args.requests):
+            schedule(ctxt, build_request(args), {})
+        elapsed = timeit.default_timer() - start
+    finally:
+        for patch in reversed(patches):
+            patch.stop()
+
+    print('%d back-ends, %d pools each, %s capabilities' %
+          (args.backends, args.pools, args.capabilities))
+    print('%d requests in %.3f s: %.1f requests/s' %
+          (args.requests, elapsed, args.requests / elapsed))
+    print('')
+    timings.report()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--backends', type=int, default=50,
+                        help='number of volume services')
+    parser.add_argument('--pools', type=int, default=4,
+                        help='number of pools of each volume service')
+    parser.add_argument('--capabilities', choices=CAPABILITY_SHAPES,
+                        default='basic',
+                        help='shape of the reported pool capabilities')
+    parser.add_argument('--extra-capabilities', type=int, default=0,
+                        help='number of additional custom capabilities '
+                             'reported by each pool with --capabilities '
+                             'full')
+    parser.add_argument('--extra-spec', action='append', default=[],
+                        metavar='KEY=VALUE',
+                        help='extra spec of the requested volume type, can '
+                             'be repeated')
+    parser.add_argument('--filters',
+                        help='comma separated filter class names, '
+                             'defaults to scheduler_default_filters')
+    parser.add_argument('--weighers',
+                        help='comma separated weigher class names, '
+                             'defaults to scheduler_default_weighers')
+    parser.add_argument('--requests', type=int, default=1000,
+                        help='number of measured requests')
+    parser.add_argument('--warmup', type=int, default=10,
+                        help='number of requests run before measuring')
+    parser.add_argument('--size', type=int, default=1,
+                        help='size in GB of the requested volumes')
+    args = parser.parse_args()
+
+    CONF([], project='cinder', default_config_files=[])
+    objects.register_all()
+    # Filters log every host they reject, keep the output readable.
+    logging.basicConfig(level=logging.ERROR)
+
+    run(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())